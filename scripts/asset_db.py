@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Stellar Descent - Asset Database
+
+Indexed SQLite store for audit results, replacing the monolithic JSON report
+as the source of truth. Results are keyed by file content hash (sha256) and
+audit version, so an unchanged file is never re-imported and any stage can
+ask "has this exact file been processed?". Audits add the LOD category to
+the hash (audit_key), because their GPU budget checks depend on it. Each audit run records which path
+held which hash, so runs can be diffed.
+
+Tables:
+  runs       one row per audit run
+  files      (run, path) -> content hash, category (folder under models/)
+  audits     per content hash: status, sizes, counts, bbox, full result JSON
+  meshes     per content hash: mesh name, vertices, faces, UVs
+  materials  per content hash: material names
+  images     per content hash: image name and size
+  warnings   per content hash: severity + message
+  gpu_costs  per content hash: estimated GPU bytes and draw calls (gpu_cost.py)
+  latest_files (view) newest row per path joined with its audit
+
+Usage:
+    # Ad-hoc queries
+    python3 scripts/asset_db.py query "SELECT path, total_faces FROM latest_files
+        WHERE category LIKE 'environment/station%' AND total_faces > 50000"
+
+    # Regenerate the JSON report (a view over the database)
+    python3 scripts/asset_db.py report asset-quality-report.json
+
+    # What changed between two audit runs (default: last two)
+    python3 scripts/asset_db.py diff
+    python3 scripts/asset_db.py diff 12 15
+
+    python3 scripts/asset_db.py runs
+
+All commands take --db (default: .asset-pipeline/assets.sqlite). Used from
+Blender by audit_glbs.py and asset_worker.py, and by watch_assets.py; works with plain Python 3 (stdlib only).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_DB = SCRIPT_DIR.parent / '.asset-pipeline' / 'assets.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    paths TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS audits (
+    content_hash TEXT NOT NULL,
+    audit_version INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    file_size INTEGER,
+    mesh_count INTEGER,
+    armature_count INTEGER,
+    total_vertices INTEGER,
+    total_faces INTEGER,
+    has_uvs INTEGER,
+    material_count INTEGER,
+    bbox_x REAL,
+    bbox_y REAL,
+    bbox_z REAL,
+    max_dimension REAL,
+    result_json TEXT NOT NULL,
+    PRIMARY KEY (content_hash, audit_version)
+);
+CREATE INDEX IF NOT EXISTS audits_status ON audits(status);
+CREATE INDEX IF NOT EXISTS audits_faces ON audits(total_faces);
+CREATE TABLE IF NOT EXISTS files (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    path TEXT NOT NULL,
+    category TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    audit_version INTEGER NOT NULL,
+    PRIMARY KEY (run_id, path)
+);
+CREATE INDEX IF NOT EXISTS files_path ON files(path, run_id);
+CREATE INDEX IF NOT EXISTS files_hash ON files(content_hash);
+CREATE INDEX IF NOT EXISTS files_category ON files(category);
+CREATE TABLE IF NOT EXISTS meshes (
+    content_hash TEXT NOT NULL,
+    audit_version INTEGER NOT NULL,
+    name TEXT,
+    vertices INTEGER,
+    faces INTEGER,
+    has_uvs INTEGER
+);
+CREATE INDEX IF NOT EXISTS meshes_hash ON meshes(content_hash, audit_version);
+CREATE TABLE IF NOT EXISTS materials (
+    content_hash TEXT NOT NULL,
+    audit_version INTEGER NOT NULL,
+    name TEXT
+);
+CREATE INDEX IF NOT EXISTS materials_hash ON materials(content_hash, audit_version);
+CREATE INDEX IF NOT EXISTS materials_name ON materials(name);
+CREATE TABLE IF NOT EXISTS images (
+    content_hash TEXT NOT NULL,
+    audit_version INTEGER NOT NULL,
+    name TEXT,
+    width INTEGER,
+    height INTEGER
+);
+CREATE INDEX IF NOT EXISTS images_hash ON images(content_hash, audit_version);
+CREATE TABLE IF NOT EXISTS warnings (
+    content_hash TEXT NOT NULL,
+    audit_version INTEGER NOT NULL,
+    severity TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS warnings_hash ON warnings(content_hash, audit_version);
+CREATE TABLE IF NOT EXISTS gpu_costs (
+    content_hash TEXT NOT NULL,
+    audit_version INTEGER NOT NULL,
+    lod_category TEXT,
+    vertex_bytes INTEGER,
+    index_bytes INTEGER,
+    texture_bytes INTEGER,
+    total_bytes INTEGER,
+    draw_calls INTEGER,
+    materials INTEGER,
+    over_budget INTEGER,
+    PRIMARY KEY (content_hash, audit_version)
+);
+CREATE INDEX IF NOT EXISTS gpu_costs_total ON gpu_costs(total_bytes);
+CREATE VIEW IF NOT EXISTS latest_files AS
+    SELECT f.run_id, f.path, f.category, f.filename, a.*
+    FROM files f
+    JOIN audits a ON a.content_hash = f.content_hash AND a.audit_version = f.audit_version
+    WHERE f.run_id = (SELECT MAX(run_id) FROM files f2 WHERE f2.path = f.path);
+"""
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+def open_db(path=DEFAULT_DB):
+    """Open (creating if needed) the asset database."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    # Parallel pipeline audits share one database; wait out their writes
+    db = sqlite3.connect(str(path), timeout=60)
+    db.row_factory = sqlite3.Row
+    db.executescript(SCHEMA)
+    return db
+
+
+def content_hash(filepath):
+    """sha256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def audit_key(digest, lod_category):
+    """Content hash plus the LOD category whose budgets a result was checked against."""
+    return f"{digest}:{lod_category}"
+
+
+def category_for(filepath, base_dir=None):
+    """
+    Category path of a model: its folder under .../assets/models/, falling
+    back to its folder relative to base_dir.
+    """
+    parts = Path(os.path.abspath(filepath)).parent.parts
+    for i in range(len(parts) - 1):
+        if parts[i] == 'assets' and parts[i + 1] == 'models':
+            return '/'.join(parts[i + 2:])
+    if base_dir:
+        rel = os.path.relpath(os.path.dirname(os.path.abspath(filepath)), os.path.abspath(base_dir))
+        return '' if rel == '.' else rel.replace(os.sep, '/')
+    return ''
+
+
+def start_run(db, tool, paths):
+    cursor = db.execute(
+        'INSERT INTO runs (started_at, tool, paths) VALUES (?, ?, ?)',
+        (datetime.now(timezone.utc).isoformat(timespec='seconds'), tool, json.dumps(list(paths))))
+    db.commit()
+    return cursor.lastrowid
+
+
+def cached_result(db, digest, audit_version):
+    """Stored audit result for a content hash, or None."""
+    row = db.execute(
+        'SELECT result_json FROM audits WHERE content_hash = ? AND audit_version = ?',
+        (digest, audit_version)).fetchone()
+    return json.loads(row['result_json']) if row else None
+
+
+def record_audit(db, digest, audit_version, result):
+    """Store an audit result and its detail rows for a content hash."""
+    bbox = result.get('bbox_size') or [None, None, None]
+    key = (digest, audit_version)
+    for table in ('meshes', 'materials', 'images', 'warnings', 'gpu_costs'):
+        db.execute(f'DELETE FROM {table} WHERE content_hash = ? AND audit_version = ?', key)
+    db.execute(
+        'INSERT OR REPLACE INTO audits VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        (*key, result['status'],
+         result.get('file_size'), result.get('mesh_count'), result.get('armature_count'),
+         result.get('total_vertices'), result.get('total_faces'),
+         int(result['has_uvs']) if 'has_uvs' in result else None,
+         result.get('material_count'), *bbox, result.get('max_dimension'),
+         json.dumps(result)))
+    db.executemany(
+        'INSERT INTO meshes VALUES (?, ?, ?, ?, ?, ?)',
+        [(*key, m['name'], m['vertices'], m['faces'], int(m['has_uvs']))
+         for m in result.get('meshes', [])])
+    db.executemany(
+        'INSERT INTO materials VALUES (?, ?, ?)',
+        [(*key, name) for name in result.get('materials', [])])
+    db.executemany(
+        'INSERT INTO images VALUES (?, ?, ?, ?, ?)',
+        [(*key, img['name'], img['width'], img['height']) for img in result.get('images', [])])
+    db.executemany(
+        'INSERT INTO warnings VALUES (?, ?, ?, ?)',
+        [(*key, 'error', message) for message in
+         result.get('errors', []) + ([result['error']] if 'error' in result else [])] +
+        [(*key, 'warning', message) for message in result.get('warnings', [])])
+    if 'gpu' in result:
+        gpu = result['gpu']
+        db.execute(
+            'INSERT INTO gpu_costs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (*key, gpu['category'], gpu['vertexBytes'], gpu['indexBytes'], gpu['textureBytes'],
+             gpu['totalBytes'], gpu['drawCalls'], gpu['materials'], int(result['over_budget'])))
+
+
+def record_file(db, run_id, filepath, category, digest, audit_version):
+    db.execute(
+        'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)',
+        (run_id, os.path.abspath(filepath), category, os.path.basename(filepath),
+         digest, audit_version))
+
+
+# ---------------------------------------------------------------------------
+# Views
+# ---------------------------------------------------------------------------
+
+def run_results(db, run_id):
+    """Audit results of one run, in path order, with per-path fields filled in."""
+    rows = db.execute(
+        'SELECT f.path, f.filename, f.category, a.result_json FROM files f '
+        'JOIN audits a ON a.content_hash = f.content_hash AND a.audit_version = f.audit_version '
+        'WHERE f.run_id = ? ORDER BY f.path', (run_id,)).fetchall()
+    results = []
+    for row in rows:
+        result = json.loads(row['result_json'])
+        result.update({'file': row['path'], 'filename': row['filename'], 'category': row['category']})
+        results.append(result)
+    return results
+
+
+def build_report(results):
+    """
+    The JSON report view. Each result appears once in `all_results`;
+    `issues` lists the paths of results whose status is not OK.
+    """
+    statuses = [r['status'] for r in results]
+    summary = {
+        'total_files': len(results),
+        'ok': statuses.count('OK'),
+        'warnings': statuses.count('WARNING'),
+        'tiny': statuses.count('TINY'),
+        'no_geometry': statuses.count('NO_GEOMETRY'),
+        'import_failed': statuses.count('IMPORT_FAILED'),
+        'invalid': statuses.count('INVALID'),
+        'over_budget': sum(1 for r in results if r.get('over_budget')),
+        'gpu_bytes': sum(r['gpu']['totalBytes'] for r in results if 'gpu' in r),
+    }
+    return {
+        'summary': summary,
+        'issues': [r['file'] for r in results if r['status'] != 'OK'],
+        'all_results': results,
+    }
+
+
+def latest_run_id(db):
+    row = db.execute('SELECT MAX(id) AS id FROM runs').fetchone()
+    return row['id']
+
+
+def diff_runs(db, old_run, new_run):
+    """Paths added, removed and changed (different content hash) between runs."""
+    def snapshot(run_id):
+        return {row['path']: (row['content_hash'], row['status']) for row in db.execute(
+            'SELECT f.path, f.content_hash, a.status FROM files f '
+            'JOIN audits a ON a.content_hash = f.content_hash AND a.audit_version = f.audit_version '
+            'WHERE f.run_id = ?', (run_id,))}
+    old, new = snapshot(old_run), snapshot(new_run)
+    return {
+        'added': sorted(p for p in new if p not in old),
+        'removed': sorted(p for p in old if p not in new),
+        'changed': sorted(
+            (p, old[p][1], new[p][1]) for p in new if p in old and old[p][0] != new[p][0]),
+    }
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def cmd_query(db, args):
+    rows = db.execute(args.sql).fetchall()
+    if not rows:
+        print('(no rows)')
+        return
+    columns = rows[0].keys()
+    print('\t'.join(columns))
+    for row in rows:
+        print('\t'.join('' if row[c] is None else str(row[c]) for c in columns))
+
+
+def cmd_report(db, args):
+    run_id = args.run or latest_run_id(db)
+    if run_id is None:
+        print('ERROR: database has no audit runs')
+        sys.exit(1)
+    report = build_report(run_results(db, run_id))
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report for run {run_id} written to: {args.output}")
+
+
+def cmd_diff(db, args):
+    if args.old is None or args.new is None:
+        ids = [row['id'] for row in db.execute('SELECT id FROM runs ORDER BY id DESC LIMIT 2')]
+        if len(ids) < 2:
+            print('ERROR: need two audit runs to diff')
+            sys.exit(1)
+        args.new, args.old = ids
+    diff = diff_runs(db, args.old, args.new)
+    print(f"Run {args.old} -> {args.new}")
+    for path in diff['added']:
+        print(f"  + {path}")
+    for path in diff['removed']:
+        print(f"  - {path}")
+    for path, old_status, new_status in diff['changed']:
+        print(f"  ~ {path} ({old_status} -> {new_status})")
+    print(f"\n{len(diff['added'])} added, {len(diff['removed'])} removed, "
+          f"{len(diff['changed'])} changed")
+
+
+def cmd_runs(db, args):
+    for row in db.execute(
+            'SELECT r.id, r.started_at, r.tool, COUNT(f.path) AS files FROM runs r '
+            'LEFT JOIN files f ON f.run_id = r.id GROUP BY r.id ORDER BY r.id'):
+        print(f"  {row['id']:4d}  {row['started_at']}  {row['tool']:16s} {row['files']} files")
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(description='Query the asset audit database')
+    parser.add_argument('--db', default=str(DEFAULT_DB), help='Database path')
+    sub = parser.add_subparsers(dest='command', required=True)
+    query = sub.add_parser('query', help='Run a SQL query')
+    query.add_argument('sql')
+    report = sub.add_parser('report', help='Write the JSON report for a run')
+    report.add_argument('output')
+    report.add_argument('--run', type=int, default=None, help='Run id (default: latest)')
+    diff = sub.add_parser('diff', help='Compare two runs (default: the last two)')
+    diff.add_argument('old', type=int, nargs='?')
+    diff.add_argument('new', type=int, nargs='?')
+    sub.add_parser('runs', help='List audit runs')
+    return parser.parse_args(raw_args)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    if not os.path.exists(args.db):
+        print(f"ERROR: Database not found: {args.db}")
+        sys.exit(1)
+    db = open_db(args.db)
+    {'query': cmd_query, 'report': cmd_report, 'diff': cmd_diff, 'runs': cmd_runs}[args.command](db, args)
+
+
+if __name__ == '__main__':
+    main()
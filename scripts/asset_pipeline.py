@@ -0,0 +1,626 @@
+#!/usr/bin/env python3
+"""
+Stellar Descent - Asset Pipeline Runner
+
+Single entry point for the bpy asset scripts. Stages are declared in
+build_stages() as a dependency graph; independent stages run concurrently as separate
+Blender processes, dependent stages wait for their inputs, and the audit runs
+only on outputs of conversion stages that finished successfully, after the
+last in-place rewrite. Per-file Blender stages split their GLBs across
+--shards processes.
+
+Usage:
+    # Full rebuild using every core
+    python3 scripts/asset_pipeline.py
+
+    # Only some stages (dependencies are assumed already built)
+    python3 scripts/asset_pipeline.py --only weapons audit-weapons
+
+    # Stages whose sources changed since their last successful run,
+    # plus everything downstream of them
+    python3 scripts/asset_pipeline.py --since last
+
+    # Stages whose sources changed after a point in time
+    python3 scripts/asset_pipeline.py --since 2026-10-01T12:00
+
+    # Include an opt-in stage (see --list)
+    python3 scripts/asset_pipeline.py --with bake-ao
+
+    # Four stages at a time, each per-file stage over 8 Blender processes
+    python3 scripts/asset_pipeline.py --jobs 4 --shards 8
+
+    # Show the plan without running anything
+    python3 scripts/asset_pipeline.py --dry-run
+
+Environment:
+    BLENDER            Blender executable (default: "blender")
+    ASSET_SOURCE_ROOT  Root of the external asset packs (default: ~/assets)
+
+Each stage's output is written to .asset-pipeline/logs/<stage>.log and a
+timing report is printed when the run finishes.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+REPO_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from camo_palettes import SOURCE_GLB_MAP
+
+BLENDER = os.environ.get('BLENDER', 'blender')
+SOURCE_ROOT = Path(os.environ.get('ASSET_SOURCE_ROOT', '~/assets')).expanduser()
+MODELS_DIR = REPO_ROOT / 'public' / 'assets' / 'models'
+KITS_DIR = REPO_ROOT / 'public' / 'assets' / 'kits'
+STREAMING_DIR = REPO_ROOT / 'public' / 'assets' / 'streaming'
+STATE_DIR = REPO_ROOT / '.asset-pipeline'
+STATE_FILE = STATE_DIR / 'state.json'
+LOG_DIR = STATE_DIR / 'logs'
+
+WEAPON_SOURCE_DIR = SOURCE_ROOT / 'Quaternius' / 'FPS' / 'Ultimate Gun Pack - July 2019' / 'FBX'
+MARINE_SOURCE_DIR = Path('~/src/arcade-cabinet/space-marines/ExportedGLB').expanduser()
+MARINE_OUTPUT_DIR = MODELS_DIR / 'npcs' / 'marine'
+
+# FBX/.blend kits converted with the batch scripts.
+# stage name -> (converter script, source dir, output dir)
+KIT_SOURCES = {
+    'kit-station': ('batch_fbx_to_glb.py', SOURCE_ROOT / 'assets spaceship',
+                    MODELS_DIR / 'environment' / 'station'),
+}
+
+
+def python_cmd(script, *args):
+    """Command line for one of our plain-Python (numpy) scripts."""
+    return [sys.executable, str(SCRIPT_DIR / script), *[str(a) for a in args]]
+
+
+def blender_cmd(script, *args):
+    """Command line for a headless Blender run of one of our scripts."""
+    return [BLENDER, '--background', '--factory-startup', '--python-exit-code', '1',
+            '--python', str(SCRIPT_DIR / script), '--', *[str(a) for a in args]]
+
+
+def blender_shards(script, paths, *options, by_dir=False):
+    """
+    Stage fields for a Blender script that processes each GLB on its own:
+    'cmd' runs it on paths, 'shard' lets the runner split the GLBs under
+    paths (or, with by_dir, the paths themselves) across processes.
+    """
+    return {
+        'cmd': blender_cmd(script, *paths, *options),
+        'shard': {'script': script, 'paths': list(paths), 'options': list(options), 'by_dir': by_dir},
+    }
+
+
+def build_stages():
+    """
+    Declare the stage graph.
+
+    Each stage is a dict:
+      cmd      - command line (None for audit stages, built at run time)
+      deps     - stages that must finish first
+      sources  - files/dirs whose changes make the stage stale (--since)
+      outputs  - dirs/files the stage writes
+      shard    - optional, from blender_shards(): the inputs may be split
+                 across --shards Blender processes
+      audit    - True for audit stages, which check the outputs of their
+                 successful deps instead of running a fixed command
+      opt_in   - True for stages that only run when named in --with or --only
+    """
+    stages = {}
+
+    stages['weapons'] = {
+        'cmd': blender_cmd('convert-weapons.py'),
+        'deps': [],
+        'sources': [WEAPON_SOURCE_DIR, SCRIPT_DIR / 'convert-weapons.py', SCRIPT_DIR / 'normalize_scale.py',
+                    SCRIPT_DIR / 'weld_vertices.py'],
+        'outputs': [MODELS_DIR / 'props' / 'weapons'],
+    }
+
+    # View-models are drawn every frame: merged to one palette draw, plus
+    # the low-poly *_world.glb pickups
+    stages['fps-weapons'] = {
+        **blender_shards('optimize_weapons.py', [MODELS_DIR / 'props' / 'weapons']),
+        'deps': ['weapons'],
+        'sources': [SCRIPT_DIR / 'optimize_weapons.py', SCRIPT_DIR / 'flatten_glbs.py'],
+        'outputs': [MODELS_DIR / 'props' / 'weapons'],
+    }
+
+    for name, (script, source_dir, output_dir) in KIT_SOURCES.items():
+        stages[name] = {
+            'cmd': blender_cmd(script, source_dir, output_dir),
+            'deps': [],
+            'sources': [source_dir, SCRIPT_DIR / script, SCRIPT_DIR / 'normalize_scale.py',
+                        SCRIPT_DIR / 'weld_vertices.py'],
+            'outputs': [output_dir],
+        }
+
+    stages['marines'] = {
+        'cmd': blender_cmd('retexture_marines.py',
+                           '--source', MARINE_SOURCE_DIR,
+                           '--output', MARINE_OUTPUT_DIR),
+        'deps': [],
+        'sources': [*(MARINE_SOURCE_DIR / name for name in SOURCE_GLB_MAP.values()),
+                    SCRIPT_DIR / 'retexture_marines.py',
+                    SCRIPT_DIR / 'camo_palettes.py'],
+        'outputs': [MARINE_OUTPUT_DIR],
+    }
+
+    # Character skins are cleaned up before anything imports them. Marines
+    # and enemies get separate stages, so the enemies don't wait on (or get
+    # skipped by) the marine conversion
+    skinned_groups = {
+        'marines': (MARINE_OUTPUT_DIR, ['marines']),
+        'enemies': (MODELS_DIR / 'enemies', []),
+    }
+    for group, (skinned_dir, deps) in skinned_groups.items():
+        stages[f'skins-{group}'] = {
+            'cmd': python_cmd('optimize_skins.py', skinned_dir,
+                              '--report', STATE_DIR / f'skins-{group}-report.json'),
+            'deps': deps,
+            'sources': [SCRIPT_DIR / 'optimize_skins.py', SCRIPT_DIR / 'glb_io.py'],
+            'outputs': [skinned_dir],
+        }
+        stages[f'animations-{group}'] = {
+            'cmd': python_cmd('optimize_animations.py', skinned_dir, '--quantize-rotations',
+                              '--report', STATE_DIR / f'animations-{group}-report.json'),
+            'deps': [f'skins-{group}'],
+            'sources': [SCRIPT_DIR / 'optimize_animations.py', SCRIPT_DIR / 'glb_io.py'],
+            'outputs': [skinned_dir],
+        }
+
+    stages['orm-marines'] = {
+        **blender_shards('pack_orm.py', [MARINE_OUTPUT_DIR]),
+        'deps': ['animations-marines'],
+        'sources': [SCRIPT_DIR / 'pack_orm.py', SCRIPT_DIR / 'retexture_marines.py'],
+        'outputs': [MARINE_OUTPUT_DIR],
+    }
+
+    stages['normals-marines'] = {
+        **blender_shards('bump_to_normal.py', [MARINE_OUTPUT_DIR]),
+        'deps': ['orm-marines'],
+        'sources': [SCRIPT_DIR / 'bump_to_normal.py', SCRIPT_DIR / 'retexture_marines.py'],
+        'outputs': [MARINE_OUTPUT_DIR],
+    }
+
+    # Placeholder copies go outside MODELS_DIR, so the marine GLBs keep their
+    # full textures and the in-place stages above can re-run on them. Opt-in:
+    # no loader reads the sidecars yet
+    stages['split-marines'] = {
+        **blender_shards('split_textures.py', [MARINE_OUTPUT_DIR], '--output', STREAMING_DIR / 'marine'),
+        'deps': ['normals-marines'],
+        'sources': [SCRIPT_DIR / 'split_textures.py', SCRIPT_DIR / 'glb_io.py', SCRIPT_DIR / 'image_io.py'],
+        'outputs': [STREAMING_DIR / 'marine'],
+        'opt_in': True,
+    }
+
+    bake_dirs = [MODELS_DIR / 'environment' / kit for kit in ('station', 'modular', 'industrial')]
+    stages['flatten'] = {
+        'cmd': python_cmd('flatten_glbs.py', *bake_dirs),
+        'deps': list(KIT_SOURCES),
+        'sources': [SCRIPT_DIR / 'flatten_glbs.py', SCRIPT_DIR / 'glb_io.py'],
+        'outputs': bake_dirs,
+    }
+
+    # ORM R keeps the authored AO: the bake never edits materials
+    stages['orm-kits'] = {
+        **blender_shards('pack_orm.py', bake_dirs),
+        'deps': ['flatten'],
+        'sources': [SCRIPT_DIR / 'pack_orm.py', SCRIPT_DIR / 'retexture_marines.py'],
+        'outputs': bake_dirs,
+    }
+
+    stages['normals-kits'] = {
+        **blender_shards('bump_to_normal.py', bake_dirs),
+        'deps': ['orm-kits'],
+        'sources': [SCRIPT_DIR / 'bump_to_normal.py', SCRIPT_DIR / 'retexture_marines.py'],
+        'outputs': bake_dirs,
+    }
+
+    # Each kit directory gets its own atlases in <kit>/atlas/, so kits shard
+    # by directory
+    stages['atlas-kits'] = {
+        **blender_shards('atlas_kits.py', bake_dirs, by_dir=True),
+        'deps': ['normals-kits'],
+        'sources': [SCRIPT_DIR / 'atlas_kits.py'],
+        'outputs': bake_dirs,
+    }
+
+    # Baked last so the per-piece AO sees the final geometry. Materials are
+    # shared atlas materials by now, so the bake goes on node extras and
+    # package_kit can still deduplicate them. Opt-in: nothing in the game
+    # reads node bakedLighting yet, so by default the kits would only gain
+    # a UV set, seam vertices and a texture. Later stages also list
+    # atlas-kits so they keep their order when bake-ao is not selected.
+    stages['bake-ao'] = {
+        'cmd': blender_cmd('bake_lightmaps.py', *bake_dirs, '--jobs', os.cpu_count() or 1),
+        'deps': ['atlas-kits'],
+        'sources': [SCRIPT_DIR / 'bake_lightmaps.py', SCRIPT_DIR / 'glb_io.py', SCRIPT_DIR / 'image_io.py'],
+        'outputs': bake_dirs,
+        'opt_in': True,
+    }
+
+    # Outside MODELS_DIR so the per-model stages never pick the packages up
+    station_builder = REPO_ROOT / 'src' / 'game' / 'levels' / 'anchor-station' / 'ModularStationBuilder.ts'
+    stages['kit-package'] = {
+        'cmd': python_cmd('package_kit.py', MODELS_DIR / 'environment' / 'station',
+                          '--output', KITS_DIR / 'station.kit.glb', '--station-layout', station_builder),
+        'deps': ['atlas-kits', 'bake-ao'],
+        'sources': [SCRIPT_DIR / 'package_kit.py', SCRIPT_DIR / 'flatten_glbs.py', station_builder],
+        'outputs': [KITS_DIR],
+    }
+
+    # Audits check what ships, so each runs after the last stage that
+    # rewrites its GLBs in place. The kit audit also lists the converters,
+    # so a failed post-process still gets the converted files audited.
+    audit_groups = {
+        'audit-weapons': ['fps-weapons'],
+        'audit-kits': [*KIT_SOURCES, 'atlas-kits', 'bake-ao'],
+        'audit-marines': ['normals-marines'],
+        'audit-enemies': ['animations-enemies'],
+    }
+    for name, deps in audit_groups.items():
+        stages[name] = {
+            'cmd': None,
+            'deps': deps,
+            'sources': [SCRIPT_DIR / 'audit_glbs.py', SCRIPT_DIR / 'asset_db.py'],
+            'outputs': [STATE_DIR / f"{name}-report.json"],
+            'audit': True,
+        }
+
+    # Distant-LOD billboards for the categories LODManager billboards, plus vehicles
+    impostor_dirs = [MODELS_DIR / 'environment' / 'alien-flora', MODELS_DIR / 'vehicles',
+                     MODELS_DIR / 'spaceships',
+                     *sorted(d for d in (MODELS_DIR / 'props').glob('*')
+                             if d.is_dir() and d.name not in ('weapons', 'decals'))]
+    stages['impostors'] = {
+        **blender_shards('impostors.py', impostor_dirs),
+        'deps': [],
+        # The model GLBs only: the atlases and sidecars written next to them
+        # must not make the stage stale
+        'sources': [*sorted(p for d in impostor_dirs for p in d.rglob('*.glb')),
+                    SCRIPT_DIR / 'impostors.py', SCRIPT_DIR / 'image_io.py'],
+        'outputs': impostor_dirs,
+    }
+
+    stages['collision'] = {
+        **blender_shards('collision_proxies.py', [MODELS_DIR], '--root', MODELS_DIR),
+        'deps': ['fps-weapons', *KIT_SOURCES, 'atlas-kits', 'bake-ao'],
+        'sources': [SCRIPT_DIR / 'collision_proxies.py'],
+        'outputs': [MODELS_DIR],
+    }
+
+    stages['bounds'] = {
+        'cmd': python_cmd('bounds_metadata.py', MODELS_DIR),
+        'deps': ['fps-weapons', *KIT_SOURCES, 'normals-marines', 'animations-enemies',
+                 'atlas-kits', 'bake-ao'],
+        'sources': [SCRIPT_DIR / 'bounds_metadata.py', SCRIPT_DIR / 'glb_io.py'],
+        'outputs': [MODELS_DIR],
+    }
+
+    stages['validate'] = {
+        'cmd': python_cmd('validate_glbs.py', MODELS_DIR, '--quiet',
+                          '--report', STATE_DIR / 'validation-report.json'),
+        'deps': ['fps-weapons', *KIT_SOURCES, 'normals-marines', 'animations-enemies',
+                 'atlas-kits', 'bake-ao'],
+        'sources': [SCRIPT_DIR / 'validate_glbs.py', SCRIPT_DIR / 'glb_io.py'],
+        'outputs': [STATE_DIR / 'validation-report.json'],
+    }
+
+    stages['gpu-cost'] = {
+        'cmd': python_cmd('gpu_cost.py', MODELS_DIR, '--levels',
+                          '--report', STATE_DIR / 'gpu-cost.json'),
+        'deps': ['fps-weapons', *KIT_SOURCES, 'normals-marines', 'animations-enemies',
+                 'atlas-kits', 'bake-ao'],
+        'sources': [SCRIPT_DIR / 'gpu_cost.py', SCRIPT_DIR / 'glb_io.py',
+                    REPO_ROOT / 'src' / 'game' / 'assets'],
+        'outputs': [STATE_DIR / 'gpu-cost.json'],
+    }
+
+    return stages
+
+
+def audit_cmd(stage, inputs):
+    return blender_cmd('audit_glbs.py', *inputs, stage['outputs'][0])
+
+
+def shard_cmds(stage, shards):
+    """
+    Commands for a stage: one, or for a sharded stage the GLBs under its
+    paths (or the paths themselves, by_dir) split round-robin across up to
+    shards Blender processes. Listed at run time, after upstream stages ran.
+    """
+    shard = stage.get('shard')
+    if not shard or shards < 2:
+        return [stage['cmd']]
+    paths = [Path(p) for p in shard['paths'] if Path(p).exists()]
+    if shard['by_dir']:
+        units = paths
+    else:
+        units = sorted({f for p in paths for f in (p.rglob('*') if p.is_dir() else [p])
+                        if f.suffix.lower() == '.glb'})
+    count = min(shards, len(units))
+    if count < 2:
+        return [stage['cmd']]
+    return [blender_cmd(shard['script'], *units[i::count], *shard['options']) for i in range(count)]
+
+
+# ---------------------------------------------------------------------------
+# Selection
+# ---------------------------------------------------------------------------
+
+def latest_mtime(path):
+    """Newest mtime of a file or anything inside a directory (0 if missing)."""
+    path = Path(path)
+    if not path.exists():
+        return 0.0
+    if path.is_file():
+        return path.stat().st_mtime
+    newest = path.stat().st_mtime
+    for root, dirs, files in os.walk(path):
+        for f in files:
+            try:
+                newest = max(newest, os.path.getmtime(os.path.join(root, f)))
+            except FileNotFoundError:
+                pass
+    return newest
+
+
+def downstream(stages, names):
+    """names plus every stage that (transitively) depends on them."""
+    selected = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for name, stage in stages.items():
+            if name not in selected and any(d in selected for d in stage['deps']):
+                selected.add(name)
+                changed = True
+    return selected
+
+
+def select_stages(stages, only, since, state, include=()):
+    for names in (only or [], include):
+        unknown = [n for n in names if n not in stages]
+        if unknown:
+            print(f"ERROR: Unknown stage(s): {', '.join(unknown)}")
+            print(f"Available: {', '.join(stages)}")
+            sys.exit(1)
+
+    # Opt-in stages run only when asked for by name
+    requested = set(include) | set(only or [])
+    selected = {name for name, stage in stages.items()
+                if not stage.get('opt_in') or name in requested}
+
+    if since:
+        stale = set()
+        for name, stage in stages.items():
+            if since == 'last':
+                cutoff = state.get(name, {}).get('last_success', 0.0)
+            else:
+                cutoff = datetime.fromisoformat(since).timestamp()
+            if any(latest_mtime(src) > cutoff for src in stage['sources']):
+                stale.add(name)
+        selected &= downstream(stages, stale)
+
+    if only:
+        selected &= set(only)
+
+    return [name for name in stages if name in selected]
+
+
+# ---------------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------------
+
+def run_stage(name, cmds):
+    """
+    Run one stage's commands (one per shard) concurrently, each logging to
+    its own file. Returns (ok, seconds); ok only if every shard succeeded.
+    """
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    start = time.time()
+    procs = []
+    for i, cmd in enumerate(cmds):
+        log_path = LOG_DIR / (f"{name}.log" if len(cmds) == 1 else f"{name}.{i + 1}.log")
+        log = open(log_path, 'w')
+        log.write(' '.join(cmd) + '\n\n')
+        log.flush()
+        try:
+            procs.append((subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT), log))
+        except OSError as e:
+            log.write(f"ERROR: {e}\n")
+            log.close()
+            procs.append((None, None))
+    ok = True
+    for proc, log in procs:
+        if proc is None:
+            ok = False
+            continue
+        ok = proc.wait() == 0 and ok
+        log.close()
+    return ok, time.time() - start
+
+
+def run_pipeline(stages, selected, jobs, shards, dry_run):
+    """
+    Schedule selected stages respecting deps. Returns {name: result dict}.
+    Sharded stages split their files across up to shards processes.
+
+    Deps outside the selection are treated as already built. A failed dep
+    skips its dependents, except audits, which check whatever succeeded.
+    """
+    results = {}
+    pending = list(selected)
+    running = {}
+
+    def dep_status(dep):
+        if dep not in selected:
+            return 'ok'
+        if dep not in results:
+            return 'pending'
+        return results[dep]['status']
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for name in list(pending):
+                if len(running) >= jobs:
+                    break
+                stage = stages[name]
+                statuses = [dep_status(d) for d in stage['deps']]
+                if 'pending' in statuses:
+                    continue
+                pending.remove(name)
+
+                if stage.get('audit'):
+                    inputs = [str(out) for dep, st in zip(stage['deps'], statuses)
+                              if st == 'ok' for out in stages[dep]['outputs']
+                              if Path(out).exists()]
+                    if not inputs:
+                        results[name] = {'status': 'skipped', 'seconds': 0.0}
+                        print(f"  SKIP  {name} (nothing to audit)")
+                        continue
+                    cmds = [audit_cmd(stage, inputs)]
+                else:
+                    if any(st != 'ok' for st in statuses):
+                        results[name] = {'status': 'skipped', 'seconds': 0.0}
+                        print(f"  SKIP  {name} (dependency failed)")
+                        continue
+                    cmds = shard_cmds(stage, shards)
+
+                if dry_run:
+                    results[name] = {'status': 'ok', 'seconds': 0.0}
+                    for cmd in cmds:
+                        print(f"  PLAN  {name}: {' '.join(cmd)}")
+                    continue
+
+                shard_note = f" ({len(cmds)} shards)" if len(cmds) > 1 else ''
+                print(f"  START {name}{shard_note}", flush=True)
+                running[pool.submit(run_stage, name, cmds)] = name
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                ok, seconds = future.result()
+                results[name] = {'status': 'ok' if ok else 'failed', 'seconds': seconds}
+                label = 'DONE ' if ok else 'FAIL '
+                print(f"  {label} {name} ({seconds:.1f}s)", flush=True)
+
+    return results
+
+
+def load_state():
+    if STATE_FILE.exists():
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state, results, finished_at):
+    for name, result in results.items():
+        if result['status'] == 'ok':
+            state.setdefault(name, {})['last_success'] = finished_at
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(STATE_FILE, 'w') as f:
+        json.dump(state, f, indent=2)
+
+
+def print_timing_report(selected, results, wall_seconds):
+    print(f"\n{'='*60}")
+    print("TIMING REPORT")
+    print(f"{'='*60}")
+    for name in selected:
+        result = results.get(name, {'status': 'not run', 'seconds': 0.0})
+        print(f"  {name:20s} {result['status']:8s} {result['seconds']:8.1f}s")
+    total = sum(r['seconds'] for r in results.values())
+    print(f"{'-'*60}")
+    print(f"  Stage time:  {total:.1f}s")
+    print(f"  Wall time:   {wall_seconds:.1f}s")
+    if wall_seconds > 0:
+        print(f"  Parallelism: {total / wall_seconds:.1f}x")
+    ok = sum(1 for r in results.values() if r['status'] == 'ok')
+    failed = sum(1 for r in results.values() if r['status'] == 'failed')
+    skipped = sum(1 for r in results.values() if r['status'] == 'skipped')
+    print(f"\n  {ok} succeeded, {failed} failed, {skipped} skipped")
+    if failed:
+        print(f"  Logs: {LOG_DIR}")
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Run the asset pipeline stage graph')
+    parser.add_argument(
+        '--only', nargs='+', default=None, metavar='STAGE',
+        help='Run only these stages')
+    parser.add_argument(
+        '--with', dest='include', nargs='+', default=[], metavar='STAGE',
+        help='Also run these opt-in stages')
+    parser.add_argument(
+        '--since', default=None,
+        help='Run stages whose sources changed since an ISO timestamp, '
+             'or "last" for each stage\'s last successful run')
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=os.cpu_count() or 1,
+        help='Maximum concurrent stages (default: CPU count)')
+    parser.add_argument(
+        '--shards', type=int, default=os.cpu_count() or 1,
+        help='Blender processes a per-file stage splits its GLBs across (default: CPU count)')
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Print the plan without running anything')
+    parser.add_argument(
+        '--list', action='store_true',
+        help='List stages and their dependencies')
+    return parser.parse_args(raw_args)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    stages = build_stages()
+
+    if args.list:
+        for name, stage in stages.items():
+            deps = f" <- {', '.join(stage['deps'])}" if stage['deps'] else ''
+            opt_in = ' (opt-in)' if stage.get('opt_in') else ''
+            print(f"  {name}{opt_in}{deps}")
+        return
+
+    state = load_state()
+    selected = select_stages(stages, args.only, args.since, state, args.include)
+    if not selected:
+        print("Nothing to do")
+        return
+
+    print(f"\nStellar Descent - Asset Pipeline")
+    print(f"{'='*60}")
+    print(f"Stages: {len(selected)} ({', '.join(selected)})")
+    print(f"Jobs:   {args.jobs} (shards per stage: {args.shards})")
+    print()
+
+    start = time.time()
+    results = run_pipeline(stages, selected, max(1, args.jobs), max(1, args.shards), args.dry_run)
+    wall_seconds = time.time() - start
+
+    if args.dry_run:
+        return
+    save_state(state, results, start)
+    print_timing_report(selected, results, wall_seconds)
+    if any(r['status'] == 'failed' for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
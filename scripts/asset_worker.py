@@ -0,0 +1,83 @@
+"""
+Blender headless asset worker - keeps one Blender process warm for many jobs.
+
+Reads one JSON job per line from stdin, runs it with the same functions the
+batch scripts use, and answers with a single result line prefixed by
+`@@RESULT ` on stdout (Blender's own log output is interleaved freely).
+
+Jobs:
+    {"op": "fbx",   "input": "/src/a.fbx",   "output": "/out/a.glb"}
+    {"op": "blend", "input": "/src/b.blend", "output": "/out/b.glb"}
+    {"op": "audit", "input": "/out/a.glb", "db": "/repo/.asset-pipeline/assets.sqlite",
+     "run": 12, "base": "/out"}
+    {"op": "quit"}
+
+audit jobs go through the asset database like audit_glbs.py: a stored result
+for the same bytes is reused, and the file is recorded in the given run.
+
+fbx/blend jobs may add "up": "z" for Z-up sources; exports are normalized by
+normalize_scale.py either way.
+
+Usage (normally started by watch_assets.py):
+    blender --background --python scripts/asset_worker.py
+"""
+
+import sys
+import json
+import traceback
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from batch_fbx_to_glb import convert_fbx_to_glb
+from batch_blend_to_glb import convert_blend_to_glb
+from audit_glbs import audit_file
+import asset_db
+
+RESULT_PREFIX = '@@RESULT '
+
+# Asset database path -> connection, kept open between audit jobs
+databases = {}
+
+
+def run_job(job):
+    """Execute one job dict and return its result dict."""
+    op = job.get('op')
+    if op == 'fbx':
+        return {'ok': convert_fbx_to_glb(job['input'], job['output'], up=job.get('up'))}
+    if op == 'blend':
+        return {'ok': convert_blend_to_glb(job['input'], job['output'], up=job.get('up'))}
+    if op == 'audit':
+        db_path = job.get('db', str(asset_db.DEFAULT_DB))
+        if db_path not in databases:
+            databases[db_path] = asset_db.open_db(db_path)
+        result, cached = audit_file(databases[db_path], job['run'], job['input'], job.get('base'))
+        return {'ok': True, 'audit': result, 'cached': cached}
+    return {'ok': False, 'error': f'Unknown op: {op}'}
+
+
+def reply(job, result):
+    result['id'] = job.get('id')
+    sys.stdout.write(RESULT_PREFIX + json.dumps(result) + '\n')
+    sys.stdout.flush()
+
+
+def main():
+    reply({}, {'ok': True, 'ready': True})
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        job = json.loads(line)
+        if job.get('op') == 'quit':
+            break
+        try:
+            result = run_job(job)
+        except Exception as e:
+            traceback.print_exc()
+            result = {'ok': False, 'error': str(e)}
+        reply(job, result)
+
+
+if __name__ == '__main__':
+    main()
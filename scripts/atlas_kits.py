@@ -0,0 +1,533 @@
+"""
+Stellar Descent - Kit Texture Atlas Builder
+
+Modular kit pieces (FloorTile_*, Wall_*, Props_*) each bring their own
+materials and small textures. Every piece therefore binds its own textures
+and nothing can be batched, merged or instanced across pieces. This packs a
+kit's materials into shared atlases:
+
+  - Each unique material (same factors and image bytes, in any file) gets
+    one tile. The tile uses the size of its largest texture, capped at
+    --max-tile. Untextured materials get a small flat tile. Tiles are
+    shelf-packed into pages of up to --size pixels, and every page has a
+    colour, ORM and (when used) normal and emissive atlas with the same
+    layout.
+  - Material factors are baked into the tiles: base colour and emissive in
+    linear space, roughness/metallic into ORM G/B, occlusion strength into
+    R, normal scale into the normal XY. The shared material then uses factors
+    of 1, so every piece on a page can use the same material.
+  - Tiles are surrounded by --padding pixels of edge-extended gutter and
+    placed on a 4 px grid. Mip levels therefore stay inside the tile down to
+    about padding px. TEXCOORD_0 is remapped into the tile; primitives
+    without UVs point at the centre of their flat tile.
+  - Pages are written once per kit as PNGs in <kit>/atlas/ and referenced
+    by URI from each GLB, so the pieces share one texture per slot at
+    runtime.
+
+Materials are left alone when they have extensions, KHR_texture_transform,
+textures on another UV set, nearest-filtered or external textures, or UVs
+outside 0-1 (tiling textures cannot be atlased). A tile is only made when at
+least two materials share the page's blend state (alphaMode, alphaCutoff,
+doubleSided). Processed GLBs record asset.extras.atlas and are skipped on
+later runs.
+
+Usage:
+    blender --background --python scripts/atlas_kits.py -- public/assets/models/environment/modular/
+    blender --background --python scripts/atlas_kits.py -- kit_dir/ --size 1024 --max-tile 256 --dry-run
+
+Requires: Blender 3.6+, numpy
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import read_glb, write_glb, compact, read_accessor_float, add_accessor, image_bytes, image_size, \
+    ARRAY_BUFFER
+from image_io import sniff_mime_type, decode_image, encode_image, resize_pixels
+from optimize_weapons import linear_to_srgb
+from pack_orm import remove_unused_images
+
+TRIANGLES = 4
+ATLAS_DIR = 'atlas'
+FLAT_TILE = 4
+GRID = 4
+UV_TOLERANCE = 1e-3
+NEAREST_FILTER = 9728
+ATLAS_SAMPLER = {'magFilter': 9729, 'minFilter': 9987, 'wrapS': 33071, 'wrapT': 33071}
+
+# material slot -> where its texture info lives
+SLOTS = {
+    'baseColor': ('pbrMetallicRoughness', 'baseColorTexture'),
+    'metallicRoughness': ('pbrMetallicRoughness', 'metallicRoughnessTexture'),
+    'occlusion': (None, 'occlusionTexture'),
+    'normal': (None, 'normalTexture'),
+    'emissive': (None, 'emissiveTexture'),
+}
+
+
+def get_args():
+    argv = sys.argv
+    if '--' in argv:
+        return argv[argv.index('--') + 1:]
+    return []
+
+
+def srgb_to_linear(values):
+    values = np.clip(values, 0.0, 1.0)
+    return np.where(values <= 0.04045, values / 12.92, np.power((values + 0.055) / 1.055, 2.4))
+
+
+def slot_info(material, slot):
+    parent, key = SLOTS[slot]
+    owner = material.get(parent, {}) if parent else material
+    return owner.get(key)
+
+
+def blend_state(material):
+    alpha_mode = material.get('alphaMode', 'OPAQUE')
+    cutoff = material.get('alphaCutoff', 0.5) if alpha_mode == 'MASK' else None
+    return alpha_mode, cutoff, material.get('doubleSided', False)
+
+
+def atlas_blocker(glb, material):
+    """Why a material cannot go into an atlas, or None."""
+    document = glb.json
+    if material.get('extensions'):
+        return 'extensions'
+    for slot in SLOTS:
+        info = slot_info(material, slot)
+        if not info:
+            continue
+        if info.get('texCoord', 0) != 0:
+            return f'{slot} uses another UV set'
+        if info.get('extensions'):
+            return f'{slot} has a texture transform'
+        texture = document['textures'][info['index']]
+        if 'source' not in texture or 'bufferView' not in document['images'][texture['source']]:
+            return f'{slot} image is not embedded'
+        if document.get('samplers') and texture.get('sampler') is not None:
+            if document['samplers'][texture['sampler']].get('magFilter') == NEAREST_FILTER:
+                return f'{slot} is nearest-filtered'
+    return None
+
+
+def material_key(glb, material):
+    """Identity of a material across files: its factors plus its image bytes."""
+    document = glb.json
+    key = copy.deepcopy({k: v for k, v in material.items() if k not in ('name', 'extras')})
+    for slot in SLOTS:
+        info = slot_info(key, slot)
+        if info:
+            source = document['textures'][info['index']]['source']
+            info['index'] = hashlib.sha1(image_bytes(glb, source)).hexdigest()
+    return json.dumps(key, sort_keys=True)
+
+
+def primitive_uvs_fit(glb, prim, textured):
+    """True when the primitive's TEXCOORD_0 stays inside 0-1 (or it needs none)."""
+    if prim.get('mode', TRIANGLES) != TRIANGLES:
+        return False
+    uv_index = prim['attributes'].get('TEXCOORD_0')
+    if uv_index is None:
+        return not textured
+    uv = read_accessor_float(glb, uv_index)
+    return not len(uv) or (uv.min() >= -UV_TOLERANCE and uv.max() <= 1 + UV_TOLERANCE)
+
+
+def tile_size(glb, material, max_tile):
+    document = glb.json
+    sizes = []
+    for slot in SLOTS:
+        info = slot_info(material, slot)
+        if info:
+            size = image_size(image_bytes(glb, document['textures'][info['index']]['source']))
+            if size:
+                sizes.append(size)
+    if not sizes:
+        return FLAT_TILE, FLAT_TILE
+    width, height = max(sizes, key=lambda s: s[0] * s[1])
+    scale = min(1.0, max_tile / max(width, height))
+    return max(FLAT_TILE, round(width * scale)), max(FLAT_TILE, round(height * scale))
+
+
+def scan_kit(glb_files, max_tile):
+    """
+    Read a kit. Returns (files, entries): files maps path -> (glb, {material
+    index: entry key}) and entries maps key -> entry dict for every
+    atlasable unique material.
+    """
+    files = {}
+    entries = {}
+    rejected = set()
+    for glb_path in glb_files:
+        glb = read_glb(glb_path)
+        extras = glb.json.get('asset', {}).get('extras', {})
+        if 'atlas' in extras or 'progressiveTextures' in extras:
+            files[glb_path] = (glb, None)
+            continue
+        materials = glb.json.get('materials', [])
+        keys = {}
+        for i, material in enumerate(materials):
+            reason = atlas_blocker(glb, material)
+            if reason:
+                print(f"    {glb_path.name}: {material.get('name', i)} kept ({reason})")
+                continue
+            keys[i] = material_key(glb, material)
+
+        for mesh in glb.json.get('meshes', []):
+            for prim in mesh.get('primitives', []):
+                m = prim.get('material')
+                if m in keys:
+                    textured = any(slot_info(materials[m], slot) for slot in SLOTS)
+                    if not primitive_uvs_fit(glb, prim, textured):
+                        print(f"    {glb_path.name}: {materials[m].get('name', m)} kept (UVs outside 0-1)")
+                        rejected.add(keys.pop(m))
+
+        for i, key in keys.items():
+            if key not in entries:
+                entries[key] = {
+                    'material': materials[i],
+                    'glb': glb,
+                    'size': tile_size(glb, materials[i], max_tile),
+                    'state': blend_state(materials[i]),
+                }
+        files[glb_path] = (glb, keys)
+
+    # A material rejected in one file is kept everywhere, so copies stay identical
+    for key in rejected:
+        entries.pop(key, None)
+    for glb, keys in files.values():
+        if keys:
+            for i in [i for i, key in keys.items() if key in rejected]:
+                del keys[i]
+    return files, entries
+
+
+def cell(length, padding):
+    return -(-(length + 2 * padding) // GRID) * GRID
+
+
+def shelf_pack(sizes, page_size, padding):
+    """
+    Place (width, height) tiles on pages of page_size. Returns per-tile
+    (page, x, y) of the tile's top-left texel, and per-page used (width, height).
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    placements = [None] * len(sizes)
+    pages = []          # [used_w, used_h, shelf_y, shelf_h, cursor_x]
+    for i in order:
+        w, h = cell(sizes[i][0], padding), cell(sizes[i][1], padding)
+        if w > page_size or h > page_size:
+            raise ValueError(f'tile {sizes[i][0]}x{sizes[i][1]} does not fit a {page_size} px page')
+        for p, page in enumerate(pages):
+            if page[4] + w <= page_size and page[2] + h <= page_size and h <= page[3]:
+                break
+            if page[2] + page[3] + h <= page_size:
+                page[2] += page[3]
+                page[3], page[4] = h, 0
+                break
+        else:
+            pages.append([0, 0, 0, h, 0])
+            p, page = len(pages) - 1, pages[-1]
+        placements[i] = (p, page[4] + padding, page[2] + padding)
+        page[4] += w
+        page[0] = max(page[0], page[4])
+        page[1] = max(page[1], page[2] + h)
+    return placements, [(page[0], page[1]) for page in pages]
+
+
+def power_of_two(value):
+    return 1 << max(0, (int(value) - 1).bit_length())
+
+
+def tile_pixels(entry, slot, width, height, decoded):
+    """One atlas slot's pixels for a material tile, factors baked in."""
+    glb, material = entry['glb'], entry['material']
+    document = glb.json
+    pbr = material.get('pbrMetallicRoughness', {})
+
+    def sample(slot_name):
+        info = slot_info(material, slot_name)
+        if not info:
+            return None
+        image = document['textures'][info['index']]['source']
+        if (id(glb), image) not in decoded:
+            data = image_bytes(glb, image)
+            decoded[id(glb), image] = decode_image(data, document['images'][image].get('mimeType')
+                                                   or sniff_mime_type(data))
+        return resize_pixels(decoded[id(glb), image], width, height)
+
+    if slot == 'color':
+        factor = np.array(pbr.get('baseColorFactor', [1, 1, 1, 1]), dtype=np.float32)
+        pixels = sample('baseColor')
+        if pixels is None:
+            pixels = np.ones((height, width, 4), dtype=np.float32)
+        rgb = linear_to_srgb(srgb_to_linear(pixels[:, :, :3]) * factor[:3])
+        return np.dstack([rgb, pixels[:, :, 3] * factor[3]]).astype(np.float32)
+
+    if slot == 'orm':
+        orm = np.ones((height, width, 3), dtype=np.float32)
+        occlusion = sample('occlusion')
+        if occlusion is not None:
+            strength = material['occlusionTexture'].get('strength', 1.0)
+            orm[:, :, 0] = 1.0 + strength * (occlusion[:, :, 0] - 1.0)
+        metal_rough = sample('metallicRoughness')
+        if metal_rough is not None:
+            orm[:, :, 1:] = metal_rough[:, :, 1:3]
+        orm[:, :, 1] *= pbr.get('roughnessFactor', 1.0)
+        orm[:, :, 2] *= pbr.get('metallicFactor', 1.0)
+        return orm
+
+    if slot == 'normal':
+        pixels = sample('normal')
+        if pixels is None:
+            return np.tile(np.float32([0.5, 0.5, 1.0]), (height, width, 1))
+        normals = pixels[:, :, :3] * 2.0 - 1.0
+        normals[:, :, :2] *= material['normalTexture'].get('scale', 1.0)
+        normals /= np.maximum(np.linalg.norm(normals, axis=2, keepdims=True), 1e-6)
+        return (normals * 0.5 + 0.5).astype(np.float32)
+
+    factor = np.array(material.get('emissiveFactor', [0, 0, 0]), dtype=np.float32)
+    pixels = sample('emissive')
+    if pixels is None:
+        pixels = np.ones((height, width, 4), dtype=np.float32)
+    return linear_to_srgb(srgb_to_linear(pixels[:, :, :3]) * factor).astype(np.float32)
+
+
+def page_slots(entries):
+    """Atlas slots a page needs for these materials."""
+    slots = ['color', 'orm']
+    if any(slot_info(e['material'], 'normal') for e in entries):
+        slots.append('normal')
+    if any(slot_info(e['material'], 'emissive') or any(e['material'].get('emissiveFactor', [0, 0, 0]))
+           for e in entries):
+        slots.append('emissive')
+    return slots
+
+
+def state_label(state):
+    alpha_mode, _, double_sided = state
+    return alpha_mode.lower() + ('_2s' if double_sided else '')
+
+
+def build_pages(kit_name, entries, args, atlas_dir, dry_run):
+    """
+    Pack and render the atlas pages. Sets entry['page'] and entry['rect']
+    (u0, v0, du, dv) on every entry that was placed. Returns the page dicts.
+    """
+    groups = {}
+    for entry in entries.values():
+        groups.setdefault(entry['state'], []).append(entry)
+
+    pages = []
+    decoded = {}
+    for state, members in sorted(groups.items(), key=lambda item: state_label(item[0])):
+        if len(members) < 2:
+            continue
+        placements, used = shelf_pack([e['size'] for e in members], args.size, args.padding)
+        first_page = len(pages)
+        for p, (used_w, used_h) in enumerate(used):
+            on_page = [(e, pl) for e, pl in zip(members, placements) if pl[0] == p]
+            width, height = power_of_two(used_w), power_of_two(used_h)
+            slots = page_slots([e for e, _ in on_page])
+            page = {
+                'name': f"{kit_name}_{state_label(state)}_{p}",
+                'state': state,
+                'size': (width, height),
+                'slots': slots,
+                'materials': len(on_page),
+                'files': {},
+            }
+            pixels = {}
+            if not dry_run:
+                channels = {'color': 4, 'orm': 3, 'normal': 3, 'emissive': 3}
+                pixels = {slot: np.zeros((height, width, channels[slot]), dtype=np.float32) for slot in slots}
+            for entry, (_, x, y) in on_page:
+                w, h = entry['size']
+                entry['page'] = first_page + p
+                entry['rect'] = (x / width, y / height, w / width, h / height)
+                pad = args.padding
+                for slot in pixels:
+                    tile = np.pad(tile_pixels(entry, slot, w, h, decoded), ((pad, pad), (pad, pad), (0, 0)),
+                                  mode='edge')
+                    pixels[slot][y - pad:y + h + pad, x - pad:x + w + pad] = tile
+            if pixels:
+                digest = hashlib.sha1(b''.join(pixels[s].tobytes() for s in slots)).hexdigest()[:8]
+                atlas_dir.mkdir(parents=True, exist_ok=True)
+                for slot in slots:
+                    filename = f"{page['name']}_{slot}_{digest}.png"
+                    (atlas_dir / filename).write_bytes(encode_image(pixels[slot], 'image/png'))
+                    page['files'][slot] = atlas_dir / filename
+            pages.append(page)
+    return pages
+
+
+def atlas_material(glb, glb_path, page):
+    """Add a page's shared material (and its URI images) to one GLB."""
+    document = glb.json
+    samplers = document.setdefault('samplers', [])
+    samplers.append(dict(ATLAS_SAMPLER))
+    textures = {}
+    for slot, path in page['files'].items():
+        images = document.setdefault('images', [])
+        images.append({
+            'name': path.stem,
+            'mimeType': 'image/png',
+            'uri': Path(os.path.relpath(path, glb_path.parent)).as_posix(),
+        })
+        document.setdefault('textures', []).append({'source': len(images) - 1, 'sampler': len(samplers) - 1})
+        textures[slot] = {'index': len(document['textures']) - 1}
+
+    alpha_mode, cutoff, double_sided = page['state']
+    material = {
+        'name': page['name'],
+        'pbrMetallicRoughness': {
+            'baseColorTexture': textures['color'],
+            'metallicRoughnessTexture': textures['orm'],
+        },
+        'occlusionTexture': dict(textures['orm']),
+    }
+    if 'normal' in textures:
+        material['normalTexture'] = textures['normal']
+    if 'emissive' in textures:
+        material['emissiveTexture'] = textures['emissive']
+        material['emissiveFactor'] = [1.0, 1.0, 1.0]
+    if alpha_mode != 'OPAQUE':
+        material['alphaMode'] = alpha_mode
+    if cutoff is not None:
+        material['alphaCutoff'] = cutoff
+    if double_sided:
+        material['doubleSided'] = True
+    material['extras'] = {'atlas': page['name']}
+    document.setdefault('materials', []).append(material)
+    return len(document['materials']) - 1
+
+
+def remap_glb(glb_path, glb, keys, entries, pages):
+    """Point one GLB's atlased primitives at the shared materials. Returns materials replaced."""
+    document = glb.json
+    placed = {i: entries[key] for i, key in keys.items() if key in entries and 'page' in entries[key]}
+    if not placed:
+        return 0
+    page_materials = {}
+    for mesh in document.get('meshes', []):
+        for prim in mesh.get('primitives', []):
+            entry = placed.get(prim.get('material'))
+            if entry is None:
+                continue
+            u0, v0, du, dv = entry['rect']
+            attributes = prim['attributes']
+            if 'TEXCOORD_0' in attributes:
+                uv = np.clip(read_accessor_float(glb, attributes['TEXCOORD_0']), 0.0, 1.0)
+            else:
+                count = document['accessors'][attributes['POSITION']]['count']
+                uv = np.full((count, 2), 0.5, dtype=np.float32)
+            uv = (uv * [du, dv] + [u0, v0]).astype(np.float32)
+            attributes['TEXCOORD_0'] = add_accessor(glb, uv, ARRAY_BUFFER)
+            if entry['page'] not in page_materials:
+                page_materials[entry['page']] = atlas_material(glb, glb_path, pages[entry['page']])
+            prim['material'] = page_materials[entry['page']]
+
+    # Keep only materials a primitive still uses
+    materials = document['materials']
+    used = sorted({p['material'] for m in document['meshes'] for p in m.get('primitives', []) if 'material' in p})
+    remap = {old: new for new, old in enumerate(used)}
+    document['materials'] = [materials[i] for i in used]
+    for mesh in document['meshes']:
+        for prim in mesh.get('primitives', []):
+            if 'material' in prim:
+                prim['material'] = remap[prim['material']]
+    remove_unused_images(glb, set(range(len(document.get('images', [])))))
+    samplers_used = {t['sampler'] for t in document.get('textures', []) if 'sampler' in t}
+    if document.get('samplers'):
+        sampler_remap = {old: new for new, old in enumerate(sorted(samplers_used))}
+        document['samplers'] = [document['samplers'][i] for i in sorted(samplers_used)]
+        for texture in document['textures']:
+            if 'sampler' in texture:
+                texture['sampler'] = sampler_remap[texture['sampler']]
+    document['asset'].setdefault('extras', {})['atlas'] = {
+        'version': 1,
+        'pages': sorted(pages[p]['name'] for p in page_materials),
+        'materialsReplaced': len(placed),
+    }
+    compact(glb)
+    write_glb(glb_path, glb)
+    return len(placed)
+
+
+def atlas_kit(kit_dir, args):
+    """Atlas one kit directory. Returns {path: status}."""
+    kit_dir = Path(kit_dir)
+    glb_files = sorted(p for p in kit_dir.rglob('*') if p.suffix.lower() == '.glb')
+    print(f"\n{kit_dir.name}: scanning {len(glb_files)} GLB files...")
+    files, entries = scan_kit(glb_files, args.max_tile)
+    pages = build_pages(kit_dir.name, entries, args, kit_dir / ATLAS_DIR, args.dry_run)
+    for page in pages:
+        width, height = page['size']
+        print(f"    page {page['name']}: {width}x{height}, {page['materials']} materials, "
+              f"{'/'.join(page['slots'])}")
+
+    statuses = {}
+    for i, (glb_path, (glb, keys)) in enumerate(sorted(files.items())):
+        if keys is None:
+            status = 'UNCHANGED'
+        elif not any(key in entries and 'page' in entries[key] for key in keys.values()):
+            status = 'NOTHING_TO_ATLAS'
+        elif args.dry_run:
+            status = 'DRY_RUN'
+        else:
+            replaced = remap_glb(glb_path, glb, keys, entries, pages)
+            status = 'ATLASED'
+            print(f"  [{i+1}/{len(files)}] {glb_path.name} [{status}] {replaced} materials")
+            statuses[glb_path] = status
+            continue
+        print(f"  [{i+1}/{len(files)}] {glb_path.name} [{status}]")
+        statuses[glb_path] = status
+    return statuses
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Pack kit materials into shared texture atlases and remap UVs')
+    parser.add_argument('kits', nargs='+', help='Kit directories (each is atlased separately)')
+    parser.add_argument('--size', type=int, default=2048, help='Maximum atlas page size in px (default: 2048)')
+    parser.add_argument('--max-tile', type=int, default=512, help='Maximum tile size in px (default: 512)')
+    parser.add_argument(
+        '--padding', type=int, default=8,
+        help='Gutter around each tile in px; mips stay clean down to about this size (default: 8)')
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Report the packing without writing atlases or GLBs')
+    return parser.parse_args(raw_args)
+
+
+def main():
+    args = parse_args(get_args())
+    counts = {}
+    for kit_dir in args.kits:
+        try:
+            statuses = atlas_kit(kit_dir, args)
+        except Exception as e:
+            print(f"    ERROR: {e}")
+            statuses = {kit_dir: 'FAILED'}
+        for status in statuses.values():
+            counts[status] = counts.get(status, 0) + 1
+
+    print(f"\n=== ATLAS SUMMARY ===")
+    for status, count in sorted(counts.items()):
+        print(f"{status}: {count}")
+    if counts.get('FAILED'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
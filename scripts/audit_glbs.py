@@ -1,6 +1,17 @@
 """
 Blender headless GLB audit script.
-Usage: blender --background --python scripts/audit_glbs.py -- /path/to/models/
+Usage: blender --background --python scripts/audit_glbs.py -- /path/to/models/ [report.json]
+       blender --background --python scripts/audit_glbs.py -- dir_a/ dir_b/ model.glb report.json
+       blender --background --python scripts/audit_glbs.py -- models/ --db audit.sqlite --force
+
+Each path may be a directory (searched recursively) or a single .glb file.
+A trailing argument ending in .json is the report path.
+
+Results are stored in the asset database (asset_db.py, default
+.asset-pipeline/assets.sqlite) keyed by content hash and LOD category (the
+GPU budget depends on it); files whose exact bytes were already audited in
+the same category are not re-imported unless --force is given. The JSON
+report is generated from the database for this run.
 """
 import bpy
 import sys
@@ -8,13 +19,34 @@ import json
 import os
 import mathutils
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from validate_glbs import validate_glb
+from gpu_cost import estimate_gpu_cost, budget_warnings, lod_category
+from normalize_scale import AUDIT_TINY, AUDIT_LARGE
+from glb_io import read_glb, collect_glbs
+import asset_db
+
+# Bump when audit_glb() output changes so cached results are recomputed
+AUDIT_VERSION = 3
+
 def get_args():
     argv = sys.argv
     if '--' in argv:
         return argv[argv.index('--') + 1:]
     return []
 
-def audit_glb(filepath):
+def audit_glb(filepath, category=None):
+    # Malformed accessor/skin data can crash the importer, so check it first
+    validation = validate_glb(filepath)
+    if validation['status'] == 'INVALID':
+        return {
+            'file': filepath,
+            'filename': os.path.basename(filepath),
+            'status': 'INVALID',
+            'errors': validation['errors'],
+            'warnings': validation['warnings'],
+        }
+
     bpy.ops.wm.read_homefile(use_empty=True)
     try:
         bpy.ops.import_scene.gltf(filepath=filepath)
@@ -34,6 +66,7 @@ def audit_glb(filepath):
     has_uvs = False
     material_count = 0
     material_names = []
+    mesh_details = []
 
     for obj in meshes:
         mesh = obj.data
@@ -41,6 +74,12 @@ def audit_glb(filepath):
         total_faces += len(mesh.polygons)
         if mesh.uv_layers:
             has_uvs = True
+        mesh_details.append({
+            'name': obj.name,
+            'vertices': len(mesh.vertices),
+            'faces': len(mesh.polygons),
+            'has_uvs': bool(mesh.uv_layers),
+        })
         for mat in obj.data.materials:
             if mat:
                 material_count += 1
@@ -55,14 +94,23 @@ def audit_glb(filepath):
     max_dim = max(bbox_size)
     status = 'OK'
     warnings = []
+    if category is None:
+        category = lod_category(asset_db.category_for(filepath))
+    try:
+        gpu = estimate_gpu_cost(read_glb(filepath), filepath)
+        gpu['category'] = category
+    except Exception as e:
+        # Blender imported it, so the audit still counts; only the estimate is missing
+        gpu = None
+        warnings.append(f'GPU cost not estimated: {e}')
     file_size = os.path.getsize(filepath)
 
-    if max_dim < 0.01:
+    if max_dim < AUDIT_TINY:
         status = 'TINY'
         warnings.append(f'Max dimension is {max_dim:.6f} - model appears tiny')
     elif max_dim < 0.1:
         warnings.append(f'Small model: max dimension {max_dim:.4f}')
-    elif max_dim > 100:
+    elif max_dim > AUDIT_LARGE:
         warnings.append(f'Large model: max dimension {max_dim:.2f}')
     if not has_uvs:
         warnings.append('No UV maps found')
@@ -70,12 +118,15 @@ def audit_glb(filepath):
         warnings.append('No materials assigned')
     if total_verts < 10:
         warnings.append(f'Very low vertex count: {total_verts}')
+    over_budget = budget_warnings(gpu, category) if gpu else []
+    warnings.extend(over_budget)
     if warnings and status == 'OK':
         status = 'WARNING'
 
-    return {
+    result = {
         'file': filepath,
         'filename': os.path.basename(filepath),
+        'file_size': file_size,
         'file_size_kb': round(file_size / 1024, 1),
         'status': status,
         'warnings': warnings,
@@ -85,55 +136,84 @@ def audit_glb(filepath):
         'total_faces': total_faces,
         'has_uvs': has_uvs,
         'material_count': material_count,
-        'materials': list(set(material_names)),
+        'materials': sorted(set(material_names)),
+        'meshes': mesh_details,
+        'images': [{'name': img.name, 'width': img.size[0], 'height': img.size[1]}
+                   for img in bpy.data.images if img.type == 'IMAGE'],
         'bbox_size': [round(s, 4) for s in bbox_size],
         'max_dimension': round(max_dim, 4),
+        'over_budget': bool(over_budget),
     }
+    if gpu:
+        result['gpu'] = gpu
+    return result
+
+def audit_file(db, run_id, filepath, base=None, force=False):
+    """
+    Audit one GLB through the asset database and record it in run run_id.
+    A stored result for the same bytes and LOD category is reused unless
+    force. Returns (result, cached).
+    """
+    category = asset_db.category_for(filepath, base)
+    # GPU budget warnings depend on the LOD category, not just the bytes
+    lod = lod_category(category)
+    digest = asset_db.audit_key(asset_db.content_hash(filepath), lod)
+    result = None if force else asset_db.cached_result(db, digest, AUDIT_VERSION)
+    cached = result is not None
+    if not cached:
+        result = audit_glb(filepath, lod)
+        asset_db.record_audit(db, digest, AUDIT_VERSION, result)
+    asset_db.record_file(db, run_id, filepath, category, digest, AUDIT_VERSION)
+    db.commit()
+    return result, cached
 
 def main():
     args = get_args()
+    force = '--force' in args
+    args = [a for a in args if a != '--force']
+    db_path = asset_db.DEFAULT_DB
+    if '--db' in args:
+        i = args.index('--db')
+        db_path = args[i + 1]
+        del args[i:i + 2]
     if not args:
-        print("Usage: blender --background --python audit_glbs.py -- /path/to/models/")
+        print("Usage: blender --background --python audit_glbs.py -- /path/to/models/ [report.json] "
+              "[--db audit.sqlite] [--force]")
         sys.exit(1)
-    models_dir = args[0]
-    output_file = args[1] if len(args) > 1 else os.path.join(os.path.dirname(models_dir), 'asset-quality-report.json')
-    glb_files = []
-    for root, dirs, files in os.walk(models_dir):
-        for f in files:
-            if f.lower().endswith('.glb'):
-                glb_files.append(os.path.join(root, f))
-    glb_files.sort()
-    print(f"\nAuditing {len(glb_files)} GLB files in {models_dir}...")
-    results = []
-    issues = []
+    if len(args) > 1 and args[-1].lower().endswith('.json'):
+        output_file = args[-1]
+        model_paths = args[:-1]
+    else:
+        model_paths = args
+        output_file = os.path.join(os.path.dirname(model_paths[0]), 'asset-quality-report.json')
+    # String paths: they end up in the JSON results
+    glb_files = [str(p) for p in collect_glbs(model_paths)]
+    print(f"\nAuditing {len(glb_files)} GLB files in {', '.join(model_paths)}...")
+    db = asset_db.open_db(db_path)
+    run_id = asset_db.start_run(db, 'audit_glbs', model_paths)
+    cached = 0
     for i, glb in enumerate(glb_files):
         print(f"  [{i+1}/{len(glb_files)}] {os.path.basename(glb)}...", end=' ', flush=True)
-        result = audit_glb(glb)
-        results.append(result)
-        if result['status'] != 'OK':
-            print(f"[{result['status']}]")
-            issues.append(result)
-        else:
-            print("OK")
-    summary = {
-        'total_files': len(glb_files),
-        'ok': sum(1 for r in results if r['status'] == 'OK'),
-        'warnings': sum(1 for r in results if r['status'] == 'WARNING'),
-        'tiny': sum(1 for r in results if r['status'] == 'TINY'),
-        'no_geometry': sum(1 for r in results if r['status'] == 'NO_GEOMETRY'),
-        'import_failed': sum(1 for r in results if r['status'] == 'IMPORT_FAILED'),
-    }
-    report = {'summary': summary, 'issues': issues, 'all_results': results}
+        base = next((p for p in model_paths if os.path.isdir(p) and
+                     os.path.abspath(glb).startswith(os.path.abspath(p) + os.sep)), None)
+        result, was_cached = audit_file(db, run_id, glb, base, force)
+        cached += was_cached
+        print("OK" if result['status'] == 'OK' else f"[{result['status']}]")
+    report = asset_db.build_report(asset_db.run_results(db, run_id))
+    summary = report['summary']
     with open(output_file, 'w') as f:
         json.dump(report, f, indent=2)
     print(f"\n=== AUDIT SUMMARY ===")
-    print(f"Total: {summary['total_files']}")
+    print(f"Total: {summary['total_files']} ({cached} unchanged since a previous audit)")
     print(f"OK: {summary['ok']}")
     print(f"Warnings: {summary['warnings']}")
     print(f"Tiny: {summary['tiny']}")
     print(f"No geometry: {summary['no_geometry']}")
     print(f"Import failed: {summary['import_failed']}")
+    print(f"Invalid: {summary['invalid']}")
+    print(f"Over GPU budget: {summary['over_budget']}")
     print(f"\nReport written to: {output_file}")
+    print(f"Database: {db_path} (run {run_id})")
 
 if __name__ == '__main__':
     main()
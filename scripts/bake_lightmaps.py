@@ -0,0 +1,477 @@
+"""
+Stellar Descent - Offline AO / Lightmap Baker
+
+Bakes ambient occlusion (and optionally a diffuse lightmap) for static
+environment pieces with Cycles on the CPU, so low-end devices can drop
+runtime SSAO and still get contact shadows in corridors and kit seams.
+
+For each GLB:
+  1. Static triangle primitives (no skin) are rebuilt as Blender meshes in
+     model space, one object per mesh (first instance).
+  2. A second UV set is generated with Lightmap Pack, all pieces in one atlas.
+  3. AO is baked into a --size texture; with --lightmap, sky + sun
+     irradiance is baked into a second texture.
+  4. Back in the GLB, vertices are split along the new UV seams, the UVs are
+     added as the next free TEXCOORD_n, and the bake is embedded as a texture
+     referenced from node.extras.bakedLighting.occlusionTexture (texCoord n)
+     on every node drawing a baked mesh; the lightmap goes in
+     node.extras.bakedLighting.lightmapTexture. Babylon exposes node extras
+     as metadata.
+
+Materials are not touched. Kit materials are shared across pieces (atlas
+pages from atlas_kits.py, deduplicated again by package_kit.py), and their
+occlusionTexture is the ORM texture, whose R channel is the authored AO. A
+per-piece bake in the material would replace that AO and give every piece
+its own material again.
+
+Nothing in the game reads node.extras.bakedLighting yet, so a baked kit
+only gains a UV set, seam vertices and a texture. The pipeline's bake-ao
+stage is opt-in (asset_pipeline.py --with bake-ao) until a runtime
+consumer binds the bake per placed piece.
+
+Everything else in the GLB is left untouched. The result is recorded in
+asset.extras.bakedLighting, so re-running on a baked GLB is a no-op.
+
+Bakes are cached in .asset-pipeline/bake-cache/ by a hash of the mesh data
+and bake settings: a re-converted kit whose geometry didn't change gets its
+bake back without running Cycles. With --jobs N the file list is split
+across N Blender processes, each with its share of the CPU threads.
+
+Usage:
+    blender --background --python scripts/bake_lightmaps.py -- public/assets/models/environment/station/
+    blender --background --python scripts/bake_lightmaps.py -- public/assets/models/environment/modular/ \\
+        --size 512 --samples 128 --lightmap --jobs 4
+
+Requires: Blender 3.6+ (Cycles), numpy
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import bpy
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import (read_glb, write_glb, collect_glbs, compact, read_accessor, read_accessor_float,
+                    add_accessor, add_buffer_view, index_dtype, world_matrices, transform_points,
+                    ARRAY_BUFFER, ELEMENT_ARRAY_BUFFER)
+from image_io import encode_image
+
+CACHE_DIR = SCRIPT_DIR.parent / '.asset-pipeline' / 'bake-cache'
+
+TRIANGLES = 4
+BAKE_MARGIN_PX = 4
+PACK_MARGIN = 0.2
+SUN_ROTATION = (math.radians(40), 0.0, math.radians(30))
+SUN_STRENGTH = 3.0
+SKY_STRENGTH = 0.5
+
+# Linear, mipmapped, clamped: atlas islands must not bleed across the border
+BAKE_SAMPLER = {'magFilter': 9729, 'minFilter': 9987, 'wrapS': 33071, 'wrapT': 33071}
+
+
+def get_args():
+    argv = sys.argv
+    if '--' in argv:
+        return argv[argv.index('--') + 1:]
+    return []
+
+
+# ---------------------------------------------------------------------------
+# GLB side
+# ---------------------------------------------------------------------------
+
+def bakeable_primitives(glb):
+    """
+    [(mesh index, primitive index, world matrix)] for static triangle
+    primitives. Meshes used by a skinned node are skipped; instanced meshes
+    are baked at their first instance.
+    """
+    nodes = glb.json.get('nodes', [])
+    meshes = glb.json.get('meshes', [])
+    skinned = {node['mesh'] for node in nodes if 'mesh' in node and 'skin' in node}
+    seen = set()
+    result = []
+    for node_index, matrix in sorted(world_matrices(glb).items()):
+        mesh_index = nodes[node_index].get('mesh')
+        if mesh_index is None or mesh_index in skinned or mesh_index in seen:
+            continue
+        seen.add(mesh_index)
+        for prim_index, prim in enumerate(meshes[mesh_index].get('primitives', [])):
+            if prim.get('mode', TRIANGLES) == TRIANGLES and 'POSITION' in prim.get('attributes', {}):
+                result.append((mesh_index, prim_index, matrix))
+    return result
+
+
+def primitive_triangles(glb, prim, matrix):
+    """Model-space positions (n, 3) and flat uint32 triangle indices."""
+    positions = transform_points(matrix, read_accessor_float(glb, prim['attributes']['POSITION']))
+    if 'indices' in prim:
+        indices = read_accessor(glb, prim['indices']).astype(np.uint32)
+    else:
+        indices = np.arange(len(positions), dtype=np.uint32)
+    return positions.astype(np.float32), indices[:len(indices) // 3 * 3]
+
+
+def mesh_hash(glb, prims, settings):
+    """Cache key: geometry of every baked primitive plus the bake settings."""
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode())
+    meshes = glb.json['meshes']
+    for mesh_index, prim_index, matrix in prims:
+        positions, indices = primitive_triangles(glb, meshes[mesh_index]['primitives'][prim_index], matrix)
+        digest.update(positions.tobytes())
+        digest.update(indices.tobytes())
+    return digest.hexdigest()
+
+
+def split_on_uvs(indices, loop_uvs):
+    """
+    Split vertices whose corners got different lightmap UVs.
+    Returns (source vertex per new vertex, new UVs (m, 2), new indices).
+    """
+    keys = np.column_stack([indices.astype(np.float64), loop_uvs.astype(np.float64)])
+    unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+    return unique[:, 0].astype(np.int64), unique[:, 1:].astype(np.float32), inverse.ravel().astype(np.uint32)
+
+
+def remap_accessor(glb, accessor_index, source):
+    accessor = glb.json['accessors'][accessor_index]
+    data = read_accessor(glb, accessor_index)[source]
+    return add_accessor(glb, data, ARRAY_BUFFER, normalized=accessor.get('normalized', False))
+
+
+def add_texture(glb, png_data, name):
+    document = glb.json
+    images = document.setdefault('images', [])
+    images.append({'name': name, 'mimeType': 'image/png', 'bufferView': add_buffer_view(glb, png_data)})
+    samplers = document.setdefault('samplers', [])
+    samplers.append(dict(BAKE_SAMPLER))
+    textures = document.setdefault('textures', [])
+    textures.append({'source': len(images) - 1, 'sampler': len(samplers) - 1})
+    return len(textures) - 1
+
+
+def apply_bake(glb, prims, splits, ao_png, lightmap_png, digest, stem):
+    """Write split geometry, the lightmap UV set and baked textures into the GLB."""
+    document = glb.json
+    meshes = document['meshes']
+    ao_texture = add_texture(glb, ao_png, f"{stem}_ao")
+    lightmap_texture = add_texture(glb, lightmap_png, f"{stem}_lightmap") if lightmap_png else None
+
+    uv_sets = set()
+    baked_meshes = {}
+    for (mesh_index, prim_index, _), (source, uvs, indices) in zip(prims, splits):
+        prim = meshes[mesh_index]['primitives'][prim_index]
+        attributes = prim['attributes']
+        uv_set = sum(1 for name in attributes if name.startswith('TEXCOORD_'))
+        for name in list(attributes):
+            attributes[name] = remap_accessor(glb, attributes[name], source)
+        for target in prim.get('targets', []):
+            for name in list(target):
+                target[name] = remap_accessor(glb, target[name], source)
+        attributes[f'TEXCOORD_{uv_set}'] = add_accessor(glb, uvs, ARRAY_BUFFER)
+        prim['indices'] = add_accessor(glb, indices.astype(index_dtype(len(source))), ELEMENT_ARRAY_BUFFER)
+        uv_sets.add(uv_set)
+        if baked_meshes.setdefault(mesh_index, uv_set) != uv_set:
+            print(f"    Warning: mesh {mesh_index} has primitives with different UV set counts; "
+                  f"using TEXCOORD_{baked_meshes[mesh_index]}")
+
+    # Materials stay shared (atlas pages, package_kit dedupe): the per-piece
+    # bake goes on the nodes that draw the baked meshes
+    for node in document.get('nodes', []):
+        uv_set = baked_meshes.get(node.get('mesh'))
+        if uv_set is None:
+            continue
+        baked = {'occlusionTexture': {'index': ao_texture, 'texCoord': uv_set}}
+        if lightmap_texture is not None:
+            baked['lightmapTexture'] = {'index': lightmap_texture, 'texCoord': uv_set}
+        node.setdefault('extras', {})['bakedLighting'] = baked
+
+    document.setdefault('asset', {}).setdefault('extras', {})['bakedLighting'] = {
+        'hash': digest,
+        'uvSets': sorted(uv_sets),
+        'lightmap': lightmap_texture is not None,
+    }
+    compact(glb)
+
+
+# ---------------------------------------------------------------------------
+# Blender side
+# ---------------------------------------------------------------------------
+
+def setup_scene(args):
+    bpy.ops.wm.read_homefile(use_empty=True)
+    scene = bpy.context.scene
+    scene.render.engine = 'CYCLES'
+    scene.cycles.device = 'CPU'
+    scene.cycles.samples = args.samples
+    if args.threads:
+        scene.render.threads_mode = 'FIXED'
+        scene.render.threads = args.threads
+    scene.render.bake.margin = BAKE_MARGIN_PX
+
+    world = bpy.data.worlds.new('BakeWorld')
+    world.use_nodes = True
+    background = world.node_tree.nodes['Background']
+    background.inputs['Color'].default_value = (1.0, 1.0, 1.0, 1.0)
+    background.inputs['Strength'].default_value = SKY_STRENGTH
+    world.light_settings.distance = args.ao_distance
+    scene.world = world
+
+    if args.lightmap:
+        sun = bpy.data.lights.new('BakeSun', 'SUN')
+        sun.energy = SUN_STRENGTH
+        sun_object = bpy.data.objects.new('BakeSun', sun)
+        sun_object.rotation_euler = SUN_ROTATION
+        scene.collection.objects.link(sun_object)
+    return scene
+
+
+def build_object(name, positions, indices, image):
+    """Blender mesh object whose loops follow the glTF index order exactly."""
+    mesh = bpy.data.meshes.new(name)
+    n_tris = len(indices) // 3
+    mesh.vertices.add(len(positions))
+    mesh.vertices.foreach_set('co', positions.ravel())
+    mesh.loops.add(len(indices))
+    mesh.loops.foreach_set('vertex_index', indices.astype(np.int32))
+    mesh.polygons.add(n_tris)
+    mesh.polygons.foreach_set('loop_start', np.arange(0, len(indices), 3, dtype=np.int32))
+    mesh.polygons.foreach_set('loop_total', np.full(n_tris, 3, dtype=np.int32))
+    mesh.update()
+    mesh.uv_layers.new(name='Lightmap')
+
+    material = bpy.data.materials.new(f"{name}_bake")
+    material.use_nodes = True
+    node = material.node_tree.nodes.new('ShaderNodeTexImage')
+    node.image = image
+    material.node_tree.nodes.active = node
+    mesh.materials.append(material)
+
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    return obj
+
+
+def bake_image(objects, image, bake_type, size):
+    """Bake into image and return its (size, size, 4) pixels, top row first."""
+    for obj in objects:
+        obj.active_material.node_tree.nodes.active.image = image
+    if bake_type == 'AO':
+        bpy.ops.object.bake(type='AO', margin=BAKE_MARGIN_PX, use_clear=True)
+    else:
+        bpy.ops.object.bake(type='DIFFUSE', pass_filter={'DIRECT', 'INDIRECT'},
+                            margin=BAKE_MARGIN_PX, use_clear=True)
+    pixels = np.empty(size * size * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels.reshape(size, size, 4)[::-1]
+
+
+def run_bake(glb, prims, args):
+    """Unwrap and bake in Blender. Returns (splits, ao png, lightmap png or None)."""
+    setup_scene(args)
+    meshes = glb.json['meshes']
+    ao_image = bpy.data.images.new('bake_ao', args.size, args.size, alpha=False)
+    ao_image.colorspace_settings.name = 'Non-Color'
+
+    objects, triangles = [], []
+    for i, (mesh_index, prim_index, matrix) in enumerate(prims):
+        positions, indices = primitive_triangles(glb, meshes[mesh_index]['primitives'][prim_index], matrix)
+        # Degenerate triangles confuse the unwrapper; they keep UV (0, 0)
+        tris = indices.reshape(-1, 3)
+        valid = (tris[:, 0] != tris[:, 1]) & (tris[:, 1] != tris[:, 2]) & (tris[:, 0] != tris[:, 2])
+        objects.append(build_object(f"piece_{i}", positions, tris[valid].ravel(), ao_image))
+        triangles.append((indices, np.repeat(valid, 3)))
+
+    bpy.ops.object.select_all(action='DESELECT')
+    for obj in objects:
+        obj.select_set(True)
+    bpy.context.view_layer.objects.active = objects[0]
+    bpy.ops.uv.lightmap_pack(PREF_CONTEXT='ALL_FACES', PREF_PACK_IN_ONE=True,
+                             PREF_NEW_UVLAYER=False, PREF_IMG_PX_SIZE=args.size,
+                             PREF_MARGIN_DIV=PACK_MARGIN)
+
+    ao = bake_image(objects, ao_image, 'AO', args.size)
+    ao_png = encode_image(np.dstack([ao[..., :1]] * 3), 'image/png')
+
+    lightmap_png = None
+    if args.lightmap:
+        lightmap_image = bpy.data.images.new('bake_lightmap', args.size, args.size, alpha=False)
+        lightmap_image.colorspace_settings.name = 'Non-Color'
+        lightmap = bake_image(objects, lightmap_image, 'DIFFUSE', args.size)
+        lightmap_png = encode_image(lightmap[..., :3], 'image/png')
+
+    splits = []
+    for obj, (indices, valid_loops) in zip(objects, triangles):
+        baked_uvs = np.empty(int(valid_loops.sum()) * 2, dtype=np.float32)
+        obj.data.uv_layers['Lightmap'].data.foreach_get('uv', baked_uvs)
+        loop_uvs = np.zeros((len(indices), 2), dtype=np.float32)
+        loop_uvs[valid_loops] = baked_uvs.reshape(-1, 2)
+        # Blender UVs have V up, glTF V down
+        loop_uvs[valid_loops, 1] = 1.0 - loop_uvs[valid_loops, 1]
+        splits.append(split_on_uvs(indices, loop_uvs))
+    return splits, ao_png, lightmap_png
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+def load_cached(digest):
+    path = CACHE_DIR / f"{digest}.npz"
+    if not path.exists():
+        return None
+    with np.load(path) as data:
+        count = int(data['count'])
+        splits = [(data[f'source_{i}'], data[f'uvs_{i}'], data[f'indices_{i}']) for i in range(count)]
+        lightmap = data['lightmap'].tobytes() if 'lightmap' in data else None
+        return splits, data['ao'].tobytes(), lightmap
+
+
+def store_cached(digest, splits, ao_png, lightmap_png):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    arrays = {'count': np.array(len(splits)), 'ao': np.frombuffer(ao_png, dtype=np.uint8)}
+    if lightmap_png:
+        arrays['lightmap'] = np.frombuffer(lightmap_png, dtype=np.uint8)
+    for i, (source, uvs, indices) in enumerate(splits):
+        arrays[f'source_{i}'] = source
+        arrays[f'uvs_{i}'] = uvs
+        arrays[f'indices_{i}'] = indices
+    # Write then rename so parallel shards never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix='.npz')
+    os.close(fd)
+    np.savez(tmp, **arrays)
+    os.replace(tmp, CACHE_DIR / f"{digest}.npz")
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def bake_glb(glb_path, args):
+    """Bake one GLB. Returns a short status string."""
+    glb = read_glb(glb_path)
+    if 'bakedLighting' in glb.json.get('asset', {}).get('extras', {}):
+        return 'ALREADY_BAKED'
+    prims = bakeable_primitives(glb)
+    if not prims:
+        return 'NO_STATIC_GEOMETRY'
+
+    settings = {'size': args.size, 'samples': args.samples, 'aoDistance': args.ao_distance,
+                'lightmap': args.lightmap}
+    digest = mesh_hash(glb, prims, settings)
+    cached = load_cached(digest)
+    if cached:
+        status = 'CACHED'
+        splits, ao_png, lightmap_png = cached
+    else:
+        status = 'BAKED'
+        splits, ao_png, lightmap_png = run_bake(glb, prims, args)
+        store_cached(digest, splits, ao_png, lightmap_png)
+
+    apply_bake(glb, prims, splits, ao_png, lightmap_png, digest, glb_path.stem)
+    write_glb(glb_path, glb)
+    return status
+
+
+def run_shards(glb_files, args, raw_args):
+    """Bake in --jobs Blender processes. Returns {path: status}."""
+    jobs = min(args.jobs, len(glb_files))
+    threads = max(1, (os.cpu_count() or 1) // jobs)
+    # Re-pass every option except paths and the parallelism settings
+    options = [a for a in raw_args if a not in map(str, args.paths)]
+    for flag in ('--jobs', '--threads'):
+        while flag in options:
+            i = options.index(flag)
+            del options[i:i + 2]
+
+    procs = []
+    for shard in range(jobs):
+        fd, status_file = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        cmd = [bpy.app.binary_path, '--background', '--factory-startup', '--python-exit-code', '1',
+               '--python', __file__, '--',
+               *map(str, glb_files[shard::jobs]), *options,
+               '--jobs', '1', '--threads', str(threads), '--status-file', status_file]
+        procs.append((subprocess.Popen(cmd), status_file, glb_files[shard::jobs]))
+
+    statuses = {}
+    for proc, status_file, shard_files in procs:
+        proc.wait()
+        try:
+            with open(status_file) as f:
+                statuses.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        os.remove(status_file)
+        for path in shard_files:
+            statuses.setdefault(str(path), 'FAILED')
+    return statuses
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Bake AO (and optionally lightmaps) into a second UV set of static GLBs')
+    parser.add_argument('paths', nargs='+', help='GLB files or directories')
+    parser.add_argument('--size', type=int, default=256, help='Bake texture size (default: 256)')
+    parser.add_argument('--samples', type=int, default=64, help='Cycles samples (default: 64)')
+    parser.add_argument(
+        '--ao-distance', type=float, default=1.0,
+        help='AO ray distance in metres (default: 1.0)')
+    parser.add_argument(
+        '--lightmap', action='store_true',
+        help='Also bake a sky + sun diffuse lightmap')
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=1,
+        help='Blender processes to bake in (default: 1)')
+    parser.add_argument('--threads', type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument('--status-file', default=None, help=argparse.SUPPRESS)
+    return parser.parse_args(raw_args)
+
+
+def main():
+    raw_args = get_args()
+    args = parse_args(raw_args)
+    glb_files = collect_glbs(args.paths)
+
+    if args.jobs > 1 and len(glb_files) > 1:
+        print(f"\nBaking {len(glb_files)} GLB files in {min(args.jobs, len(glb_files))} processes...")
+        statuses = run_shards(glb_files, args, raw_args)
+    else:
+        print(f"\nBaking {len(glb_files)} GLB files ({args.size}px, {args.samples} samples"
+              f"{', lightmap' if args.lightmap else ''})...")
+        statuses = {}
+        for i, glb_path in enumerate(glb_files):
+            print(f"  [{i+1}/{len(glb_files)}] {glb_path.name}")
+            try:
+                status = bake_glb(glb_path, args)
+            except Exception as e:
+                print(f"    ERROR: {e}")
+                status = 'FAILED'
+            print(f"    [{status}]")
+            statuses[str(glb_path)] = status
+        if args.status_file:
+            with open(args.status_file, 'w') as f:
+                json.dump(statuses, f)
+            return
+
+    counts = {}
+    for status in statuses.values():
+        counts[status] = counts.get(status, 0) + 1
+    print(f"\n=== BAKE SUMMARY ===")
+    for status, count in sorted(counts.items()):
+        print(f"{status}: {count}")
+    if counts.get('FAILED'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
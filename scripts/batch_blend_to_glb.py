@@ -2,16 +2,22 @@
 Blender headless script to batch convert .blend files to GLB.
 
 Usage:
-    blender --background --python batch_blend_to_glb.py -- /input/dir/ /output/dir/
+    blender --background --python batch_blend_to_glb.py -- /input/dir/ /output/dir/ [--up z] [--no-normalize]
 
 Note: Each .blend file is opened directly (not imported), then exported as GLB.
+Each export is then normalized (baked transforms, unit-scale fix for
+models the audit flags, optional Z-up fix) by normalize_scale.py.
 """
 
 import bpy
+import argparse
 import os
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent))
+from normalize_scale import normalize_glb, describe
+
 
 def get_args():
     argv = sys.argv
@@ -20,7 +26,7 @@ def get_args():
     return []
 
 
-def convert_blend_to_glb(blend_path, output_path):
+def convert_blend_to_glb(blend_path, output_path, normalize=True, up=None):
     """Open a .blend file and export all scene content as GLB."""
     try:
         bpy.ops.wm.open_mainfile(filepath=str(blend_path))
@@ -39,17 +45,31 @@ def convert_blend_to_glb(blend_path, output_path):
         print(f"  ERROR exporting {output_path}: {e}")
         return False
 
+    if normalize:
+        try:
+            status, info = normalize_glb(output_path, up=up)
+        except Exception as e:
+            print(f"  ERROR normalizing {output_path}: {e}")
+            return False
+        print(f"  [{status}] {describe(info)}")
     return True
 
 
-def main():
-    args = get_args()
-    if len(args) < 2:
-        print("Usage: blender --background --python batch_blend_to_glb.py -- /input/dir/ /output/dir/")
-        sys.exit(1)
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(description="Convert a directory of .blend files to GLB")
+    parser.add_argument("input_dir")
+    parser.add_argument("output_dir")
+    parser.add_argument("--up", choices=["y", "z"], default=None,
+                        help="Up axis of the sources (default: per category in normalize_scale.py)")
+    parser.add_argument("--no-normalize", action="store_true",
+                        help="Export as authored, without scale/axis normalization")
+    return parser.parse_args(raw_args)
 
-    input_dir = Path(args[0])
-    output_dir = Path(args[1])
+
+def main():
+    args = parse_args(get_args())
+    input_dir = Path(args.input_dir)
+    output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
     blend_files = sorted(input_dir.glob("*.blend"))
@@ -61,7 +81,7 @@ def main():
         stem = blend_path.stem
         out_path = output_dir / f"{stem}.glb"
         print(f"[{i+1}/{len(blend_files)}] Converting: {blend_path.name} -> {out_path.name}")
-        if convert_blend_to_glb(blend_path, out_path):
+        if convert_blend_to_glb(blend_path, out_path, not args.no_normalize, args.up):
             success += 1
         else:
             failed += 1
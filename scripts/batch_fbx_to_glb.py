@@ -1,10 +1,20 @@
 """
 Blender headless FBX -> GLB batch converter.
-Usage: blender --background --python scripts/batch_fbx_to_glb.py -- /input/dir/ /output/dir/
+Usage: blender --background --python scripts/batch_fbx_to_glb.py -- /input/dir/ /output/dir/ [--up z] [--no-normalize]
+
+Each export is normalized (baked transforms, unit-scale fix for models the
+audit flags, optional Z-up fix) by normalize_scale.py, and the vertices FBX splits at every face
+corner are merged by weld_vertices.py.
 """
 import bpy
+import argparse
 import sys
 import os
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from normalize_scale import normalize_glb, describe
+from weld_vertices import weld_glb, describe as describe_weld
 
 def get_args():
     argv = sys.argv
@@ -12,7 +22,7 @@ def get_args():
         return argv[argv.index('--') + 1:]
     return []
 
-def convert_fbx_to_glb(input_path, output_path):
+def convert_fbx_to_glb(input_path, output_path, normalize=True, up=None):
     bpy.ops.wm.read_homefile(use_empty=True)
     try:
         bpy.ops.import_scene.fbx(filepath=input_path)
@@ -32,20 +42,40 @@ def convert_fbx_to_glb(input_path, output_path):
             use_selection=False,
             export_apply=True,
         )
-        size_kb = os.path.getsize(output_path) / 1024
-        print(f"  OK ({size_kb:.0f} KB)")
-        return True
     except Exception as e:
         print(f"  ERROR exporting: {e}")
         return False
+    if normalize:
+        try:
+            status, info = normalize_glb(output_path, up=up)
+        except Exception as e:
+            print(f"  ERROR normalizing: {e}")
+            return False
+        print(f"  [{status}] {describe(info)}", end=' ')
+    try:
+        status, before, after = weld_glb(output_path)
+    except Exception as e:
+        print(f"  ERROR welding: {e}")
+        return False
+    print(f"[{status}] {describe_weld(before, after)}", end=' ')
+    size_kb = os.path.getsize(output_path) / 1024
+    print(f"  OK ({size_kb:.0f} KB)")
+    return True
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(description='Convert a directory of FBX files to GLB')
+    parser.add_argument('input_dir')
+    parser.add_argument('output_dir')
+    parser.add_argument('--up', choices=['y', 'z'], default=None,
+                        help='Up axis of the sources (default: per category in normalize_scale.py)')
+    parser.add_argument('--no-normalize', action='store_true',
+                        help='Export as imported, without scale/axis normalization')
+    return parser.parse_args(raw_args)
 
 def main():
-    args = get_args()
-    if len(args) < 2:
-        print("Usage: blender --background --python batch_fbx_to_glb.py -- /input/dir/ /output/dir/")
-        sys.exit(1)
-    input_dir = args[0]
-    output_dir = args[1]
+    args = parse_args(get_args())
+    input_dir = args.input_dir
+    output_dir = args.output_dir
     os.makedirs(output_dir, exist_ok=True)
     fbx_files = []
     for root, dirs, files in os.walk(input_dir):
@@ -60,7 +90,7 @@ def main():
         name = os.path.splitext(os.path.basename(fbx))[0]
         output_path = os.path.join(output_dir, f"{name}.glb")
         print(f"  [{i+1}/{len(fbx_files)}] {name}.fbx -> {name}.glb", end=' ', flush=True)
-        if convert_fbx_to_glb(fbx, output_path):
+        if convert_fbx_to_glb(fbx, output_path, not args.no_normalize, args.up):
             success += 1
         else:
             failed += 1
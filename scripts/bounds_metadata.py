@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Stellar Descent - Bounding Volume Metadata
+
+Precomputes bounds for every GLB so the loader can start frustum culling and
+LOD distance checks immediately, instead of waiting for Babylon to walk the
+vertex data of hundreds of modular pieces. Writes a compact sidecar next to
+each model:
+
+  <name>.bounds.json
+
+With --embed, the same data is also written into the GLB as glTF `extras`
+(asset.extras.bounds, meshes[i].extras.bounds, nodes[i].extras.bounds).
+
+Sidecar format (glTF space, Y-up, metres):
+    {
+      "version": 1,
+      "glb": "Wall_5.glb",
+      "aabb": {"min": [x, y, z], "max": [x, y, z]},
+      "sphere": {"center": [x, y, z], "radius": r},
+      "pivotOffset": [x, y, z],
+      "meshes": [
+        {"mesh": 0, "name": "Wall_5", "aabb": {...}, "sphere": {...}}
+      ],
+      "nodes": [
+        {"node": 1, "name": "Wall_5", "mesh": 0, "aabb": {...}, "sphere": {...},
+         "pivotOffset": [x, y, z]}
+      ]
+    }
+
+Mesh bounds are in the mesh's local space, node and model bounds in model
+space with all node transforms applied. `pivotOffset` is the node (or model)
+origin relative to the centre of its AABB. Skinned meshes are measured in
+their bind pose.
+
+Usage:
+    python3 scripts/bounds_metadata.py public/assets/models/
+    python3 scripts/bounds_metadata.py public/assets/models/environment/station/ --embed
+
+Runs with plain Python 3 + numpy (no Blender needed).
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import read_glb, write_glb, collect_glbs, read_accessor_float, world_matrices, transform_points
+
+
+def round_list(values, digits=4):
+    # + 0.0 turns -0.0 into 0.0
+    return [round(float(v), digits) + 0.0 for v in np.asarray(values).ravel()]
+
+
+def bounds_of(points):
+    """AABB and centre-of-box bounding sphere of an (n, 3) array."""
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    center = (lo + hi) / 2
+    radius = np.sqrt(((points - center) ** 2).sum(axis=1).max())
+    return {
+        'aabb': {'min': round_list(lo), 'max': round_list(hi)},
+        'sphere': {'center': round_list(center), 'radius': round(float(radius), 4)},
+    }
+
+
+def mesh_positions(glb, mesh):
+    """All POSITION data of a mesh's primitives, concatenated."""
+    arrays = [read_accessor_float(glb, prim['attributes']['POSITION'])
+              for prim in mesh.get('primitives', [])
+              if 'POSITION' in prim.get('attributes', {})]
+    if not arrays:
+        return None
+    return np.concatenate(arrays)
+
+
+def compute_bounds(glb):
+    """Build the bounds document for a parsed GLB, or None if it has no geometry."""
+    meshes = glb.json.get('meshes', [])
+    nodes = glb.json.get('nodes', [])
+    local_positions = [mesh_positions(glb, mesh) for mesh in meshes]
+
+    mesh_entries = []
+    for i, positions in enumerate(local_positions):
+        if positions is None:
+            continue
+        mesh_entries.append({'mesh': i, 'name': meshes[i].get('name', ''), **bounds_of(positions)})
+
+    node_entries = []
+    all_points = []
+    for node_index, matrix in sorted(world_matrices(glb).items()):
+        node = nodes[node_index]
+        if 'mesh' not in node or local_positions[node['mesh']] is None:
+            continue
+        # Skinned vertices are already in model space in their bind pose
+        if 'skin' in node:
+            points = local_positions[node['mesh']]
+        else:
+            points = transform_points(matrix, local_positions[node['mesh']])
+        all_points.append(points)
+        entry = {'node': node_index, 'name': node.get('name', ''), 'mesh': node['mesh'],
+                 **bounds_of(points)}
+        center = np.array(entry['sphere']['center'])
+        entry['pivotOffset'] = round_list(matrix[:3, 3] - center)
+        node_entries.append(entry)
+
+    if not all_points:
+        return None
+    model = bounds_of(np.concatenate(all_points))
+    return {
+        **model,
+        'pivotOffset': round_list(-np.array(model['sphere']['center'])),
+        'meshes': mesh_entries,
+        'nodes': node_entries,
+    }
+
+
+def process_glb(glb_path, embed=False, dry_run=False):
+    """Write bounds for one GLB. Returns (path, status, max dimension)."""
+    try:
+        glb = read_glb(glb_path)
+        bounds = compute_bounds(glb)
+    except Exception as e:
+        return glb_path, f'FAILED: {e}', 0.0
+    if bounds is None:
+        return glb_path, 'NO_GEOMETRY', 0.0
+
+    size = np.array(bounds['aabb']['max']) - np.array(bounds['aabb']['min'])
+    if dry_run:
+        return glb_path, 'OK', float(size.max())
+
+    sidecar = {'version': 1, 'glb': glb_path.name, **bounds}
+    with open(glb_path.with_suffix('.bounds.json'), 'w') as f:
+        json.dump(sidecar, f, separators=(',', ':'))
+
+    if embed:
+        document = glb.json
+        extras = document.setdefault('asset', {}).setdefault('extras', {})
+        extras['bounds'] = {k: bounds[k] for k in ('aabb', 'sphere', 'pivotOffset')}
+        for entry in bounds['meshes']:
+            document['meshes'][entry['mesh']].setdefault('extras', {})['bounds'] = {
+                'aabb': entry['aabb'], 'sphere': entry['sphere']}
+        for entry in bounds['nodes']:
+            document['nodes'][entry['node']].setdefault('extras', {})['bounds'] = {
+                'aabb': entry['aabb'], 'sphere': entry['sphere'],
+                'pivotOffset': entry['pivotOffset']}
+        write_glb(glb_path, glb)
+    return glb_path, 'OK', float(size.max())
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Write per-GLB bounding volume sidecars')
+    parser.add_argument('paths', nargs='+', help='GLB files or directories')
+    parser.add_argument(
+        '--embed', action='store_true',
+        help='Also write bounds into the GLB as glTF extras')
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=None,
+        help='Worker processes (default: CPU count)')
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Compute bounds without writing anything')
+    return parser.parse_args(raw_args)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    glb_files = collect_glbs(args.paths)
+    print(f"\nComputing bounds for {len(glb_files)} GLB files...")
+
+    counts = {}
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(process_glb, p, args.embed, args.dry_run) for p in glb_files]
+        for i, future in enumerate(futures):
+            glb_path, status, max_dim = future.result()
+            key = status.split(':')[0]
+            counts[key] = counts.get(key, 0) + 1
+            detail = f" (max dimension {max_dim:.3f})" if status == 'OK' else ''
+            print(f"  [{i+1}/{len(glb_files)}] {glb_path.name} [{status}]{detail}")
+
+    print(f"\n=== BOUNDS SUMMARY ===")
+    for status, count in sorted(counts.items()):
+        print(f"{status}: {count}")
+    if counts.get('FAILED'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Stellar Descent - Bump to Normal Map Converter
+
+Source models (the marines in particular) ship greyscale bump/height maps in
+the normalTexture slot, or as loose images next to the material. glTF
+renderers read that slot as a tangent-space normal map, so a height map there
+either shades wrongly or has to be turned into normals per fragment. This
+converts height maps to proper normal maps offline:
+
+  - Gradients come from a 3x3 Sobel filter. Edges wrap, because textures
+    tile. --strength scales the slope (height units per pixel).
+  - X and Y follow the glTF convention (+X right, +Y up, OpenGL style). Z is
+    rebuilt from them as sqrt(1 - x^2 - y^2).
+  - The image stores full XYZ (Babylon's glTF loader samples normal maps
+    as RGB) and is marked with extras.normalEncoding = "xyz" and
+    extras.zReconstructible = true: B carries nothing X and Y don't, so a
+    GPU compression step may drop it (BC5 / EAC RG) and rebuild Z in the
+    shader.
+
+A normalTexture image counts as a height map when its pixels are greyscale,
+so real normal maps and already converted images are left alone. Loose
+images that classify_texture() labels 'bump' are wired in as the normal map
+when the GLB has a single material that has none. GLBs already split by
+split_textures.py are skipped.
+
+Usage:
+    blender --background --python scripts/bump_to_normal.py -- public/assets/models/npcs/marine/
+    blender --background --python scripts/bump_to_normal.py -- model.glb --strength 4 --dry-run
+
+Requires: Blender 3.6+, numpy
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import (
+    read_glb, write_glb, collect_glbs, compact, image_bytes, set_image_bytes, texture_usages,
+)
+from image_io import sniff_mime_type, decode_image, encode_image
+from retexture_marines import classify_texture
+
+# Max channel spread (0-1) for a pixel to count as grey
+GREY_TOLERANCE = 2.0 / 255.0
+
+
+def get_args():
+    argv = sys.argv
+    if '--' in argv:
+        return argv[argv.index('--') + 1:]
+    return []
+
+
+def is_height_map(pixels):
+    """True when (nearly) every pixel has R = G = B."""
+    rgb = pixels[:, :, :3]
+    spread = rgb.max(axis=2) - rgb.min(axis=2)
+    return np.mean(spread <= GREY_TOLERANCE) > 0.99
+
+
+def height_to_normal(height, strength):
+    """(h, w) heights in 0-1 -> (h, w, 3) unit normals, rows top-down."""
+    def shifted(dy, dx):
+        return np.roll(height, (dy, dx), axis=(0, 1))
+
+    # Sobel, normalised so a ramp of 1 per pixel gives a gradient of 1
+    right = shifted(-1, -1) + 2 * shifted(0, -1) + shifted(1, -1)
+    left = shifted(-1, 1) + 2 * shifted(0, 1) + shifted(1, 1)
+    below = shifted(-1, -1) + 2 * shifted(-1, 0) + shifted(-1, 1)
+    above = shifted(1, -1) + 2 * shifted(1, 0) + shifted(1, 1)
+    dx = (right - left) / 8.0
+    dy = (above - below) / 8.0       # +Y is up the image
+
+    normals = np.stack([-strength * dx, -strength * dy, np.ones_like(height)], axis=2)
+    normals /= np.linalg.norm(normals, axis=2, keepdims=True)
+    return normals
+
+
+def encode_normals(normals):
+    """Unit normals -> RGB 0-1, with Z rebuilt from the stored XY."""
+    xy = normals[:, :, :2]
+    z = np.sqrt(np.clip(1.0 - np.sum(xy * xy, axis=2, keepdims=True), 0.0, 1.0))
+    return np.concatenate([xy * 0.5 + 0.5, z * 0.5 + 0.5], axis=2).astype(np.float32)
+
+
+def loose_bump_images(glb):
+    used = texture_usages(glb)
+    return [i for i, image in enumerate(glb.json.get('images', []))
+            if i not in used and 'bufferView' in image
+            and classify_texture(image.get('name') or Path(image.get('uri', '')).stem) == 'bump']
+
+
+def convert_glb(glb_path, strength, dry_run=False):
+    """Convert one GLB. Returns (status, images converted)."""
+    glb = read_glb(glb_path)
+    document = glb.json
+    if 'progressiveTextures' in document.get('asset', {}).get('extras', {}):
+        return 'PROGRESSIVE', 0
+
+    images = document.get('images', [])
+    candidates = sorted(i for i, slots in texture_usages(glb).items() if 'normalTexture' in slots)
+    materials = document.get('materials', [])
+    loose = loose_bump_images(glb)
+    adopt = None
+    if len(materials) == 1 and 'normalTexture' not in materials[0] and len(loose) == 1:
+        adopt = loose[0]
+        candidates.append(adopt)
+
+    converted = []
+    for i in candidates:
+        if images[i].get('extras', {}).get('normalEncoding') or 'bufferView' not in images[i]:
+            continue
+        data = image_bytes(glb, i)
+        mime_type = images[i].get('mimeType') or sniff_mime_type(data)
+        pixels = decode_image(data, mime_type)
+        if not is_height_map(pixels):
+            continue
+        converted.append(images[i].get('name', f'image_{i}'))
+        print(f"    {converted[-1]}: {pixels.shape[1]}x{pixels.shape[0]} height -> normal")
+        if dry_run:
+            continue
+        # Normal maps must not go through lossy JPEG again
+        set_image_bytes(glb, i, encode_image(encode_normals(height_to_normal(pixels[:, :, 0], strength))),
+                        'image/png')
+        images[i].setdefault('extras', {}).update(normalEncoding='xyz', zReconstructible=True,
+                                                  bumpStrength=strength)
+        if i == adopt:
+            document.setdefault('textures', []).append({'source': i})
+            materials[0]['normalTexture'] = {'index': len(document['textures']) - 1}
+
+    if not converted:
+        return 'NO_HEIGHT_MAPS', 0
+    if dry_run:
+        return 'DRY_RUN', len(converted)
+    compact(glb)
+    write_glb(glb_path, glb)
+    return 'CONVERTED', len(converted)
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Convert bump/height textures to tangent-space normal maps')
+    parser.add_argument('paths', nargs='+', help='GLB files or directories')
+    parser.add_argument(
+        '--strength', type=float, default=2.0,
+        help='Slope multiplier for height differences per pixel (default: 2.0)')
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Report what would be converted without writing files')
+    return parser.parse_args(raw_args)
+
+
+def main():
+    args = parse_args(get_args())
+    glb_files = collect_glbs(args.paths)
+
+    print(f"\nConverting bump maps for {len(glb_files)} GLB files (strength {args.strength})...")
+    counts = {}
+    total = 0
+    for i, glb_path in enumerate(glb_files):
+        before = os.path.getsize(glb_path)
+        print(f"  [{i+1}/{len(glb_files)}] {glb_path.name}")
+        try:
+            status, converted = convert_glb(glb_path, args.strength, args.dry_run)
+        except Exception as e:
+            print(f"    ERROR: {e}")
+            status, converted = 'FAILED', 0
+        total += converted
+        if status == 'CONVERTED':
+            after = os.path.getsize(glb_path)
+            print(f"    => {converted} images, {before / 1024:.0f} KB -> {after / 1024:.0f} KB")
+        else:
+            print(f"    [{status}]")
+        counts[status] = counts.get(status, 0) + 1
+
+    print(f"\n=== BUMP SUMMARY ===")
+    for status, count in sorted(counts.items()):
+        print(f"{status}: {count}")
+    print(f"Images converted: {total}")
+    if counts.get('FAILED'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,431 @@
+"""
+Stellar Descent - Offline Collision Proxy Generator
+
+Builds simplified collision shapes for each GLB so runtime physics never has
+to use render meshes or compute hulls at load. Writes a sidecar next to each
+model:
+
+  <name>.collision.json
+
+The shape type is chosen per category (path under public/assets/models/)
+from COLLISION_RULES, then refined by triangle budget:
+  aabb       - one axis-aligned box
+  box        - one oriented box (PCA axes)
+  hull       - one convex hull, or a box if the box fits almost as well
+  decompose  - several convex hulls from recursive bisection until each part
+               is close to convex (modular pieces with doorways, corridors)
+  none       - no proxy (characters use capsules, decals have no collision)
+
+Hulls over the triangle budget are simplified by vertex clustering.
+Skinned meshes are ignored. All coordinates are glTF model space (Y-up,
+node transforms applied), so the runtime can use them as-is.
+
+Sidecar format:
+    {
+      "version": 1,
+      "glb": "Wall_5.glb",
+      "category": "environment/modular",
+      "mode": "decompose",
+      "aabb": {"min": [x, y, z], "max": [x, y, z]},
+      "shapes": [
+        {"type": "box", "center": [..], "halfExtents": [..], "rotation": [x, y, z, w]},
+        {"type": "hull", "vertices": [x0, y0, z0, ...], "indices": [0, 1, 2, ...]}
+      ]
+    }
+
+Usage:
+    blender --background --python scripts/collision_proxies.py -- public/assets/models/
+    blender --background --python scripts/collision_proxies.py -- public/assets/models/environment/station/ \\
+        --root public/assets/models/
+
+Requires: Blender 3.6+ (uses bmesh for convex hulls), numpy
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import bmesh
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import (
+    read_glb, collect_glbs, read_accessor, read_accessor_float, world_matrices, transform_points,
+)
+
+DEFAULT_ROOT = SCRIPT_DIR.parent / 'public' / 'assets' / 'models'
+
+# Category prefix -> (mode, max triangles per hull). First match wins.
+COLLISION_RULES = [
+    ('environment/station-external', 'hull', 64),
+    ('environment/station', 'decompose', 32),
+    ('environment/modular', 'decompose', 32),
+    ('environment/industrial', 'decompose', 32),
+    ('environment/alien-flora', 'hull', 32),
+    ('environment', 'hull', 64),
+    ('props/decals', 'none', 0),
+    ('props/atmospheric', 'none', 0),
+    ('props/weapons', 'box', 0),
+    ('props/containers', 'box', 0),
+    ('props/doors', 'box', 0),
+    ('props/pipes', 'decompose', 24),
+    ('props', 'hull', 48),
+    ('vehicles', 'decompose', 48),
+    ('spaceships', 'decompose', 48),
+    ('npcs', 'none', 0),
+    ('enemies', 'none', 0),
+]
+DEFAULT_RULE = ('aabb', 0)
+
+# A hull is replaced by its oriented box when the box is at most this much
+# bigger by volume
+BOX_FIT_RATIO = 1.15
+
+# Decomposition: stop splitting when the deepest point inside a part's hull
+# is within this fraction of the part's diagonal, or limits are reached
+CONCAVITY_TOLERANCE = 0.05
+MAX_DECOMPOSE_DEPTH = 4
+MAX_PARTS = 16
+
+# Thinnest box half-extent (flat planes still need some thickness)
+MIN_HALF_EXTENT = 0.01
+
+
+def get_args():
+    argv = sys.argv
+    if '--' in argv:
+        return argv[argv.index('--') + 1:]
+    return []
+
+
+def rule_for(category):
+    for prefix, mode, budget in COLLISION_RULES:
+        if category == prefix or category.startswith(prefix + '/'):
+            return mode, budget
+    return DEFAULT_RULE
+
+
+# ---------------------------------------------------------------------------
+# Geometry
+# ---------------------------------------------------------------------------
+
+def gather_triangles(glb):
+    """World-space triangles (n, 3, 3) of all static (unskinned) mesh nodes."""
+    world = world_matrices(glb)
+    nodes = glb.json.get('nodes', [])
+    meshes = glb.json.get('meshes', [])
+    tris = []
+    for node_index, matrix in world.items():
+        node = nodes[node_index]
+        if 'mesh' not in node or 'skin' in node:
+            continue
+        for prim in meshes[node['mesh']].get('primitives', []):
+            if prim.get('mode', 4) != 4 or 'POSITION' not in prim['attributes']:
+                continue
+            positions = transform_points(matrix, read_accessor_float(glb, prim['attributes']['POSITION']))
+            if 'indices' in prim:
+                indices = read_accessor(glb, prim['indices']).astype(np.int64)
+            else:
+                indices = np.arange(len(positions))
+            indices = indices[:len(indices) - len(indices) % 3].reshape(-1, 3)
+            tris.append(positions[indices])
+    if not tris:
+        return np.zeros((0, 3, 3))
+    return np.concatenate(tris)
+
+
+def convex_hull(points):
+    """Convex hull via bmesh. Returns (vertices (n, 3), triangles (m, 3)) or None."""
+    points = np.unique(np.round(points, 5), axis=0)
+    if len(points) < 4:
+        return None
+    bm = bmesh.new()
+    try:
+        for p in points:
+            bm.verts.new(p)
+        result = bmesh.ops.convex_hull(bm, input=bm.verts[:], use_existing_faces=False)
+        bmesh.ops.delete(bm, geom=result['geom_interior'] + result['geom_unused'], context='VERTS')
+        if not bm.faces:
+            return None
+        bmesh.ops.triangulate(bm, faces=bm.faces[:])
+        loose = [v for v in bm.verts if not v.link_faces]
+        if loose:
+            bmesh.ops.delete(bm, geom=loose, context='VERTS')
+        bm.verts.index_update()
+        verts = np.array([v.co[:] for v in bm.verts], dtype=np.float64)
+        faces = np.array([[v.index for v in f.verts] for f in bm.faces], dtype=np.int64)
+    finally:
+        bm.free()
+    if hull_volume(verts, faces) <= 1e-9:
+        return None
+    return verts, faces
+
+
+def hull_volume(verts, faces):
+    """Volume of a convex hull as tetrahedra fanned from its centroid."""
+    centroid = verts.mean(axis=0)
+    a, b, c = (verts[faces[:, k]] - centroid for k in range(3))
+    return np.abs(np.einsum('ij,ij->i', a, np.cross(b, c))).sum() / 6.0
+
+
+def hull_planes(verts, faces):
+    """Outward unit normals and offsets (n.p <= d inside) of hull faces."""
+    a, b, c = verts[faces[:, 0]], verts[faces[:, 1]], verts[faces[:, 2]]
+    normals = np.cross(b - a, c - a)
+    lengths = np.linalg.norm(normals, axis=1)
+    keep = lengths > 1e-12
+    normals = normals[keep] / lengths[keep, None]
+    offsets = np.einsum('ij,ij->i', normals, a[keep])
+    # Orient outward relative to the hull centroid
+    centroid = verts.mean(axis=0)
+    flip = normals @ centroid > offsets
+    normals[flip] *= -1
+    offsets[flip] *= -1
+    return normals, offsets
+
+
+def concavity(points, hull):
+    """
+    Deepest distance of any sample point inside the hull, relative to its size.
+
+    Pass triangle centroids as well as vertices: for an extruded concave
+    profile every vertex lies on the hull caps, only the faces sink inside.
+    """
+    verts, faces = hull
+    normals, offsets = hull_planes(verts, faces)
+    depth = (offsets[None, :] - points @ normals.T).min(axis=1).max()
+    diag = np.linalg.norm(verts.max(axis=0) - verts.min(axis=0))
+    return depth / diag if diag > 0 else 0.0
+
+
+def simplify_hull(hull, budget):
+    """Re-hull clustered vertices until the hull fits the triangle budget."""
+    verts, faces = hull
+    if budget <= 0 or len(faces) <= budget:
+        return hull
+    lo, hi = verts.min(axis=0), verts.max(axis=0)
+    cells = 16
+    while cells >= 2:
+        size = (hi - lo).max() / cells
+        keys = np.floor((verts - lo) / size).astype(np.int64)
+        _, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        clustered = np.zeros((inverse.max() + 1, 3))
+        np.add.at(clustered, inverse, verts)
+        clustered /= np.bincount(inverse)[:, None]
+        simplified = convex_hull(clustered)
+        if simplified is not None and len(simplified[1]) <= budget:
+            return simplified
+        cells //= 2
+    return hull
+
+
+def oriented_box(points):
+    """
+    Tightest of the axis-aligned and PCA-aligned boxes around points.
+
+    Returns (center, half_extents, axes) where axes columns are the box axes.
+    PCA alone is unreliable for symmetric shapes (a cube has no dominant
+    axis), so the axis-aligned box is always a candidate too.
+    """
+    points = np.unique(points, axis=0)
+    centered = points - points.mean(axis=0)
+    _, _, vt = np.linalg.svd(centered, full_matrices=False)
+    pca = vt.T
+    if np.linalg.det(pca) < 0:
+        pca[:, 2] *= -1
+    best = None
+    for axes in (np.eye(3), pca):
+        local = points @ axes
+        lo, hi = local.min(axis=0), local.max(axis=0)
+        volume = np.prod(np.maximum(hi - lo, 2 * MIN_HALF_EXTENT))
+        if best is None or volume < best[0] - 1e-9:
+            best = (volume, axes @ ((lo + hi) / 2), np.maximum((hi - lo) / 2, MIN_HALF_EXTENT), axes)
+    return best[1:]
+
+
+def matrix_to_quaternion(m):
+    """(x, y, z, w) quaternion from a 3x3 rotation matrix."""
+    trace = m[0, 0] + m[1, 1] + m[2, 2]
+    if trace > 0:
+        s = 0.5 / np.sqrt(trace + 1.0)
+        q = [(m[2, 1] - m[1, 2]) * s, (m[0, 2] - m[2, 0]) * s, (m[1, 0] - m[0, 1]) * s, 0.25 / s]
+    elif m[0, 0] > m[1, 1] and m[0, 0] > m[2, 2]:
+        s = 2.0 * np.sqrt(1.0 + m[0, 0] - m[1, 1] - m[2, 2])
+        q = [0.25 * s, (m[0, 1] + m[1, 0]) / s, (m[0, 2] + m[2, 0]) / s, (m[2, 1] - m[1, 2]) / s]
+    elif m[1, 1] > m[2, 2]:
+        s = 2.0 * np.sqrt(1.0 + m[1, 1] - m[0, 0] - m[2, 2])
+        q = [(m[0, 1] + m[1, 0]) / s, 0.25 * s, (m[1, 2] + m[2, 1]) / s, (m[0, 2] - m[2, 0]) / s]
+    else:
+        s = 2.0 * np.sqrt(1.0 + m[2, 2] - m[0, 0] - m[1, 1])
+        q = [(m[0, 2] + m[2, 0]) / s, (m[1, 2] + m[2, 1]) / s, 0.25 * s, (m[1, 0] - m[0, 1]) / s]
+    q = np.array(q)
+    return q / np.linalg.norm(q)
+
+
+# ---------------------------------------------------------------------------
+# Shapes
+# ---------------------------------------------------------------------------
+
+def round_list(values, digits=4):
+    return [round(float(v), digits) for v in np.asarray(values).ravel()]
+
+
+def aabb_shape(points):
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    return {
+        'type': 'box',
+        'center': round_list((lo + hi) / 2),
+        'halfExtents': round_list(np.maximum((hi - lo) / 2, MIN_HALF_EXTENT)),
+        'rotation': [0.0, 0.0, 0.0, 1.0],
+    }
+
+
+def box_shape(points):
+    center, half, axes = oriented_box(points)
+    return {
+        'type': 'box',
+        'center': round_list(center),
+        'halfExtents': round_list(half),
+        'rotation': round_list(matrix_to_quaternion(axes), 6),
+    }
+
+
+def hull_shape(points, budget):
+    """Convex hull shape, or a box when it fits nearly as tightly."""
+    hull = convex_hull(points)
+    if hull is None:
+        return box_shape(points)
+    _, half, _ = oriented_box(hull[0])
+    if np.prod(half * 2) <= hull_volume(*hull) * BOX_FIT_RATIO:
+        return box_shape(hull[0])
+    verts, faces = simplify_hull(hull, budget)
+    return {
+        'type': 'hull',
+        'vertices': round_list(verts),
+        'indices': [int(i) for i in faces.ravel()],
+    }
+
+
+def decompose(tris, depth=0):
+    """Split triangles into nearly convex groups by recursive bisection."""
+    points = tris.reshape(-1, 3)
+    centroids = tris.mean(axis=1)
+    hull = convex_hull(points)
+    if (hull is None or depth >= MAX_DECOMPOSE_DEPTH
+            or concavity(np.concatenate([points, centroids]), hull) <= CONCAVITY_TOLERANCE):
+        return [tris]
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    axis = int(np.argmax(hi - lo))
+    split = (lo[axis] + hi[axis]) / 2
+    left = centroids[:, axis] < split
+    # Faces lying on the split plane bound the material behind them, so
+    # they go to the side their normal faces away from; otherwise they
+    # would stretch the other side's hull across a gap
+    eps = 1e-5 * (hi[axis] - lo[axis])
+    on_plane = (np.abs(tris[:, :, axis] - split) <= eps).all(axis=1)
+    if on_plane.any():
+        normals = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+        left[on_plane] = normals[on_plane, axis] > 0
+    if left.all() or not left.any():
+        return [tris]
+    return decompose(tris[left], depth + 1) + decompose(tris[~left], depth + 1)
+
+
+def build_proxy(tris, mode, budget):
+    points = tris.reshape(-1, 3)
+    if mode == 'aabb':
+        return [aabb_shape(points)]
+    if mode == 'box':
+        return [box_shape(points)]
+    if mode == 'hull':
+        return [hull_shape(points, budget)]
+    if mode == 'decompose':
+        parts = decompose(tris)
+        if len(parts) > MAX_PARTS:
+            # Too fragmented to be worth it: merge smallest parts by size order
+            parts.sort(key=len, reverse=True)
+            parts = parts[:MAX_PARTS - 1] + [np.concatenate(parts[MAX_PARTS - 1:])]
+        return [hull_shape(part.reshape(-1, 3), budget) for part in parts]
+    raise ValueError(f'Unknown collision mode: {mode}')
+
+
+def generate_proxy(glb_path, root, dry_run=False):
+    """Write the collision sidecar for one GLB. Returns (status, shape count)."""
+    try:
+        category = glb_path.parent.resolve().relative_to(root.resolve()).as_posix()
+    except ValueError:
+        category = ''
+    mode, budget = rule_for(category)
+    if mode == 'none':
+        return 'SKIPPED', 0
+
+    tris = gather_triangles(read_glb(glb_path))
+    if len(tris) == 0:
+        return 'NO_GEOMETRY', 0
+    shapes = build_proxy(tris, mode, budget)
+
+    points = tris.reshape(-1, 3)
+    sidecar = {
+        'version': 1,
+        'glb': glb_path.name,
+        'category': category,
+        'mode': mode,
+        'aabb': {'min': round_list(points.min(axis=0)), 'max': round_list(points.max(axis=0))},
+        'shapes': shapes,
+    }
+    if not dry_run:
+        with open(glb_path.with_suffix('.collision.json'), 'w') as f:
+            json.dump(sidecar, f, separators=(',', ':'))
+    return 'OK', len(shapes)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Generate collision proxy sidecars for GLB models')
+    parser.add_argument('paths', nargs='+', help='GLB files or directories')
+    parser.add_argument(
+        '--root', default=str(DEFAULT_ROOT),
+        help='Models root used to derive categories (default: public/assets/models)')
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Compute proxies without writing sidecars')
+    return parser.parse_args(raw_args)
+
+
+def main():
+    args = parse_args(get_args())
+    root = Path(args.root)
+    glb_files = collect_glbs(args.paths)
+    print(f"\nGenerating collision proxies for {len(glb_files)} GLB files...")
+
+    counts = {}
+    total_shapes = 0
+    for i, glb_path in enumerate(glb_files):
+        print(f"  [{i+1}/{len(glb_files)}] {glb_path.name}...", end=' ', flush=True)
+        try:
+            status, n_shapes = generate_proxy(glb_path, root, args.dry_run)
+        except Exception as e:
+            status, n_shapes = 'FAILED', 0
+            print(f"[FAILED] {e}")
+        else:
+            print(f"[{status}] {n_shapes} shape(s)" if status == 'OK' else f"[{status}]")
+        counts[status] = counts.get(status, 0) + 1
+        total_shapes += n_shapes
+
+    print(f"\n=== COLLISION SUMMARY ===")
+    for status, count in sorted(counts.items()):
+        print(f"{status}: {count}")
+    print(f"Shapes: {total_shapes}")
+    if counts.get('FAILED'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,10 @@ convert-weapons.py - Convert FBX weapon assets to GLB for FPS view
 Source: ~/assets/Quaternius/FPS/Ultimate Gun Pack - July 2019/FBX/
 Target: public/assets/models/props/weapons/fps_*.glb
 
+Weapons and attachments are normalized by normalize_scale.py after export
+(baked transforms; scale only changes for sizes audit_glbs.py would flag),
+then split FBX vertices are merged by weld_vertices.py.
+
 Run with: blender --background --python scripts/convert-weapons.py
 """
 
@@ -12,6 +16,10 @@ import bpy
 import os
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from normalize_scale import normalize_glb, describe
+from weld_vertices import weld_glb, describe as describe_weld
+
 # Mapping: fps_<name>.glb -> source FBX basename
 WEAPON_MAP = {
     # Assault Rifles
@@ -97,6 +105,28 @@ def clear_scene():
             bpy.data.materials.remove(block)
 
 
+def normalize_export(target_path: str) -> bool:
+    """Normalize an exported GLB, reporting a failure as its own step."""
+    try:
+        status, info = normalize_glb(target_path)
+    except Exception as e:
+        print(f"  FAILED: Normalizing: {e}")
+        return False
+    print(f"  [{status}] {describe(info)}")
+    return True
+
+
+def weld_export(target_path: str) -> bool:
+    """Weld an exported GLB, reporting a failure as its own step."""
+    try:
+        status, before, after = weld_glb(target_path)
+    except Exception as e:
+        print(f"  FAILED: Welding: {e}")
+        return False
+    print(f"  [{status}] {describe_weld(before, after)}")
+    return True
+
+
 def convert_weapon(target_name: str, source_name: str) -> bool:
     """Convert a single FBX to GLB."""
     source_path = os.path.join(SOURCE_DIR, f"{source_name}.fbx")
@@ -124,6 +154,8 @@ def convert_weapon(target_name: str, source_name: str) -> bool:
 
     # Verify output
     if os.path.exists(target_path) and os.path.getsize(target_path) > 0:
+        if not normalize_export(target_path) or not weld_export(target_path):
+            return False
         size = os.path.getsize(target_path)
         print(f"  SUCCESS: {target_path} ({size:,} bytes)")
         return True
@@ -153,6 +185,8 @@ def convert_attachment(target_name: str, subdir: str, source_name: str) -> bool:
     )
 
     if os.path.exists(target_path) and os.path.getsize(target_path) > 0:
+        if not normalize_export(target_path) or not weld_export(target_path):
+            return False
         size = os.path.getsize(target_path)
         print(f"  SUCCESS: {target_path} ({size:,} bytes)")
         return True
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Stellar Descent - Scene-Graph Flattener
+
+Converted kit pieces arrive with deep node hierarchies, one node per part
+and several primitives sharing a material. Every node is a world-matrix
+update and every primitive a draw call, times hundreds of placed pieces.
+This flattens each GLB in place:
+
+  - Static mesh nodes have their world transforms baked into the vertices
+    (normals and tangents included; mirrored transforms flip the winding).
+  - Their primitives are merged per material, one primitive per material
+    and vertex layout, on a single node named after the file.
+  - Nodes left with nothing to do are removed.
+
+Left untouched: animated nodes and everything under them, skinned meshes,
+skin joints, cameras, nodes with extensions (lights, instancing), meshes
+with morph targets or non-triangle primitives, and the ancestors of all of
+these (their transforms are still needed). Per-part node names and extras
+of merged parts are not kept. Files with several scenes are skipped.
+
+Usage:
+    python3 scripts/flatten_glbs.py public/assets/models/environment/
+    python3 scripts/flatten_glbs.py public/assets/models/props/modular/ --dry-run
+
+Runs with plain Python 3 + numpy (no Blender needed).
+"""
+
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import (
+    read_glb, write_glb, collect_glbs, compact, read_accessor, read_accessor_float, add_accessor,
+    index_dtype, world_matrices, node_parents, transform_points, scene_roots,
+    ARRAY_BUFFER, ELEMENT_ARRAY_BUFFER,
+)
+
+TRIANGLES = 4
+# Attributes transformed with the node; everything else is copied as stored
+SPATIAL_ATTRIBUTES = ('POSITION', 'NORMAL', 'TANGENT')
+
+
+def protected_nodes(glb):
+    """Nodes that must keep their identity and transform."""
+    document = glb.json
+    nodes = document.get('nodes', [])
+    meshes = document.get('meshes', [])
+    protected = set()
+
+    for animation in document.get('animations', []):
+        for channel in animation.get('channels', []):
+            if 'node' in channel.get('target', {}):
+                protected.add(channel['target']['node'])
+    for skin in document.get('skins', []):
+        protected.update(skin.get('joints', []))
+        if 'skeleton' in skin:
+            protected.add(skin['skeleton'])
+    for i, node in enumerate(nodes):
+        if 'skin' in node or 'camera' in node or node.get('extensions') or 'weights' in node:
+            protected.add(i)
+        elif 'mesh' in node:
+            prims = meshes[node['mesh']].get('primitives', [])
+            if any(p.get('targets') or p.get('mode', TRIANGLES) != TRIANGLES
+                   or 'POSITION' not in p.get('attributes', {}) for p in prims):
+                protected.add(i)
+
+    # Everything under a protected (e.g. animated) node moves with it
+    stack = list(protected)
+    while stack:
+        for child in nodes[stack.pop()].get('children', []):
+            if child not in protected:
+                protected.add(child)
+                stack.append(child)
+    return protected
+
+
+def layout_key(glb, prim):
+    """Primitives can merge only with the same material and vertex layout."""
+    accessors = glb.json['accessors']
+    layout = tuple(sorted(
+        (name, accessors[i]['type'], accessors[i]['componentType'], bool(accessors[i].get('normalized')))
+        for name, i in prim['attributes'].items()))
+    return prim.get('material', -1), layout
+
+
+def transformed_attributes(glb, prim, matrix):
+    """All attributes of a primitive with the node transform applied."""
+    linear = matrix[:3, :3]
+    normal_matrix = np.linalg.inv(linear).T
+    data = {}
+    for name, index in prim['attributes'].items():
+        if name == 'POSITION':
+            data[name] = transform_points(matrix, read_accessor_float(glb, index)).astype(np.float32)
+        elif name == 'NORMAL':
+            normals = read_accessor_float(glb, index) @ normal_matrix.T
+            lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+            data[name] = (normals / np.where(lengths > 0, lengths, 1)).astype(np.float32)
+        elif name == 'TANGENT':
+            tangents = read_accessor_float(glb, index)
+            xyz = tangents[:, :3] @ linear.T
+            lengths = np.linalg.norm(xyz, axis=1, keepdims=True)
+            xyz = xyz / np.where(lengths > 0, lengths, 1)
+            w = tangents[:, 3:] * (-1 if np.linalg.det(linear) < 0 else 1)
+            data[name] = np.hstack([xyz, w]).astype(np.float32)
+        else:
+            data[name] = read_accessor(glb, index)
+    return data
+
+
+def primitive_indices(glb, prim, vertex_count, mirrored):
+    if 'indices' in prim:
+        indices = read_accessor(glb, prim['indices']).astype(np.uint32)
+    else:
+        indices = np.arange(vertex_count, dtype=np.uint32)
+    indices = indices[:len(indices) // 3 * 3]
+    if mirrored:
+        indices = indices.reshape(-1, 3)[:, [0, 2, 1]].ravel()
+    return indices
+
+
+def merge_group(glb, members):
+    """Merge [(prim, world matrix)] sharing a layout into one primitive dict."""
+    accessors = glb.json['accessors']
+    prim0 = members[0][0]
+    columns = {name: [] for name in prim0['attributes']}
+    indices = []
+    offset = 0
+    for prim, matrix in members:
+        data = transformed_attributes(glb, prim, matrix)
+        count = len(data['POSITION'])
+        for name, values in data.items():
+            columns[name].append(values)
+        mirrored = np.linalg.det(matrix[:3, :3]) < 0
+        indices.append(primitive_indices(glb, prim, count, mirrored) + offset)
+        offset += count
+
+    merged = {'attributes': {}}
+    for name, parts in columns.items():
+        normalized = name not in SPATIAL_ATTRIBUTES and bool(accessors[prim0['attributes'][name]].get('normalized'))
+        merged['attributes'][name] = add_accessor(glb, np.concatenate(parts), ARRAY_BUFFER, normalized=normalized)
+    merged['indices'] = add_accessor(glb, np.concatenate(indices).astype(index_dtype(offset)),
+                                     ELEMENT_ARRAY_BUFFER)
+    if 'material' in prim0:
+        merged['material'] = prim0['material']
+    return merged
+
+
+def remap_nodes(document, keep):
+    """Drop nodes not in keep and fix every node reference."""
+    nodes = document['nodes']
+    remap = {old: new for new, old in enumerate(sorted(keep))}
+    document['nodes'] = [nodes[i] for i in sorted(keep)]
+    for node in document['nodes']:
+        if 'children' in node:
+            node['children'] = [remap[c] for c in node['children'] if c in remap]
+            if not node['children']:
+                del node['children']
+    for scene in document.get('scenes', []):
+        scene['nodes'] = [remap[n] for n in scene.get('nodes', []) if n in remap]
+    for skin in document.get('skins', []):
+        skin['joints'] = [remap[j] for j in skin['joints']]
+        if 'skeleton' in skin:
+            skin['skeleton'] = remap[skin['skeleton']]
+    for animation in document.get('animations', []):
+        for channel in animation.get('channels', []):
+            if 'node' in channel.get('target', {}):
+                channel['target']['node'] = remap[channel['target']['node']]
+
+
+def remove_unused_meshes(document):
+    used = sorted({node['mesh'] for node in document['nodes'] if 'mesh' in node})
+    remap = {old: new for new, old in enumerate(used)}
+    document['meshes'] = [document['meshes'][i] for i in used]
+    for node in document['nodes']:
+        if 'mesh' in node:
+            node['mesh'] = remap[node['mesh']]
+
+
+def flatten_glb(glb_path, dry_run=False):
+    """Flatten one GLB. Returns (status, (nodes, primitives) before, after)."""
+    glb = read_glb(glb_path)
+    document = glb.json
+    nodes = document.get('nodes', [])
+    if len(document.get('scenes', [])) > 1:
+        return 'MULTI_SCENE', None, None
+
+    world = world_matrices(glb)
+    protected = protected_nodes(glb)
+    parents = node_parents(glb)
+
+    def draw_count():
+        return sum(len(document['meshes'][nodes[n]['mesh']].get('primitives', []))
+                   for n in world if 'mesh' in nodes[n])
+    before = (len(world), draw_count())
+
+    static = [n for n in sorted(world) if 'mesh' in nodes[n] and n not in protected]
+    if not static:
+        return 'NO_STATIC_MESHES', before, before
+
+    groups = {}
+    for n in static:
+        for prim in document['meshes'][nodes[n]['mesh']].get('primitives', []):
+            groups.setdefault(layout_key(glb, prim), []).append((prim, world[n]))
+
+    # Kept: protected nodes, their ancestors, and anything outside the scene
+    keep = set(range(len(nodes))) - set(world)
+    for n in protected & set(world):
+        while n is not None:
+            keep.add(n)
+            n = parents.get(n)
+
+    after = (len(keep & set(world)) + 1, before[1] - sum(len(g) for g in groups.values()) + len(groups))
+    single = static[0] if len(static) == 1 else None
+    if (single is not None and single not in keep and len(groups) == sum(len(g) for g in groups.values())
+            and np.allclose(world[single], np.eye(4)) and after[0] >= before[0]):
+        return 'UNCHANGED', before, before
+    if dry_run:
+        return 'DRY_RUN', before, after
+
+    merged_mesh = {'name': glb_path.stem, 'primitives': [merge_group(glb, members) for members in groups.values()]}
+    document['meshes'].append(merged_mesh)
+    for n in static:
+        del nodes[n]['mesh']
+    nodes.append({'name': glb_path.stem, 'mesh': len(document['meshes']) - 1})
+    merged_node = len(nodes) - 1
+    keep.add(merged_node)
+
+    scene = document['scenes'][document.get('scene', 0)] if document.get('scenes') else None
+    roots = scene_roots(glb)
+    if scene is None:
+        document['scenes'] = [{'nodes': []}]
+        document['scene'] = 0
+        scene = document['scenes'][0]
+    scene['nodes'] = [merged_node] + [r for r in roots if r in keep]
+
+    remap_nodes(document, keep)
+    remove_unused_meshes(document)
+    compact(glb)
+    write_glb(glb_path, glb)
+    return 'FLATTENED', before, after
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Bake static node transforms and merge primitives per material')
+    parser.add_argument('paths', nargs='+', help='GLB files or directories')
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=None,
+        help='Worker processes (default: CPU count)')
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Report what would change without writing files')
+    return parser.parse_args(raw_args)
+
+
+def run(glb_path, dry_run):
+    try:
+        return flatten_glb(glb_path, dry_run)
+    except Exception as e:
+        return f'FAILED: {e}', None, None
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    glb_files = collect_glbs(args.paths)
+    print(f"\nFlattening {len(glb_files)} GLB files...")
+
+    counts = {}
+    totals = [0, 0, 0, 0]
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(run, p, args.dry_run) for p in glb_files]
+        for i, future in enumerate(futures):
+            status, before, after = future.result()
+            detail = ''
+            if before and after:
+                detail = f" nodes {before[0]} -> {after[0]}, draws {before[1]} -> {after[1]}"
+                totals = [t + v for t, v in zip(totals, (*before, *after))]
+            print(f"  [{i+1}/{len(glb_files)}] {glb_files[i].name} [{status}]{detail}")
+            key = status.split(':')[0]
+            counts[key] = counts.get(key, 0) + 1
+
+    print(f"\n=== FLATTEN SUMMARY ===")
+    for status, count in sorted(counts.items()):
+        print(f"{status}: {count}")
+    print(f"Nodes: {totals[0]} -> {totals[2]}")
+    print(f"Draw calls: {totals[1]} -> {totals[3]}")
+    if counts.get('FAILED'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,547 @@
+"""
+Stellar Descent - GLB read/write helpers
+
+Pure Python + numpy access to glTF 2.0 binary (.glb) files, for pipeline
+stages that edit accessors, images and nodes directly instead of
+round-tripping through Blender's importer/exporter. Works in plain Python 3
+and inside Blender's bundled Python.
+
+Only single-buffer GLBs with an embedded BIN chunk are supported, which is
+what Blender's exporter writes.
+
+Usage:
+    from glb_io import read_glb, write_glb, read_accessor, add_accessor
+    glb = read_glb('model.glb')
+    for mesh_index, prim in iter_primitives(glb):
+        positions = read_accessor(glb, prim['attributes']['POSITION'])
+    write_glb('model.glb', glb)
+"""
+
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+GLB_MAGIC = 0x46546C67      # b'glTF'
+CHUNK_JSON = 0x4E4F534A     # b'JSON'
+CHUNK_BIN = 0x004E4942      # b'BIN\0'
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+BYTE = 5120
+UNSIGNED_BYTE = 5121
+SHORT = 5122
+UNSIGNED_SHORT = 5123
+UNSIGNED_INT = 5125
+FLOAT = 5126
+
+COMPONENT_DTYPES = {
+    BYTE: np.dtype('<i1'),
+    UNSIGNED_BYTE: np.dtype('<u1'),
+    SHORT: np.dtype('<i2'),
+    UNSIGNED_SHORT: np.dtype('<u2'),
+    UNSIGNED_INT: np.dtype('<u4'),
+    FLOAT: np.dtype('<f4'),
+}
+
+DTYPE_COMPONENTS = {dtype: ct for ct, dtype in COMPONENT_DTYPES.items()}
+
+TYPE_SIZES = {
+    'SCALAR': 1,
+    'VEC2': 2,
+    'VEC3': 3,
+    'VEC4': 4,
+    'MAT2': 4,
+    'MAT3': 9,
+    'MAT4': 16,
+}
+
+SIZE_TYPES = {1: 'SCALAR', 2: 'VEC2', 3: 'VEC3', 4: 'VEC4', 16: 'MAT4'}
+
+
+class Glb:
+    """A parsed GLB: the glTF JSON document plus its binary chunk."""
+
+    def __init__(self, document, binary=b''):
+        self.json = document
+        self.bin = bytearray(binary)
+
+
+# ---------------------------------------------------------------------------
+# File I/O
+# ---------------------------------------------------------------------------
+
+def read_glb(path):
+    """Parse a .glb file. Raises ValueError if it is not a valid GLB."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < 20:
+        raise ValueError(f'{path}: file too small to be a GLB')
+    magic, version, length = struct.unpack_from('<III', data, 0)
+    if magic != GLB_MAGIC:
+        raise ValueError(f'{path}: not a GLB file')
+    if version != 2:
+        raise ValueError(f'{path}: unsupported glTF version {version}')
+    if length > len(data):
+        raise ValueError(f'{path}: truncated ({len(data)} of {length} bytes)')
+
+    document = None
+    binary = b''
+    offset = 12
+    while offset + 8 <= length:
+        chunk_length, chunk_type = struct.unpack_from('<II', data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == CHUNK_JSON:
+            document = json.loads(chunk.decode('utf-8'))
+        elif chunk_type == CHUNK_BIN and not binary:
+            binary = chunk
+        offset += 8 + chunk_length
+    if document is None:
+        raise ValueError(f'{path}: missing JSON chunk')
+    return Glb(document, binary)
+
+
+def write_glb(path, glb):
+    """Serialize a Glb back to disk, updating buffer 0 to match the BIN chunk."""
+    document = glb.json
+    if glb.bin:
+        buffers = document.setdefault('buffers', [{}])
+        buffers[0] = {k: v for k, v in buffers[0].items() if k != 'uri'}
+        buffers[0]['byteLength'] = len(glb.bin)
+    elif document.get('buffers'):
+        document['buffers'][0]['byteLength'] = 0
+
+    json_bytes = json.dumps(document, separators=(',', ':')).encode('utf-8')
+    json_bytes += b' ' * (-len(json_bytes) % 4)
+    bin_bytes = bytes(glb.bin) + b'\0' * (-len(glb.bin) % 4)
+
+    length = 12 + 8 + len(json_bytes)
+    if bin_bytes:
+        length += 8 + len(bin_bytes)
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<III', GLB_MAGIC, 2, length))
+        f.write(struct.pack('<II', len(json_bytes), CHUNK_JSON))
+        f.write(json_bytes)
+        if bin_bytes:
+            f.write(struct.pack('<II', len(bin_bytes), CHUNK_BIN))
+            f.write(bin_bytes)
+
+
+def collect_glbs(paths):
+    """Sorted .glb paths from files and directories (searched recursively)."""
+    glb_files = []
+    for path in paths:
+        path = Path(path)
+        if path.is_file() and path.suffix.lower() == '.glb':
+            glb_files.append(path)
+        elif path.is_dir():
+            glb_files.extend(p for p in path.rglob('*') if p.suffix.lower() == '.glb')
+    return sorted(set(glb_files))
+
+
+# ---------------------------------------------------------------------------
+# Buffer views and accessors
+# ---------------------------------------------------------------------------
+
+def buffer_view_bytes(glb, view_index):
+    """Raw bytes of a bufferView (ignores byteStride)."""
+    view = glb.json['bufferViews'][view_index]
+    if view.get('buffer', 0) != 0:
+        raise ValueError('Only the embedded GLB buffer is supported')
+    start = view.get('byteOffset', 0)
+    return bytes(glb.bin[start:start + view['byteLength']])
+
+
+def _read_dense(glb, view_index, byte_offset, count, dtype, n_components):
+    view = glb.json['bufferViews'][view_index]
+    if view.get('buffer', 0) != 0:
+        raise ValueError('Only the embedded GLB buffer is supported')
+    element_size = dtype.itemsize * n_components
+    stride = view.get('byteStride') or element_size
+    start = view.get('byteOffset', 0) + byte_offset
+    if count == 0:
+        return np.zeros((0, n_components), dtype=dtype)
+    end = start + stride * (count - 1) + element_size
+    if end > len(glb.bin):
+        raise ValueError(f'bufferView {view_index} reads past end of buffer')
+    if stride == element_size:
+        flat = np.frombuffer(glb.bin, dtype=dtype, count=count * n_components, offset=start)
+        return flat.reshape(count, n_components).copy()
+    raw = np.frombuffer(glb.bin, dtype=np.uint8, count=end - start, offset=start)
+    rows = np.lib.stride_tricks.as_strided(
+        raw, shape=(count, element_size), strides=(stride, 1))
+    return rows.copy().view(dtype).reshape(count, n_components)
+
+
+def read_accessor(glb, accessor_index):
+    """
+    Read an accessor into a numpy array of its component dtype.
+
+    Returns shape (count,) for SCALAR and (count, n) otherwise. Matrices come
+    back flattened column-major, as stored. Sparse accessors are applied.
+    """
+    accessor = glb.json['accessors'][accessor_index]
+    dtype = COMPONENT_DTYPES[accessor['componentType']]
+    n_components = TYPE_SIZES[accessor['type']]
+    count = accessor['count']
+
+    if 'bufferView' in accessor:
+        data = _read_dense(glb, accessor['bufferView'], accessor.get('byteOffset', 0),
+                           count, dtype, n_components)
+    else:
+        data = np.zeros((count, n_components), dtype=dtype)
+
+    sparse = accessor.get('sparse')
+    if sparse:
+        idx = sparse['indices']
+        indices = _read_dense(glb, idx['bufferView'], idx.get('byteOffset', 0),
+                              sparse['count'], COMPONENT_DTYPES[idx['componentType']], 1)[:, 0]
+        values = sparse['values']
+        data[indices] = _read_dense(glb, values['bufferView'], values.get('byteOffset', 0),
+                                    sparse['count'], dtype, n_components)
+
+    if accessor['type'] == 'SCALAR':
+        return data[:, 0]
+    return data
+
+
+def normalized_to_float(data, component_type):
+    """Convert normalized integer data to float32 per the glTF spec."""
+    if component_type == FLOAT:
+        return data.astype(np.float32)
+    if component_type == UNSIGNED_BYTE:
+        return data.astype(np.float32) / 255.0
+    if component_type == UNSIGNED_SHORT:
+        return data.astype(np.float32) / 65535.0
+    if component_type == BYTE:
+        return np.maximum(data.astype(np.float32) / 127.0, -1.0)
+    if component_type == SHORT:
+        return np.maximum(data.astype(np.float32) / 32767.0, -1.0)
+    raise ValueError(f'Component type {component_type} cannot be normalized')
+
+
+def read_accessor_float(glb, accessor_index):
+    """Read an accessor as float32, dequantizing normalized integers."""
+    accessor = glb.json['accessors'][accessor_index]
+    data = read_accessor(glb, accessor_index)
+    if accessor.get('normalized'):
+        return normalized_to_float(data, accessor['componentType'])
+    return data.astype(np.float32)
+
+
+def add_buffer_view(glb, data, target=None, byte_stride=None):
+    """Append bytes to the BIN chunk as a new bufferView. Returns its index."""
+    glb.bin += b'\0' * (-len(glb.bin) % 4)
+    view = {'buffer': 0, 'byteOffset': len(glb.bin), 'byteLength': len(data)}
+    if byte_stride:
+        view['byteStride'] = byte_stride
+    if target:
+        view['target'] = target
+    glb.bin += data
+    if not glb.json.get('buffers'):
+        glb.json['buffers'] = [{'byteLength': 0}]
+    views = glb.json.setdefault('bufferViews', [])
+    views.append(view)
+    return len(views) - 1
+
+
+def add_accessor(glb, data, target=None, normalized=False, accessor_type=None):
+    """
+    Append a numpy array as a new tightly packed accessor. Returns its index.
+
+    The component type follows the array dtype (int8/uint8/int16/uint16/
+    uint32/float32). min/max are always written, which POSITION requires.
+    """
+    data = np.ascontiguousarray(data)
+    dtype = data.dtype.newbyteorder('<')
+    if dtype not in DTYPE_COMPONENTS:
+        raise ValueError(f'Unsupported accessor dtype: {data.dtype}')
+    if data.ndim == 1:
+        data = data.reshape(-1, 1)
+    count, n_components = data.shape
+    if accessor_type is None:
+        accessor_type = SIZE_TYPES[n_components]
+
+    stride = None
+    element_size = n_components * dtype.itemsize
+    if target == ARRAY_BUFFER and element_size % 4:
+        # Vertex attributes must be 4-byte aligned per element
+        stride = element_size + (-element_size % 4)
+        padded = np.zeros((count, stride), dtype=np.uint8)
+        padded[:, :element_size] = data.astype(dtype).view(np.uint8).reshape(count, element_size)
+        raw = padded.tobytes()
+    else:
+        raw = data.astype(dtype).tobytes()
+
+    accessor = {
+        'bufferView': add_buffer_view(glb, raw, target=target, byte_stride=stride),
+        'componentType': DTYPE_COMPONENTS[dtype],
+        'count': count,
+        'type': accessor_type,
+    }
+    if normalized:
+        accessor['normalized'] = True
+    if count and not accessor_type.startswith('MAT'):
+        cast = float if dtype == COMPONENT_DTYPES[FLOAT] else int
+        accessor['min'] = [cast(v) for v in data.min(axis=0)]
+        accessor['max'] = [cast(v) for v in data.max(axis=0)]
+    accessors = glb.json.setdefault('accessors', [])
+    accessors.append(accessor)
+    return len(accessors) - 1
+
+
+def index_dtype(vertex_count):
+    """Smallest valid glTF index dtype for a vertex count."""
+    if vertex_count <= 0xFFFF:
+        return np.uint16
+    return np.uint32
+
+
+# ---------------------------------------------------------------------------
+# Images
+# ---------------------------------------------------------------------------
+
+def image_bytes(glb, image_index):
+    """Encoded bytes of an embedded image."""
+    image = glb.json['images'][image_index]
+    if 'bufferView' not in image:
+        raise ValueError(f"Image {image_index} is not embedded (uri: {image.get('uri')})")
+    return buffer_view_bytes(glb, image['bufferView'])
+
+
+def set_image_bytes(glb, image_index, data, mime_type=None):
+    """Point an image at new encoded bytes. Call compact() to drop the old ones."""
+    image = glb.json['images'][image_index]
+    image.pop('uri', None)
+    image['bufferView'] = add_buffer_view(glb, data)
+    if mime_type:
+        image['mimeType'] = mime_type
+
+
+def image_size(data):
+    """(width, height) from PNG or JPEG header bytes, or None if unknown."""
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return struct.unpack('>II', data[16:24])
+    if data[:2] == b'\xff\xd8':
+        offset = 2
+        while offset + 9 < len(data):
+            if data[offset] != 0xFF:
+                offset += 1
+                continue
+            marker = data[offset + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                offset += 2
+                continue
+            segment_length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+                return width, height
+            offset += 2 + segment_length
+    return None
+
+
+def texture_usages(glb):
+    """
+    Map image index -> set of slots that sample it (e.g. 'normalTexture'):
+    material slots plus the baked textures in node.extras.bakedLighting.
+    """
+    textures = glb.json.get('textures', [])
+    usages = {}
+
+    def visit(slot, value):
+        if isinstance(value, dict):
+            if 'index' in value and slot.endswith('Texture'):
+                source = textures[value['index']].get('source')
+                if source is not None:
+                    usages.setdefault(source, set()).add(slot)
+            for key, child in value.items():
+                visit(key, child)
+
+    for material in glb.json.get('materials', []):
+        visit('', material)
+    for node in glb.json.get('nodes', []):
+        visit('', node.get('extras', {}).get('bakedLighting', {}))
+    return usages
+
+
+# ---------------------------------------------------------------------------
+# Scene graph
+# ---------------------------------------------------------------------------
+
+def iter_primitives(glb):
+    """Yield (mesh_index, primitive dict) for every primitive."""
+    for mesh_index, mesh in enumerate(glb.json.get('meshes', [])):
+        for prim in mesh.get('primitives', []):
+            yield mesh_index, prim
+
+
+def quaternion_to_matrix(q):
+    """3x3 rotation matrix from a glTF (x, y, z, w) quaternion."""
+    x, y, z, w = q
+    return np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ], dtype=np.float64)
+
+
+def node_local_matrix(node):
+    """4x4 row-major local transform of a node."""
+    if 'matrix' in node:
+        return np.array(node['matrix'], dtype=np.float64).reshape(4, 4).T
+    m = np.eye(4)
+    scale = np.array(node.get('scale', [1.0, 1.0, 1.0]))
+    m[:3, :3] = quaternion_to_matrix(node.get('rotation', [0.0, 0.0, 0.0, 1.0])) * scale
+    m[:3, 3] = node.get('translation', [0.0, 0.0, 0.0])
+    return m
+
+
+def scene_roots(glb):
+    """Root node indices of the default scene (or all parentless nodes)."""
+    scenes = glb.json.get('scenes')
+    if scenes:
+        return list(scenes[glb.json.get('scene', 0)].get('nodes', []))
+    children = {c for node in glb.json.get('nodes', []) for c in node.get('children', [])}
+    return [i for i in range(len(glb.json.get('nodes', []))) if i not in children]
+
+
+def node_parents(glb):
+    """Map child node index -> parent node index."""
+    parents = {}
+    for i, node in enumerate(glb.json.get('nodes', [])):
+        for child in node.get('children', []):
+            parents[child] = i
+    return parents
+
+
+def world_matrices(glb):
+    """Map node index -> 4x4 row-major world matrix for nodes in the scene."""
+    nodes = glb.json.get('nodes', [])
+    world = {}
+    stack = [(root, np.eye(4)) for root in scene_roots(glb)]
+    while stack:
+        index, parent = stack.pop()
+        matrix = parent @ node_local_matrix(nodes[index])
+        world[index] = matrix
+        for child in nodes[index].get('children', []):
+            stack.append((child, matrix))
+    return world
+
+
+def transform_points(matrix, points):
+    """Apply a 4x4 row-major matrix to an (n, 3) array."""
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+# ---------------------------------------------------------------------------
+# Compaction
+# ---------------------------------------------------------------------------
+
+def _referenced_views(value, found):
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if key == 'bufferView' and isinstance(child, int):
+                found.add(child)
+            else:
+                _referenced_views(child, found)
+    elif isinstance(value, list):
+        for child in value:
+            _referenced_views(child, found)
+
+
+def _remap_views(value, remap):
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if key == 'bufferView' and isinstance(child, int):
+                value[key] = remap[child]
+            else:
+                _remap_views(child, remap)
+    elif isinstance(value, list):
+        for child in value:
+            _remap_views(child, remap)
+
+
+def compact(glb):
+    """
+    Drop unused accessors and bufferViews and rebuild the BIN chunk.
+
+    Stages append replacement data rather than editing in place, so call
+    this before write_glb() to reclaim the space of anything replaced.
+    """
+    document = glb.json
+
+    used_accessors = set()
+    for mesh in document.get('meshes', []):
+        for prim in mesh.get('primitives', []):
+            used_accessors.update(prim.get('attributes', {}).values())
+            for target in prim.get('targets', []):
+                used_accessors.update(target.values())
+            if 'indices' in prim:
+                used_accessors.add(prim['indices'])
+    for animation in document.get('animations', []):
+        for sampler in animation.get('samplers', []):
+            used_accessors.update((sampler['input'], sampler['output']))
+    for skin in document.get('skins', []):
+        if 'inverseBindMatrices' in skin:
+            used_accessors.add(skin['inverseBindMatrices'])
+    for node in document.get('nodes', []):
+        instancing = node.get('extensions', {}).get('EXT_mesh_gpu_instancing')
+        if instancing:
+            used_accessors.update(instancing.get('attributes', {}).values())
+
+    accessors = document.get('accessors', [])
+    accessor_remap = {}
+    kept_accessors = []
+    for i, accessor in enumerate(accessors):
+        if i in used_accessors:
+            accessor_remap[i] = len(kept_accessors)
+            kept_accessors.append(accessor)
+    if accessors:
+        document['accessors'] = kept_accessors
+    _remap_accessor_refs(document, accessor_remap)
+
+    # bufferViews referenced by anything (accessors, images, extensions)
+    used_views = set()
+    _referenced_views({k: v for k, v in document.items() if k != 'bufferViews'}, used_views)
+    old_bin = glb.bin
+    new_bin = bytearray()
+    view_remap = {}
+    kept_views = []
+    for i, view in enumerate(document.get('bufferViews', [])):
+        if i not in used_views:
+            continue
+        start = view.get('byteOffset', 0)
+        chunk = old_bin[start:start + view['byteLength']]
+        new_bin += b'\0' * (-len(new_bin) % 4)
+        view = dict(view, byteOffset=len(new_bin))
+        new_bin += chunk
+        view_remap[i] = len(kept_views)
+        kept_views.append(view)
+    if 'bufferViews' in document:
+        document['bufferViews'] = kept_views
+    _remap_views({k: v for k, v in document.items() if k != 'bufferViews'}, view_remap)
+    glb.bin = new_bin
+
+
+def _remap_accessor_refs(document, remap):
+    for mesh in document.get('meshes', []):
+        for prim in mesh.get('primitives', []):
+            prim['attributes'] = {k: remap[v] for k, v in prim.get('attributes', {}).items()}
+            if 'targets' in prim:
+                prim['targets'] = [{k: remap[v] for k, v in t.items()} for t in prim['targets']]
+            if 'indices' in prim:
+                prim['indices'] = remap[prim['indices']]
+    for animation in document.get('animations', []):
+        for sampler in animation.get('samplers', []):
+            sampler['input'] = remap[sampler['input']]
+            sampler['output'] = remap[sampler['output']]
+    for skin in document.get('skins', []):
+        if 'inverseBindMatrices' in skin:
+            skin['inverseBindMatrices'] = remap[skin['inverseBindMatrices']]
+    for node in document.get('nodes', []):
+        instancing = node.get('extensions', {}).get('EXT_mesh_gpu_instancing')
+        if instancing:
+            instancing['attributes'] = {
+                k: remap[v] for k, v in instancing.get('attributes', {}).items()}
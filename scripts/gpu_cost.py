@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Stellar Descent - GPU Memory and Draw-Call Estimator
+
+File size says little about what a model costs on device: a 2 MB PNG becomes
+16 MB of RGBA8 plus mips, and every primitive is a draw call. This estimates,
+per GLB:
+
+  vertexBytes   vertex buffers at their accessor formats (morph targets too)
+  indexBytes    index buffers (uint8 indices are widened to uint16)
+  textureBytes  every sampled image decoded to RGBA8, plus the mip chain
+                (x4/3) unless its sampler disables mipmapping
+  drawCalls     primitives per mesh instance in the scene
+  materials     distinct materials used by those draws
+
+Textures split by split_textures.py are costed at their full streamed
+resolution (from <name>.textures.json), since that is the steady state.
+
+Each model is checked against a per-category budget. Categories follow
+LODManager.ts (enemy, prop, environment, vehicle, player, decoration) and are
+derived from the model's folder under public/assets/models/. With --levels,
+costs are rolled up per level from the manifests in src/game/assets/levels/
+(the distinct models each level loads) and checked against LEVEL_BUDGET.
+
+Usage:
+    python3 scripts/gpu_cost.py public/assets/models/
+    python3 scripts/gpu_cost.py public/assets/models/ --levels --report gpu-cost.json
+
+audit_glbs.py runs estimate_gpu_cost() on every audited file. Runs with plain
+Python 3 + numpy (no Blender needed).
+"""
+
+import argparse
+import json
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import (
+    read_glb, collect_glbs, image_bytes, image_size, world_matrices, COMPONENT_DTYPES, TYPE_SIZES,
+)
+from asset_db import category_for
+
+REPO_ROOT = SCRIPT_DIR.parent
+LEVEL_ASSETS_DIR = REPO_ROOT / 'src' / 'game' / 'assets'
+
+MB = 1024 * 1024
+
+# Folder under models/ -> LODManager category; first matching prefix wins.
+# Anything unmatched is a prop, the same fallback LODManager.getConfig() uses.
+LOD_CATEGORY_RULES = [
+    ('props/weapons', 'player'),
+    ('props/decals', 'decoration'),
+    ('props/debris', 'decoration'),
+    ('props/atmospheric', 'decoration'),
+    ('environment/alien-flora', 'decoration'),
+    ('props', 'prop'),
+    ('environment', 'environment'),
+    ('enemies', 'enemy'),
+    ('npcs', 'enemy'),
+    ('vehicles', 'vehicle'),
+    ('spaceships', 'vehicle'),
+]
+
+# Per-model budgets, sized for mobile GPUs
+CATEGORY_BUDGETS = {
+    'enemy': {'gpuMB': 24, 'drawCalls': 8},
+    'prop': {'gpuMB': 8, 'drawCalls': 4},
+    'environment': {'gpuMB': 16, 'drawCalls': 8},
+    'vehicle': {'gpuMB': 32, 'drawCalls': 12},
+    'player': {'gpuMB': 24, 'drawCalls': 10},
+    'decoration': {'gpuMB': 4, 'drawCalls': 2},
+}
+
+# Everything one level loads (required + preload + deferred), once per model
+LEVEL_BUDGET = {'gpuMB': 384, 'drawCalls': 600}
+
+# Sampler minFilter values without mipmaps (NEAREST, LINEAR)
+NO_MIP_FILTERS = {9728, 9729}
+
+
+def lod_category(category_path):
+    """LODManager category for a folder path under models/ (e.g. 'props/weapons')."""
+    for prefix, category in LOD_CATEGORY_RULES:
+        if category_path == prefix or category_path.startswith(prefix + '/'):
+            return category
+    return 'prop'
+
+
+def vertex_buffer_bytes(accessor):
+    itemsize = np.dtype(COMPONENT_DTYPES[accessor['componentType']]).itemsize
+    # Vertex attributes are padded to 4-byte elements on the GPU
+    element = (itemsize * TYPE_SIZES[accessor['type']] + 3) // 4 * 4
+    return accessor['count'] * element
+
+
+def index_buffer_bytes(accessor):
+    # Babylon uploads uint8 indices as uint16
+    itemsize = max(np.dtype(COMPONENT_DTYPES[accessor['componentType']]).itemsize, 2)
+    return accessor['count'] * itemsize
+
+
+def texture_sizes(glb, glb_path):
+    """Map image index -> (width, height) at the resolution the game ends up using."""
+    sizes = {}
+    for i, image in enumerate(glb.json.get('images', [])):
+        data = None
+        if 'bufferView' in image:
+            data = image_bytes(glb, i)
+        elif glb_path and 'uri' in image and not image['uri'].startswith('data:'):
+            external = Path(glb_path).parent / image['uri']
+            if external.exists():
+                data = external.read_bytes()
+        size = image_size(data) if data else None
+        if size:
+            sizes[i] = size
+
+    if glb_path:
+        sidecar = Path(glb_path).with_suffix('.textures.json')
+        if sidecar.exists():
+            with open(sidecar) as f:
+                for entry in json.load(f).get('textures', []):
+                    sizes[entry['image']] = (entry['width'], entry['height'])
+    return sizes
+
+
+def estimate_gpu_cost(glb, glb_path=None):
+    """Estimated GPU bytes and draw calls for a parsed GLB."""
+    document = glb.json
+    accessors = document.get('accessors', [])
+    meshes = document.get('meshes', [])
+    nodes = document.get('nodes', [])
+
+    vertex_accessors = set()
+    index_accessors = set()
+    for mesh in meshes:
+        for prim in mesh.get('primitives', []):
+            vertex_accessors.update(prim.get('attributes', {}).values())
+            for target in prim.get('targets', []):
+                vertex_accessors.update(target.values())
+            if 'indices' in prim:
+                index_accessors.add(prim['indices'])
+    vertex_bytes = sum(vertex_buffer_bytes(accessors[i]) for i in vertex_accessors)
+    index_bytes = sum(index_buffer_bytes(accessors[i]) for i in index_accessors)
+
+    draw_calls = 0
+    materials = set()
+    for node_index in world_matrices(glb):
+        node = nodes[node_index]
+        if 'mesh' not in node:
+            continue
+        for prim in meshes[node['mesh']].get('primitives', []):
+            draw_calls += 1
+            materials.add(prim.get('material', -1))
+
+    # Each image is uploaded once; mipmapped if any sampler using it wants mips
+    samplers = document.get('samplers', [])
+    image_mips = {}
+    for texture in document.get('textures', []):
+        sources = [texture.get('source')] + [
+            ext.get('source') for ext in texture.get('extensions', {}).values()
+            if isinstance(ext, dict)]
+        sampler = samplers[texture['sampler']] if 'sampler' in texture else {}
+        mips = sampler.get('minFilter') not in NO_MIP_FILTERS
+        for source in sources:
+            if source is not None:
+                image_mips[source] = image_mips.get(source, False) or mips
+
+    sizes = texture_sizes(glb, glb_path)
+    texture_bytes = 0
+    for image_index, mips in image_mips.items():
+        if image_index in sizes:
+            width, height = sizes[image_index]
+            level0 = width * height * 4
+            texture_bytes += level0 * 4 // 3 if mips else level0
+
+    return {
+        'vertexBytes': vertex_bytes,
+        'indexBytes': index_bytes,
+        'textureBytes': texture_bytes,
+        'totalBytes': vertex_bytes + index_bytes + texture_bytes,
+        'drawCalls': draw_calls,
+        'materials': len(materials),
+        'textures': len(image_mips),
+    }
+
+
+def budget_warnings(cost, category):
+    """Warnings for a cost estimate that exceeds its category budget."""
+    budget = CATEGORY_BUDGETS[category]
+    warnings = []
+    if cost['totalBytes'] > budget['gpuMB'] * MB:
+        warnings.append(f"GPU memory {cost['totalBytes'] / MB:.1f} MB over {category} "
+                        f"budget of {budget['gpuMB']} MB")
+    if cost['drawCalls'] > budget['drawCalls']:
+        warnings.append(f"{cost['drawCalls']} draw calls over {category} "
+                        f"budget of {budget['drawCalls']}")
+    return warnings
+
+
+def cost_glb(glb_path):
+    """Cost one GLB file. Returns a result dict (status OK/OVER_BUDGET/FAILED)."""
+    category = lod_category(category_for(glb_path))
+    try:
+        cost = estimate_gpu_cost(read_glb(glb_path), glb_path)
+    except Exception as e:
+        return {'file': str(glb_path), 'category': category, 'status': f'FAILED: {e}'}
+    warnings = budget_warnings(cost, category)
+    return {
+        'file': str(glb_path),
+        'category': category,
+        'status': 'OVER_BUDGET' if warnings else 'OK',
+        'warnings': warnings,
+        **cost,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Per-level rollup
+# ---------------------------------------------------------------------------
+
+# Comments are dropped first (they quote ids and contain apostrophes); strings are kept
+COMMENT_RE = re.compile(r"""('(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*"|`(?:[^`\\]|\\.)*`)|//[^\n]*|/\*.*?\*/""",
+                        re.S)
+OBJECT_RE = re.compile(r"\{([^{}]*)\}")
+FIELD_RE = r"\b{}:\s*'([^']+)'"
+MANIFEST_RE = re.compile(r"levelId:\s*'([^']+)'(.*?)\n};", re.S)
+LIST_RE = re.compile(r"(?:required|preload|deferred):\s*\[(.*?)\]", re.S)
+
+
+def strip_comments(text):
+    return COMMENT_RE.sub(lambda m: m.group(1) or '', text)
+
+
+def level_models(assets_dir=LEVEL_ASSETS_DIR):
+    """
+    Map level id -> (sorted GLB paths on disk, sorted manifest ids with no
+    asset entry) from the asset manifests. Entries whose path is not a GLB
+    (textures, audio) are not models and are not reported.
+    """
+    sources = sorted((assets_dir / 'levels').glob('*.ts')) + [assets_dir / 'shared.ts']
+    paths_by_id = {}
+    manifests = {}
+    for source in sources:
+        if not source.exists():
+            continue
+        text = strip_comments(source.read_text())
+        # Asset entries are object literals with id and path in any order
+        for body in OBJECT_RE.findall(text):
+            asset_id = re.search(FIELD_RE.format('id'), body)
+            path = re.search(FIELD_RE.format('path'), body)
+            if asset_id and path:
+                paths_by_id[asset_id.group(1)] = path.group(1)
+        for level_id, body in MANIFEST_RE.findall(text):
+            ids = [i for block in LIST_RE.findall(body) for i in re.findall(r"'([^']+)'", block)]
+            manifests[level_id] = ids
+    levels = {}
+    for level, ids in manifests.items():
+        paths = {REPO_ROOT / 'public' / paths_by_id[i].lstrip('/') for i in ids
+                 if paths_by_id.get(i, '').lower().endswith('.glb')}
+        levels[level] = (sorted(paths), sorted({i for i in ids if i not in paths_by_id}))
+    return levels
+
+
+def level_rollup(results, levels):
+    """
+    Sum model costs per level. Models the audit didn't cover are listed as
+    missing, manifest ids without an asset entry as unresolved.
+    """
+    by_path = {Path(r['file']).resolve(): r for r in results if 'totalBytes' in r}
+    rollup = {}
+    for level, (paths, unresolved) in sorted(levels.items()):
+        costs = [by_path[p.resolve()] for p in paths if p.resolve() in by_path]
+        total = sum(c['totalBytes'] for c in costs)
+        draws = sum(c['drawCalls'] for c in costs)
+        warnings = []
+        if total > LEVEL_BUDGET['gpuMB'] * MB:
+            warnings.append(f"GPU memory {total / MB:.0f} MB over level budget of {LEVEL_BUDGET['gpuMB']} MB")
+        if draws > LEVEL_BUDGET['drawCalls']:
+            warnings.append(f"{draws} draw calls over level budget of {LEVEL_BUDGET['drawCalls']}")
+        heaviest = sorted(costs, key=lambda c: -c['totalBytes'])[:5]
+        rollup[level] = {
+            'models': len(paths),
+            'missing': [str(p) for p in paths if p.resolve() not in by_path],
+            'unresolved': unresolved,
+            'totalBytes': total,
+            'textureBytes': sum(c['textureBytes'] for c in costs),
+            'drawCalls': draws,
+            'heaviest': [{'file': c['file'], 'totalBytes': c['totalBytes']} for c in heaviest],
+            'status': 'OVER_BUDGET' if warnings else 'OK',
+            'warnings': warnings,
+        }
+    return rollup
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Estimate GPU memory and draw calls per GLB and per level')
+    parser.add_argument('paths', nargs='+', help='GLB files or directories')
+    parser.add_argument(
+        '--levels', action='store_true',
+        help='Roll costs up per level from src/game/assets/levels/')
+    parser.add_argument('--report', default=None, help='Write a JSON report to this path')
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=None,
+        help='Worker processes (default: CPU count)')
+    return parser.parse_args(raw_args)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    glb_files = collect_glbs(args.paths)
+    print(f"\nEstimating GPU cost of {len(glb_files)} GLB files...")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        for i, result in enumerate(pool.map(cost_glb, glb_files)):
+            results.append(result)
+            name = Path(result['file']).name
+            if 'totalBytes' in result:
+                print(f"  [{i+1}/{len(glb_files)}] {name} [{result['status']}] "
+                      f"{result['totalBytes'] / MB:.1f} MB, {result['drawCalls']} draws ({result['category']})")
+                for warning in result['warnings']:
+                    print(f"    {warning}")
+            else:
+                print(f"  [{i+1}/{len(glb_files)}] {name} [{result['status']}]")
+
+    report = {'models': results}
+    if args.levels:
+        report['levels'] = level_rollup(results, level_models())
+
+    costed = [r for r in results if 'totalBytes' in r]
+    print(f"\n=== GPU COST SUMMARY ===")
+    print(f"Models: {len(costed)} costed, {len(results) - len(costed)} failed")
+    print(f"Over budget: {sum(1 for r in costed if r['status'] == 'OVER_BUDGET')}")
+    for category in CATEGORY_BUDGETS:
+        members = [r for r in costed if r['category'] == category]
+        if members:
+            print(f"  {category:12s} {len(members):4d} models "
+                  f"{sum(r['totalBytes'] for r in members) / MB:9.1f} MB "
+                  f"{sum(r['drawCalls'] for r in members):6d} draws")
+    if args.levels:
+        print(f"\n=== PER LEVEL (budget {LEVEL_BUDGET['gpuMB']} MB, {LEVEL_BUDGET['drawCalls']} draws) ===")
+        for level, entry in report['levels'].items():
+            missing = f", {len(entry['missing'])} not costed" if entry['missing'] else ''
+            if entry['unresolved']:
+                missing += f", {len(entry['unresolved'])} unresolved ids"
+            print(f"  {level:18s} [{entry['status']}] {entry['totalBytes'] / MB:7.1f} MB "
+                  f"{entry['drawCalls']:5d} draws, {entry['models']} models{missing}")
+            for asset_id in entry['unresolved']:
+                print(f"    unresolved: {asset_id}")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to: {args.report}")
+
+
+if __name__ == '__main__':
+    main()
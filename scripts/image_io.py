@@ -0,0 +1,128 @@
+"""
+Stellar Descent - Image decode/encode helpers (Blender)
+
+Decodes embedded GLB image bytes into numpy pixel arrays and encodes them
+back, using Blender's image API so no extra imaging library is needed. Must
+run inside Blender (`blender --background --python ...`).
+
+Pixel arrays are float32 RGBA in 0-1, shape (height, width, 4), with row 0
+at the TOP of the image (glTF UV convention). Images are loaded as
+Non-Color so values are never colour-managed.
+
+Usage:
+    from image_io import decode_image, encode_image, resize_image
+    pixels = decode_image(data)
+    data = encode_image(pixels, 'image/png')
+"""
+
+import os
+import tempfile
+
+import bpy
+import numpy as np
+
+MIME_EXTENSIONS = {
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/webp': '.webp',
+}
+
+MIME_FORMATS = {
+    'image/png': 'PNG',
+    'image/jpeg': 'JPEG',
+    'image/webp': 'WEBP',
+}
+
+
+def sniff_mime_type(data):
+    """MIME type from magic bytes (PNG/JPEG/WebP), or None."""
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'image/png'
+    if data[:2] == b'\xff\xd8':
+        return 'image/jpeg'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def _temp_path(mime_type):
+    fd, path = tempfile.mkstemp(suffix=MIME_EXTENSIONS.get(mime_type, '.png'))
+    os.close(fd)
+    return path
+
+
+def _image_to_array(image):
+    w, h = image.size
+    pixels = np.empty(w * h * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    # Blender stores rows bottom-up
+    return pixels.reshape(h, w, 4)[::-1].copy()
+
+
+def decode_image(data, mime_type=None):
+    """Decode encoded image bytes to a (h, w, 4) float32 array."""
+    mime_type = mime_type or sniff_mime_type(data)
+    path = _temp_path(mime_type)
+    try:
+        with open(path, 'wb') as f:
+            f.write(data)
+        image = bpy.data.images.load(path)
+        try:
+            image.colorspace_settings.name = 'Non-Color'
+            return _image_to_array(image)
+        finally:
+            bpy.data.images.remove(image)
+    finally:
+        os.remove(path)
+
+
+def encode_image(pixels, mime_type='image/png'):
+    """Encode a (h, w, 4) or (h, w, 3) float array (0-1) to image bytes."""
+    h, w = pixels.shape[:2]
+    if pixels.shape[2] == 3:
+        pixels = np.concatenate([pixels, np.ones((h, w, 1), dtype=np.float32)], axis=2)
+    image = bpy.data.images.new('__encode__', width=w, height=h, alpha=True)
+    path = _temp_path(mime_type)
+    try:
+        image.colorspace_settings.name = 'Non-Color'
+        flat = np.ascontiguousarray(pixels[::-1], dtype=np.float32).ravel()
+        image.pixels.foreach_set(np.clip(flat, 0.0, 1.0))
+        image.filepath_raw = path
+        image.file_format = MIME_FORMATS[mime_type]
+        image.save()
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        bpy.data.images.remove(image)
+        os.remove(path)
+
+
+def resize_pixels(pixels, width, height):
+    """Resample a pixel array to (height, width) using Blender's scaler."""
+    h, w = pixels.shape[:2]
+    if (w, h) == (width, height):
+        return pixels
+    image = bpy.data.images.new('__resize__', width=w, height=h, alpha=True)
+    try:
+        image.colorspace_settings.name = 'Non-Color'
+        image.pixels.foreach_set(np.ascontiguousarray(pixels[::-1], dtype=np.float32).ravel())
+        image.scale(width, height)
+        return _image_to_array(image)
+    finally:
+        bpy.data.images.remove(image)
+
+
+def resize_image(data, width, height, mime_type=None):
+    """Decode, resample and re-encode image bytes in the same format."""
+    mime_type = mime_type or sniff_mime_type(data)
+    pixels = resize_pixels(decode_image(data, mime_type), width, height)
+    return encode_image(pixels, mime_type)
+
+
+def fit_size(width, height, max_size):
+    """Largest power-of-two size within max_size, keeping aspect ratio."""
+    scale = min(1.0, max_size / max(width, height))
+    def pot(v):
+        v = max(1, int(round(v * scale)))
+        return 1 << (v.bit_length() - 1)
+    return pot(width), pot(height)
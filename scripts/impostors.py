@@ -0,0 +1,350 @@
+"""
+Stellar Descent - Impostor Atlas Generator
+
+Renders multi-view impostors for props, alien flora and vehicles, so
+LODManager can swap a distant model for one camera-facing quad past its
+billboardDistance. Uses headless Cycles on the CPU with a uniform white sky
+(no baked sun direction; the normal atlas lets the runtime relight). Writes
+next to each model:
+
+  <name>_impostor.png       colour atlas, sRGB, straight alpha
+  <name>_impostor_nd.png    view-space normal (RGB = 0.5 + 0.5 * n) and
+                            depth (A: 0 = nearest point of the bounding
+                            sphere, 1 = farthest)
+  <name>.impostor.json      layout and per-tile view directions
+
+Layouts:
+  ring (default)      --views yaw angles around the up axis at --elevation
+                      degrees. Matches the Y-axis billboards LODManager makes.
+  octahedral          --grid x --grid views over the upper hemisphere. Tile
+                      centre p in [-1, 1]^2 decodes to the view direction
+                      x = (p.x + p.y) / 2, z = (p.x - p.y) / 2,
+                      y = 1 - |x| - |z|, normalised.
+
+Sidecar format (glTF space, Y-up, metres):
+    {
+      "version": 1,
+      "glb": "alien_tree_1.glb",
+      "layout": "ring",
+      "tileSize": 256,
+      "grid": [4, 2],
+      "center": [x, y, z],
+      "radius": r,
+      "color": "alien_tree_1_impostor.png",
+      "normalDepth": "alien_tree_1_impostor_nd.png",
+      "views": [{"tile": 0, "direction": [x, y, z]}, ...]
+    }
+
+Each tile shows the model from `direction` (model centre towards the camera)
+with an orthographic view 2 * radius wide, so the quad is 2r x 2r at `center`.
+Models whose impostor is newer than the GLB are skipped unless --force.
+
+Usage:
+    blender --background --python scripts/impostors.py -- public/assets/models/environment/alien-flora/
+    blender --background --python scripts/impostors.py -- public/assets/models/vehicles/ \\
+        --layout octahedral --grid 8 --tile-size 128
+
+Requires: Blender 3.6+ (Cycles), numpy
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import bpy
+import mathutils
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import collect_glbs
+from image_io import encode_image
+
+CAMERA_DISTANCE = 3.0   # in bounding-sphere radii
+DILATE_PIXELS = 4       # colour bleed into transparent pixels so mips don't halo
+PASSES = ('color', 'normal', 'depth')
+
+
+def get_args():
+    argv = sys.argv
+    if '--' in argv:
+        return argv[argv.index('--') + 1:]
+    return []
+
+
+# ---------------------------------------------------------------------------
+# View directions (glTF space, Y-up)
+# ---------------------------------------------------------------------------
+
+def ring_directions(views, elevation_deg):
+    elevation = math.radians(elevation_deg)
+    return [
+        (math.cos(elevation) * math.sin(yaw), math.sin(elevation), math.cos(elevation) * math.cos(yaw))
+        for yaw in (2 * math.pi * i / views for i in range(views))
+    ]
+
+
+def octahedral_directions(grid):
+    directions = []
+    for row in range(grid):
+        for col in range(grid):
+            px = (col + 0.5) / grid * 2 - 1
+            py = (row + 0.5) / grid * 2 - 1
+            x, z = (px + py) / 2, (px - py) / 2
+            y = 1 - abs(x) - abs(z)
+            length = math.sqrt(x * x + y * y + z * z)
+            directions.append((x / length, y / length, z / length))
+    return directions
+
+
+def gltf_to_blender(v):
+    x, y, z = v
+    return mathutils.Vector((x, -z, y))
+
+
+def blender_to_gltf(v):
+    x, y, z = v
+    return [x, z, -y]
+
+
+# ---------------------------------------------------------------------------
+# Scene
+# ---------------------------------------------------------------------------
+
+def setup_scene(tile_size, samples, out_dir):
+    scene = bpy.context.scene
+    scene.render.engine = 'CYCLES'
+    scene.cycles.device = 'CPU'
+    scene.cycles.samples = samples
+    scene.render.resolution_x = tile_size
+    scene.render.resolution_y = tile_size
+    scene.render.resolution_percentage = 100
+    scene.render.film_transparent = True
+    scene.view_settings.view_transform = 'Standard'
+    scene.frame_current = 1
+
+    world = bpy.data.worlds.new('ImpostorSky')
+    world.use_nodes = True
+    world.node_tree.nodes['Background'].inputs['Color'].default_value = (1.0, 1.0, 1.0, 1.0)
+    scene.world = world
+
+    view_layer = scene.view_layers[0]
+    view_layer.use_pass_normal = True
+    view_layer.use_pass_z = True
+
+    # Write every pass as float EXR through the compositor
+    scene.use_nodes = True
+    tree = scene.node_tree
+    tree.nodes.clear()
+    layers = tree.nodes.new('CompositorNodeRLayers')
+    output = tree.nodes.new('CompositorNodeOutputFile')
+    output.base_path = out_dir
+    output.format.file_format = 'OPEN_EXR'
+    output.format.color_depth = '32'
+    output.file_slots.clear()
+    sockets = [layers.outputs['Image'], layers.outputs['Normal'],
+               layers.outputs.get('Depth') or layers.outputs['Z']]
+    for name, socket in zip(PASSES, sockets):
+        output.file_slots.new(name)
+        tree.links.new(socket, output.inputs[name])
+
+    camera_data = bpy.data.cameras.new('ImpostorCamera')
+    camera_data.type = 'ORTHO'
+    camera = bpy.data.objects.new('ImpostorCamera', camera_data)
+    scene.collection.objects.link(camera)
+    scene.camera = camera
+    return output, camera
+
+
+def model_sphere():
+    """Bounding sphere (Blender space) of all mesh objects."""
+    corners = [obj.matrix_world @ mathutils.Vector(c)
+               for obj in bpy.data.objects if obj.type == 'MESH' for c in obj.bound_box]
+    if not corners:
+        return None, 0.0
+    lo = mathutils.Vector([min(c[i] for c in corners) for i in range(3)])
+    hi = mathutils.Vector([max(c[i] for c in corners) for i in range(3)])
+    center = (lo + hi) / 2
+    return center, max((c - center).length for c in corners)
+
+
+def load_exr(path):
+    image = bpy.data.images.load(path)
+    try:
+        w, h = image.size
+        pixels = np.empty(w * h * 4, dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        return pixels.reshape(h, w, 4)[::-1].copy()
+    finally:
+        bpy.data.images.remove(image)
+
+
+def render_view(output, camera, center, radius, direction, out_dir, view):
+    """Render one view. Returns (colour rgba, normal-depth rgba), straight alpha."""
+    offset = gltf_to_blender(direction)
+    camera.location = center + offset * radius * CAMERA_DISTANCE
+    camera.rotation_euler = (-offset).to_track_quat('-Z', 'Y').to_euler()
+    camera.data.ortho_scale = radius * 2
+    camera.data.clip_start = radius * (CAMERA_DISTANCE - 1.5)
+    camera.data.clip_end = radius * (CAMERA_DISTANCE + 1.5)
+    bpy.context.view_layer.update()
+
+    for slot, name in zip(output.file_slots, PASSES):
+        slot.path = f"{name}_{view}_"
+    bpy.ops.render.render(write_still=False)
+
+    def read(name):
+        path = glob.glob(os.path.join(out_dir, f"{name}_{view}_*.exr"))[0]
+        return load_exr(path)
+
+    color = read('color')
+    normal = read('normal')[..., :3]
+    depth = read('depth')[..., 0]
+    alpha = color[..., 3]
+
+    # Premultiplied linear -> straight sRGB
+    rgb = np.where(alpha[..., None] > 0, color[..., :3] / np.maximum(alpha[..., None], 1e-6), 0.0)
+    rgb = np.clip(rgb, 0.0, 1.0)
+    rgb = np.where(rgb <= 0.0031308, rgb * 12.92, 1.055 * np.power(rgb, 1 / 2.4) - 0.055)
+
+    # World normals -> camera space (x right, y up, z towards the viewer)
+    rotation = np.array(camera.matrix_world.to_3x3())
+    view_normal = normal @ rotation
+    encoded_normal = np.where(alpha[..., None] > 0, 0.5 + 0.5 * view_normal, 0.5)
+    near = radius * (CAMERA_DISTANCE - 1)
+    encoded_depth = np.where(alpha > 0, np.clip((depth - near) / (2 * radius), 0.0, 1.0), 1.0)
+
+    color_tile = np.dstack([dilate(rgb, alpha), alpha])
+    nd_tile = np.dstack([encoded_normal, encoded_depth])
+    return color_tile, nd_tile
+
+
+def dilate(rgb, alpha, iterations=DILATE_PIXELS):
+    """Spread edge colours into transparent pixels (4-neighbour average)."""
+    rgb = rgb.copy()
+    filled = alpha > 0
+    for _ in range(iterations):
+        total = np.zeros_like(rgb)
+        count = np.zeros(filled.shape, dtype=np.float32)
+        for axis, shift in ((0, 1), (0, -1), (1, 1), (1, -1)):
+            total += np.roll(rgb * filled[..., None], shift, axis=axis)
+            count += np.roll(filled, shift, axis=axis)
+        grow = ~filled & (count > 0)
+        rgb[grow] = total[grow] / count[grow][:, None]
+        filled = filled | grow
+    return rgb
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def make_impostor(glb_path, args):
+    """Render the impostor atlases for one GLB. Returns a short status string."""
+    sidecar_path = glb_path.with_suffix('.impostor.json')
+    if (not args.force and sidecar_path.exists()
+            and sidecar_path.stat().st_mtime >= glb_path.stat().st_mtime):
+        return 'UP_TO_DATE'
+
+    bpy.ops.wm.read_homefile(use_empty=True)
+    bpy.ops.import_scene.gltf(filepath=str(glb_path))
+    center, radius = model_sphere()
+    if center is None or radius <= 0:
+        return 'NO_GEOMETRY'
+
+    if args.layout == 'ring':
+        directions = ring_directions(args.views, args.elevation)
+        cols = math.ceil(math.sqrt(len(directions)))
+    else:
+        directions = octahedral_directions(args.grid)
+        cols = args.grid
+    rows = math.ceil(len(directions) / cols)
+    tile = args.tile_size
+
+    out_dir = tempfile.mkdtemp(prefix='impostor_')
+    try:
+        output, camera = setup_scene(tile, args.samples, out_dir)
+        color_atlas = np.zeros((rows * tile, cols * tile, 4), dtype=np.float32)
+        nd_atlas = np.zeros((rows * tile, cols * tile, 4), dtype=np.float32)
+        nd_atlas[..., :3] = 0.5
+        nd_atlas[..., 3] = 1.0
+        for view, direction in enumerate(directions):
+            color_tile, nd_tile = render_view(output, camera, center, radius, direction, out_dir, view)
+            r, c = divmod(view, cols)
+            color_atlas[r * tile:(r + 1) * tile, c * tile:(c + 1) * tile] = color_tile
+            nd_atlas[r * tile:(r + 1) * tile, c * tile:(c + 1) * tile] = nd_tile
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    stem = glb_path.stem
+    color_name = f"{stem}_impostor.png"
+    nd_name = f"{stem}_impostor_nd.png"
+    with open(glb_path.parent / color_name, 'wb') as f:
+        f.write(encode_image(color_atlas, 'image/png'))
+    with open(glb_path.parent / nd_name, 'wb') as f:
+        f.write(encode_image(nd_atlas, 'image/png'))
+
+    sidecar = {
+        'version': 1,
+        'glb': glb_path.name,
+        'layout': args.layout,
+        'tileSize': tile,
+        'grid': [cols, rows],
+        'center': [round(v, 4) for v in blender_to_gltf(center)],
+        'radius': round(radius, 4),
+        'color': color_name,
+        'normalDepth': nd_name,
+        'views': [{'tile': i, 'direction': [round(v, 5) for v in d]} for i, d in enumerate(directions)],
+    }
+    with open(sidecar_path, 'w') as f:
+        json.dump(sidecar, f, separators=(',', ':'))
+    return 'RENDERED'
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(description='Render impostor atlases for distant-LOD billboards')
+    parser.add_argument('paths', nargs='+', help='GLB files or directories')
+    parser.add_argument('--layout', choices=['ring', 'octahedral'], default='ring',
+                        help='View layout (default: ring)')
+    parser.add_argument('--views', type=int, default=8, help='Ring views (default: 8)')
+    parser.add_argument('--elevation', type=float, default=10.0,
+                        help='Ring camera elevation in degrees (default: 10)')
+    parser.add_argument('--grid', type=int, default=8, help='Octahedral grid size (default: 8)')
+    parser.add_argument('--tile-size', type=int, default=256, help='Pixels per view (default: 256)')
+    parser.add_argument('--samples', type=int, default=32, help='Cycles samples (default: 32)')
+    parser.add_argument('--force', action='store_true', help='Re-render up-to-date impostors')
+    return parser.parse_args(raw_args)
+
+
+def main():
+    args = parse_args(get_args())
+    glb_files = collect_glbs(args.paths)
+    print(f"\nRendering {args.layout} impostors for {len(glb_files)} GLB files "
+          f"({args.tile_size}px tiles, {args.samples} samples)...")
+
+    counts = {}
+    for i, glb_path in enumerate(glb_files):
+        print(f"  [{i+1}/{len(glb_files)}] {glb_path.name}")
+        try:
+            status = make_impostor(glb_path, args)
+        except Exception as e:
+            print(f"    ERROR: {e}")
+            status = 'FAILED'
+        print(f"    [{status}]")
+        counts[status] = counts.get(status, 0) + 1
+
+    print(f"\n=== IMPOSTOR SUMMARY ===")
+    for status, count in sorted(counts.items()):
+        print(f"{status}: {count}")
+    if counts.get('FAILED'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Stellar Descent - Scale & Orientation Normalizer
+
+Source kits arrive in centimetres, inches or Z-up. audit_glbs.py flags the
+outliers (TINY below AUDIT_TINY, large above AUDIT_LARGE). This bakes the
+correction into the GLB once:
+
+  - Node transforms are baked into vertex data. NORMAL and TANGENT are
+    transformed too, mirrored transforms flip the winding, and every node
+    ends up with an identity transform.
+  - An axis correction turns Z-up into glTF Y-up. It comes from
+    AXIS_CORRECTIONS or --up.
+  - Scale only changes for models the audit would flag, or with an explicit
+    override. A flagged model is scaled by the power of ten (a unit mix-up)
+    that brings it closest to its category's typical size in SIZE_TARGETS.
+    SCALE_OVERRIDES (per file or per category) or --scale set the factor
+    outright. Correctly sized models keep their scale.
+  - Accessor min/max are recomputed, and the applied correction is written
+    to asset.extras.normalization.
+
+The category is the folder under public/assets/models/ (see
+asset_db.category_for). Files with skins, animations, morph targets,
+cameras or lights are left alone, because their transforms mean something
+at runtime. The unit scales still applied in the game code (the marines in
+player.ts and scenicRooms.ts, bare_hands in FirstPersonWeapons.ts) are all on
+such skinned or animated models, so they are never doubled by this.
+
+The converters (batch_fbx_to_glb.py, batch_blend_to_glb.py,
+convert-weapons.py) call normalize_glb() on every export. Run it directly
+for models converted before that:
+
+Usage:
+    python3 scripts/normalize_scale.py public/assets/models/props/
+    python3 scripts/normalize_scale.py model.glb --category props/modular --up z --dry-run
+
+Runs with plain Python 3 + numpy (no Blender needed).
+"""
+
+import argparse
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import (
+    read_glb, write_glb, collect_glbs, compact, read_accessor_float, add_accessor, index_dtype,
+    world_matrices, transform_points, ARRAY_BUFFER, ELEMENT_ARRAY_BUFFER,
+)
+from flatten_glbs import protected_nodes, transformed_attributes, primitive_indices, remove_unused_meshes
+import asset_db
+
+# The audit_glbs.py thresholds: a largest dimension outside these is a unit mix-up
+AUDIT_TINY = 0.01
+AUDIT_LARGE = 100.0
+
+# Typical largest dimension (metres) per category, used to pick the power of
+# ten for a flagged model. First matching prefix wins.
+SIZE_TARGETS = [
+    ('props/weapons', (0.1, 2.0)),
+    ('props/decals', (0.05, 10.0)),
+    ('props', (0.05, 5.0)),
+    ('environment/alien-flora', (0.2, 30.0)),
+    ('environment', (0.5, 60.0)),
+    ('enemies', (0.3, 20.0)),
+    ('npcs', (1.0, 3.0)),
+    ('vehicles', (1.5, 40.0)),
+    ('spaceships', (2.0, 500.0)),
+]
+DEFAULT_SIZE = (0.05, 100.0)
+
+# Explicit scale factors: a file path under public/assets/models/
+# ('environment/station/corridor_main.glb') or a category prefix
+# ('environment/station'). A file entry wins over its category.
+SCALE_OVERRIDES = {}
+
+# Categories whose sources are authored Z-up: prefix -> up axis
+AXIS_CORRECTIONS = {}
+
+UP_ROTATIONS = {
+    'y': np.eye(3),
+    # Z-up -> Y-up: (x, y, z) -> (x, z, -y)
+    'z': np.array([[1, 0, 0], [0, 0, 1], [0, -1, 0]], dtype=np.float64),
+}
+
+
+def size_target(category):
+    for prefix, target in SIZE_TARGETS:
+        if category == prefix or category.startswith(prefix + '/'):
+            return target
+    return DEFAULT_SIZE
+
+
+def source_up(category):
+    for prefix, up in AXIS_CORRECTIONS.items():
+        if category == prefix or category.startswith(prefix + '/'):
+            return up
+    return 'y'
+
+
+def scale_override(glb_path, category):
+    """Explicit scale for a file or its category, or None."""
+    relative = f"{category}/{Path(glb_path).name}" if category else Path(glb_path).name
+    if relative in SCALE_OVERRIDES:
+        return SCALE_OVERRIDES[relative]
+    for prefix, scale in SCALE_OVERRIDES.items():
+        if not prefix.lower().endswith('.glb') and (category == prefix or category.startswith(prefix + '/')):
+            return scale
+    return None
+
+
+def choose_scale(extent, target):
+    """
+    1 unless the audit would flag extent as TINY or large. Then the power of
+    ten bringing it closest to the middle of target.
+    """
+    if extent <= 0 or AUDIT_TINY <= extent <= AUDIT_LARGE:
+        return 1.0
+    low, high = target
+    mid = math.sqrt(low * high)
+    return 10.0 ** round(math.log10(mid / extent))
+
+
+def world_vertices(glb, world):
+    nodes = glb.json['nodes']
+    parts = []
+    for n, matrix in world.items():
+        if 'mesh' in nodes[n]:
+            for prim in glb.json['meshes'][nodes[n]['mesh']].get('primitives', []):
+                parts.append(transform_points(matrix, read_accessor_float(glb, prim['attributes']['POSITION'])))
+    return np.concatenate(parts) if parts else np.zeros((0, 3))
+
+
+def normalize_glb(glb_path, category=None, up=None, force=False, dry_run=False, scale=None):
+    """
+    Normalize one GLB in place. scale overrides SCALE_OVERRIDES and the
+    audit-threshold check. Returns (status, correction dict or None).
+    """
+    glb_path = Path(glb_path)
+    glb = read_glb(glb_path)
+    document = glb.json
+    extras = document.setdefault('asset', {}).setdefault('extras', {})
+    if 'normalization' in extras and not force:
+        return 'UNCHANGED', extras['normalization']
+    world = world_matrices(glb)
+    if protected_nodes(glb) & set(world):
+        return 'DYNAMIC', None
+
+    if category is None:
+        category = asset_db.category_for(glb_path)
+    up = up or source_up(category)
+    rotation = UP_ROTATIONS[up]
+    points = world_vertices(glb, world) @ rotation.T
+    if not len(points):
+        return 'NO_MESHES', None
+    source_size = points.max(axis=0) - points.min(axis=0)
+    if scale is None:
+        scale = scale_override(glb_path, category)
+    if scale is None:
+        scale = choose_scale(float(source_size.max()), size_target(category))
+
+    correction = np.eye(4)
+    correction[:3, :3] = rotation * scale
+    correction_info = {
+        'version': 1,
+        'category': category,
+        'up': up,
+        'scale': scale,
+        'sourceSize': [round(float(v), 5) for v in source_size],
+        'size': [round(float(v) * scale, 5) for v in source_size],
+    }
+    nodes = document['nodes']
+    identity = all(np.allclose(world[n], np.eye(4)) for n in world)
+    if identity and up == 'y' and scale == 1.0:
+        status = 'OK'
+    else:
+        status = 'NORMALIZED'
+    if dry_run:
+        return 'DRY_RUN' if status == 'NORMALIZED' else status, correction_info
+
+    if status == 'NORMALIZED':
+        for n, matrix in world.items():
+            node = nodes[n]
+            for key in ('matrix', 'translation', 'rotation', 'scale'):
+                node.pop(key, None)
+            if 'mesh' not in node:
+                continue
+            baked = correction @ matrix
+            mirrored = np.linalg.det(baked[:3, :3]) < 0
+            mesh = document['meshes'][node['mesh']]
+            primitives = []
+            for prim in mesh.get('primitives', []):
+                data = transformed_attributes(glb, prim, baked)
+                new_prim = {k: v for k, v in prim.items() if k not in ('attributes', 'indices')}
+                new_prim['attributes'] = {}
+                for name, values in data.items():
+                    accessor = document['accessors'][prim['attributes'][name]]
+                    normalized = name not in ('POSITION', 'NORMAL', 'TANGENT') and accessor.get('normalized', False)
+                    new_prim['attributes'][name] = add_accessor(glb, values, ARRAY_BUFFER, normalized=normalized)
+                indices = primitive_indices(glb, prim, len(data['POSITION']), mirrored)
+                new_prim['indices'] = add_accessor(glb, indices.astype(index_dtype(len(data['POSITION']))),
+                                                   ELEMENT_ARRAY_BUFFER)
+                primitives.append(new_prim)
+            # Meshes shared by several nodes get one baked copy per node
+            document['meshes'].append(dict(mesh, primitives=primitives))
+            node['mesh'] = len(document['meshes']) - 1
+        remove_unused_meshes(document)
+        compact(glb)
+
+    extras['normalization'] = correction_info
+    write_glb(glb_path, glb)
+    return status, correction_info
+
+
+def describe(info):
+    if not info:
+        return ''
+    size = ' x '.join(f"{v:g}" for v in info['size'])
+    return f"{info['category'] or '.'}: scale {info['scale']:g}, up {info['up']} -> {size} m"
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Bake per-category scale and axis corrections into GLB vertex data')
+    parser.add_argument('paths', nargs='+', help='GLB files or directories')
+    parser.add_argument(
+        '--category', default=None,
+        help='Category to use instead of the folder under assets/models (e.g. props/modular)')
+    parser.add_argument(
+        '--up', choices=sorted(UP_ROTATIONS), default=None,
+        help='Up axis of the source (default: from AXIS_CORRECTIONS, else y)')
+    parser.add_argument(
+        '--scale', type=float, default=None,
+        help='Explicit scale factor (default: SCALE_OVERRIDES, else only audit-flagged models)')
+    parser.add_argument(
+        '--force', action='store_true',
+        help='Normalize again even if the GLB records a normalization')
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Report corrections without writing files')
+    return parser.parse_args(raw_args)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    glb_files = collect_glbs(args.paths)
+    print(f"\nNormalizing {len(glb_files)} GLB files...")
+
+    counts = {}
+    for i, glb_path in enumerate(glb_files):
+        try:
+            status, info = normalize_glb(glb_path, args.category, args.up, args.force, args.dry_run, args.scale)
+        except Exception as e:
+            status, info = f'FAILED: {e}', None
+        print(f"  [{i+1}/{len(glb_files)}] {glb_path.name} [{status}] {describe(info)}".rstrip())
+        key = status.split(':')[0]
+        counts[key] = counts.get(key, 0) + 1
+
+    print(f"\n=== NORMALIZE SUMMARY ===")
+    for status, count in sorted(counts.items()):
+        print(f"{status}: {count}")
+    if counts.get('FAILED'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
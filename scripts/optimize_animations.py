@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Stellar Descent - Animation Keyframe Optimizer
+
+Exported character animations are baked with a key on every frame of every
+channel. This strips what interpolation already reproduces, in place:
+
+  - Constant channels are collapsed to a single key. They are removed
+    entirely only if they hold the node's rest value and no other clip in
+    the file animates the same node and path: Babylon does not reset nodes
+    when switching animation groups, so a rest channel is what returns a
+    bone from the previous clip's pose. A clip always keeps one channel.
+  - LINEAR channels keep only the keys needed to stay within tolerance of
+    the original curve (lerp for translation/scale/weights, slerp for
+    rotation), chosen by recursive subdivision from the end keys.
+  - STEP channels keep only keys where the value changes.
+  - With --quantize-rotations, rotation outputs become normalized int16
+    (allowed by core glTF 2.0).
+
+CUBICSPLINE samplers are left as they are. Samplers that end up with the
+same key times share one input accessor.
+
+Tolerances are the maximum deviation from the original at every original
+key time: metres for translation, degrees for rotation, absolute for scale
+and morph weights. The reported maximum error includes quantization.
+
+Usage:
+    python3 scripts/optimize_animations.py public/assets/models/npcs/ public/assets/models/enemies/
+    python3 scripts/optimize_animations.py model.glb --rotation-tolerance 0.25 --quantize-rotations
+    python3 scripts/optimize_animations.py model.glb --dry-run --report animations.json
+
+Runs with plain Python 3 + numpy (no Blender needed).
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import (
+    read_glb, write_glb, collect_glbs, compact, read_accessor_float, add_accessor,
+    COMPONENT_DTYPES, TYPE_SIZES, SHORT,
+)
+
+REST_VALUES = {
+    'translation': [0.0, 0.0, 0.0],
+    'rotation': [0.0, 0.0, 0.0, 1.0],
+    'scale': [1.0, 1.0, 1.0],
+}
+
+
+# ---------------------------------------------------------------------------
+# Curve maths
+# ---------------------------------------------------------------------------
+
+def lerp(a, b, t):
+    return a + (b - a) * t[:, None]
+
+
+def slerp(a, b, t):
+    """Shortest-path slerp from quaternion a to b at each t."""
+    if np.dot(a, b) < 0:
+        b = -b
+    dot = min(float(np.dot(a, b)), 1.0)
+    if dot > 0.9995:
+        q = lerp(a, b, t)
+    else:
+        theta = np.arccos(dot)
+        q = (np.sin((1 - t) * theta)[:, None] * a + np.sin(t * theta)[:, None] * b) / np.sin(theta)
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def distance(approx, exact):
+    return np.linalg.norm(approx - exact, axis=1)
+
+
+def max_abs(approx, exact):
+    return np.abs(approx - exact).max(axis=1)
+
+
+def rotation_angle(approx, exact):
+    """Angle in degrees between unit quaternions."""
+    dot = np.abs((approx * exact).sum(axis=1))
+    return np.degrees(2 * np.arccos(np.clip(dot, 0.0, 1.0)))
+
+
+CURVES = {
+    # path: (interpolate, error)
+    'translation': (lerp, distance),
+    'rotation': (slerp, rotation_angle),
+    'scale': (lerp, max_abs),
+    'weights': (lerp, max_abs),
+}
+
+
+def reduce_linear(times, values, interpolate, error, tolerance):
+    """Indices of the keys to keep so every original key is within tolerance."""
+    n = len(times)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, n - 1]] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        span = times[b] - times[a]
+        t = (times[a + 1:b] - times[a]) / span if span > 0 else np.zeros(b - a - 1)
+        err = error(interpolate(values[a], values[b], t), values[a + 1:b])
+        worst = int(np.argmax(err))
+        if err[worst] > tolerance:
+            split = a + 1 + worst
+            keep[split] = True
+            stack += [(a, split), (split, b)]
+    return np.flatnonzero(keep)
+
+
+def reduce_step(values):
+    changed = np.any(values[1:] != values[:-1], axis=1)
+    keep = np.concatenate([[True], changed])
+    keep[-1] = True
+    return np.flatnonzero(keep)
+
+
+def sample(times, values, keys, interpolate, step=False):
+    """Evaluate the reduced curve (keys into times/values) at every original time."""
+    key_times = times[keys]
+    segment = np.clip(np.searchsorted(key_times, times, side='right') - 1, 0, len(keys) - 1)
+    if step or len(keys) == 1:
+        return values[keys][segment]
+    segment = np.minimum(segment, len(keys) - 2)
+    result = np.empty_like(values)
+    for s in np.unique(segment):
+        mask = segment == s
+        a, b = keys[s], keys[s + 1]
+        span = times[b] - times[a]
+        t = np.clip((times[mask] - times[a]) / span, 0.0, 1.0) if span > 0 else np.zeros(mask.sum())
+        result[mask] = interpolate(values[a], values[b], t)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# GLB
+# ---------------------------------------------------------------------------
+
+def rest_value(glb, node_index, path, width):
+    node = glb.json['nodes'][node_index]
+    if path == 'weights':
+        weights = node.get('weights')
+        if weights is None and 'mesh' in node:
+            weights = glb.json['meshes'][node['mesh']].get('weights')
+        return np.array(weights if weights is not None else [0.0] * width, dtype=np.float32)
+    return np.array(node.get(path, REST_VALUES[path]), dtype=np.float32)
+
+
+def accessor_bytes(glb, indices):
+    accessors = glb.json['accessors']
+    return sum(accessors[i]['count'] * TYPE_SIZES[accessors[i]['type']]
+               * np.dtype(COMPONENT_DTYPES[accessors[i]['componentType']]).itemsize
+               for i in set(indices))
+
+
+def clip_targets(animation):
+    """(node, path) pairs a clip animates."""
+    return {(c['target']['node'], c['target'].get('path'))
+            for c in animation.get('channels', []) if 'node' in c.get('target', {})}
+
+
+def optimize_animation(glb, animation, tolerances, quantize, shared=frozenset()):
+    """
+    Reduce one animation in place. shared holds the (node, path) pairs other
+    clips animate, whose rest channels are kept. Returns its report entry.
+    """
+    samplers = animation.get('samplers', [])
+    channels = animation.get('channels', [])
+    before_accessors = [a for s in samplers for a in (s['input'], s['output'])]
+    entry = {
+        'name': animation.get('name', ''),
+        'channelsBefore': len(channels),
+        'keysBefore': sum(glb.json['accessors'][s['input']]['count'] for s in samplers),
+        'bytesBefore': accessor_bytes(glb, before_accessors),
+        'maxError': {},
+    }
+
+    inputs = {}
+    dropped = set()
+    changed = False
+    for sampler_index, sampler in enumerate(samplers):
+        targets = [c['target'] for c in channels if c['sampler'] == sampler_index]
+        interpolation = sampler.get('interpolation', 'LINEAR')
+        if not targets or interpolation == 'CUBICSPLINE' or targets[0].get('path') not in CURVES:
+            continue
+        path = targets[0]['path']
+        times = read_accessor_float(glb, sampler['input'])
+        output = read_accessor_float(glb, sampler['output'])
+        values = output.reshape(len(times), -1).astype(np.float64)
+        interpolate, error = CURVES[path]
+
+        constant = error(np.broadcast_to(values[0], values.shape), values).max(initial=0) <= tolerances[path]
+        if constant:
+            keys = np.array([0])
+            node_targets = [t['node'] for t in targets if 'node' in t]
+            if node_targets and all(
+                    (n, path) not in shared and
+                    error(rest_value(glb, n, path, values.shape[1])[None].astype(np.float64),
+                          values[:1]).max() <= tolerances[path] for n in node_targets):
+                dropped.add(sampler_index)
+        elif interpolation == 'STEP':
+            keys = reduce_step(values)
+        else:
+            keys = reduce_linear(times, values, interpolate, error, tolerances[path])
+
+        reduced = values[keys]
+        if path == 'rotation':
+            reduced = reduced / np.linalg.norm(reduced, axis=1, keepdims=True)
+        # Rotations already stored as int16 stay quantized
+        already_quantized = glb.json['accessors'][sampler['output']]['componentType'] == SHORT
+        quantized = path == 'rotation' and (quantize or already_quantized)
+        if quantized:
+            stored = np.round(np.clip(reduced, -1, 1) * 32767).astype(np.int16)
+            reduced = np.maximum(stored / 32767.0, -1.0)
+        curve = values.copy()
+        curve[keys] = reduced
+        approx = sample(times, curve, keys, interpolate, step=(interpolation == 'STEP'))
+        worst = float(error(approx, values).max(initial=0))
+        entry['maxError'][path] = max(entry['maxError'].get(path, 0.0), round(worst, 6))
+
+        if len(keys) == len(times) and quantized == already_quantized and sampler_index not in dropped:
+            continue
+        changed = True
+        key_times = times[keys].astype(np.float32)
+        signature = key_times.tobytes()
+        if signature not in inputs:
+            inputs[signature] = add_accessor(glb, key_times)
+        sampler['input'] = inputs[signature]
+        if quantized:
+            sampler['output'] = add_accessor(glb, stored, normalized=True)
+        elif path == 'weights':
+            sampler['output'] = add_accessor(glb, reduced.astype(np.float32).ravel())
+        else:
+            sampler['output'] = add_accessor(glb, reduced.astype(np.float32))
+
+    # glTF requires at least one channel: keep a single-key one
+    if dropped and all(c['sampler'] in dropped for c in channels):
+        dropped.discard(min(dropped))
+    if dropped:
+        changed = True
+        animation['channels'] = [c for c in channels if c['sampler'] not in dropped]
+        used = sorted({c['sampler'] for c in animation['channels']})
+        remap = {old: new for new, old in enumerate(used)}
+        animation['samplers'] = [samplers[i] for i in used]
+        for channel in animation['channels']:
+            channel['sampler'] = remap[channel['sampler']]
+
+    samplers = animation['samplers']
+    entry.update({
+        'channelsAfter': len(animation['channels']),
+        'keysAfter': sum(glb.json['accessors'][s['input']]['count'] for s in samplers),
+        'bytesAfter': accessor_bytes(glb, [a for s in samplers for a in (s['input'], s['output'])]),
+    })
+    return entry, changed
+
+
+def optimize_glb(glb_path, tolerances, quantize, dry_run=False):
+    """Optimize every animation in one GLB. Returns a result dict."""
+    glb = read_glb(glb_path)
+    animations = glb.json.get('animations', [])
+    if not animations:
+        return {'file': str(glb_path), 'status': 'NO_ANIMATIONS', 'clips': []}
+
+    targets = [clip_targets(animation) for animation in animations]
+    clips = []
+    changed = False
+    for i, animation in enumerate(animations):
+        shared = set().union(*(t for j, t in enumerate(targets) if j != i))
+        entry, clip_changed = optimize_animation(glb, animation, tolerances, quantize, shared)
+        clips.append(entry)
+        changed = changed or clip_changed
+
+    if changed and not dry_run:
+        compact(glb)
+        write_glb(glb_path, glb)
+    return {'file': str(glb_path), 'status': 'OPTIMIZED' if changed else 'UNCHANGED', 'clips': clips}
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Drop redundant animation keyframes and optionally quantize rotations')
+    parser.add_argument('paths', nargs='+', help='GLB files or directories')
+    parser.add_argument('--translation-tolerance', type=float, default=0.001,
+                        help='Max translation error in metres (default: 0.001)')
+    parser.add_argument('--rotation-tolerance', type=float, default=0.1,
+                        help='Max rotation error in degrees (default: 0.1)')
+    parser.add_argument('--scale-tolerance', type=float, default=0.001,
+                        help='Max scale error (default: 0.001)')
+    parser.add_argument('--weights-tolerance', type=float, default=0.001,
+                        help='Max morph weight error (default: 0.001)')
+    parser.add_argument('--quantize-rotations', action='store_true',
+                        help='Store rotation outputs as normalized int16')
+    parser.add_argument('--report', default=None, help='Write a JSON report to this path')
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=None,
+        help='Worker processes (default: CPU count)')
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Report what would change without writing files')
+    return parser.parse_args(raw_args)
+
+
+def run(glb_path, tolerances, quantize, dry_run):
+    try:
+        return optimize_glb(glb_path, tolerances, quantize, dry_run)
+    except Exception as e:
+        return {'file': str(glb_path), 'status': 'FAILED', 'error': str(e), 'clips': []}
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    tolerances = {
+        'translation': args.translation_tolerance,
+        'rotation': args.rotation_tolerance,
+        'scale': args.scale_tolerance,
+        'weights': args.weights_tolerance,
+    }
+    glb_files = collect_glbs(args.paths)
+    print(f"\nOptimizing animations of {len(glb_files)} GLB files...")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(run, p, tolerances, args.quantize_rotations, args.dry_run)
+                   for p in glb_files]
+        for i, future in enumerate(futures):
+            result = future.result()
+            results.append(result)
+            print(f"  [{i+1}/{len(glb_files)}] {Path(result['file']).name} [{result['status']}]")
+            if 'error' in result:
+                print(f"    ERROR: {result['error']}")
+            for clip in result['clips']:
+                errors = ', '.join(f"{path} {value:g}" for path, value in sorted(clip['maxError'].items()))
+                print(f"    {clip['name'] or '(unnamed)'}: keys {clip['keysBefore']} -> {clip['keysAfter']}, "
+                      f"{clip['bytesBefore'] / 1024:.1f} KB -> {clip['bytesAfter'] / 1024:.1f} KB"
+                      f"{f' (max error: {errors})' if errors else ''}")
+
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    clips = [c for r in results for c in r['clips']]
+    print(f"\n=== ANIMATION SUMMARY ===")
+    for status, count in sorted(counts.items()):
+        print(f"{status}: {count}")
+    if clips:
+        before = sum(c['bytesBefore'] for c in clips)
+        after = sum(c['bytesAfter'] for c in clips)
+        print(f"Clips: {len(clips)}, keyframe data {before / 1024:.1f} KB -> {after / 1024:.1f} KB")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nReport written to: {args.report}")
+    if counts.get('FAILED'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
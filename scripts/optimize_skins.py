@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Stellar Descent - Skin Optimizer
+
+Cleans up the skinning data of character GLBs from external packs, which
+carry full skeletons and arbitrary per-vertex influences. Skinning cost
+scales with every marine and enemy on screen, and messy skin data is also
+what breaks Blender's glTF import.
+
+Per GLB, in place:
+  - Repeated joints within a vertex are merged, then influences are
+    limited to the 4 heaviest per vertex and renormalized.
+    Extra JOINTS_n/WEIGHTS_n sets are dropped, so the shader uses the
+    4-influence path.
+  - Joints are pruned from each skin's joint list when they influence no
+    vertex and are not animated. Ancestors of kept joints are always kept,
+    so bone parenting is unchanged. The joint nodes themselves stay in the
+    scene graph.
+  - JOINTS_0 is stored as uint8 when the skin has <= 256 joints.
+  - Normalized integer weights keep their format; float weights stay float.
+
+Skins shared by meshes that are also bound to another skin are limited but
+not pruned, since one joint remap can't serve both. Files that fail
+validate_glbs.py are left untouched.
+
+The report lists bones (skin joints) and skinning cost per model, before and
+after. Skinning cost is vertices x influence slots, i.e. per-frame
+vertex-shader bone blends for one instance.
+
+Usage:
+    python3 scripts/optimize_skins.py public/assets/models/npcs/ public/assets/models/enemies/
+    python3 scripts/optimize_skins.py marine_soldier.glb --dry-run --report skins.json
+
+Runs with plain Python 3 + numpy (no Blender needed).
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import (
+    read_glb, write_glb, collect_glbs, compact, read_accessor, read_accessor_float, add_accessor,
+    node_parents, ARRAY_BUFFER, UNSIGNED_BYTE, UNSIGNED_SHORT,
+)
+from validate_glbs import validate_glb
+
+MAX_INFLUENCES = 4
+
+
+def influence_sets(attributes):
+    """Indices n present as both JOINTS_n and WEIGHTS_n, ascending."""
+    return sorted(int(k.split('_')[1]) for k in attributes
+                  if k.startswith('JOINTS_') and f"WEIGHTS_{k.split('_')[1]}" in attributes)
+
+
+def read_influences(glb, prim):
+    """(joints (v, 4k) int64, weights (v, 4k) float32) across all influence sets."""
+    attributes = prim['attributes']
+    sets = influence_sets(attributes)
+    joints = np.hstack([read_accessor(glb, attributes[f'JOINTS_{s}']).astype(np.int64) for s in sets])
+    weights = np.hstack([read_accessor_float(glb, attributes[f'WEIGHTS_{s}']) for s in sets])
+    return joints, weights
+
+
+def limit_influences(joints, weights, limit=MAX_INFLUENCES):
+    """Keep the `limit` heaviest influences per vertex and renormalize."""
+    weights = np.maximum(weights, 0.0)
+    # Merge repeated joints within a vertex so each takes one slot
+    for i in range(joints.shape[1]):
+        for j in range(i + 1, joints.shape[1]):
+            repeat = joints[:, j] == joints[:, i]
+            weights[repeat, i] += weights[repeat, j]
+            weights[repeat, j] = 0.0
+    order = np.argsort(-weights, axis=1, kind='stable')[:, :limit]
+    joints = np.take_along_axis(joints, order, axis=1)
+    weights = np.take_along_axis(weights, order, axis=1)
+    if weights.shape[1] < limit:
+        pad = limit - weights.shape[1]
+        joints = np.pad(joints, ((0, 0), (0, pad)))
+        weights = np.pad(weights, ((0, 0), (0, pad)))
+    totals = weights.sum(axis=1, keepdims=True)
+    # Vertices with no weight at all follow their first joint
+    empty = totals[:, 0] <= 0
+    weights[empty, 0] = 1.0
+    totals[empty] = 1.0
+    weights = weights / totals
+    joints[weights <= 0] = 0
+    return joints, weights.astype(np.float32)
+
+
+def quantize_weights(weights, component_type):
+    """Normalized integer weights whose rows sum exactly to the maximum value."""
+    top = 255 if component_type == UNSIGNED_BYTE else 65535
+    dtype = np.uint8 if component_type == UNSIGNED_BYTE else np.uint16
+    q = np.round(weights * top).astype(np.int64)
+    # Put the rounding error on each vertex's heaviest influence
+    heaviest = np.argmax(q, axis=1)
+    q[np.arange(len(q)), heaviest] += top - q.sum(axis=1)
+    return q.astype(dtype)
+
+
+def animated_nodes(glb):
+    return {channel['target']['node']
+            for animation in glb.json.get('animations', [])
+            for channel in animation.get('channels', [])
+            if 'node' in channel.get('target', {})}
+
+
+def skinned_primitives(glb):
+    """Map skin index -> [(mesh index, primitive)], and the set of meshes bound to >1 skin."""
+    mesh_skins = {}
+    for node in glb.json.get('nodes', []):
+        if 'mesh' in node and 'skin' in node:
+            mesh_skins.setdefault(node['mesh'], set()).add(node['skin'])
+    by_skin = {}
+    for mesh_index, skins in mesh_skins.items():
+        for prim in glb.json['meshes'][mesh_index].get('primitives', []):
+            if influence_sets(prim.get('attributes', {})):
+                for skin in skins:
+                    by_skin.setdefault(skin, []).append((mesh_index, prim))
+    shared = {m for m, skins in mesh_skins.items() if len(skins) > 1}
+    return by_skin, shared
+
+
+def kept_joints(glb, skin, used, animated):
+    """Skin-local joint indices to keep: used, animated, or an ancestor of a kept joint."""
+    joints = skin['joints']
+    position = {node: i for i, node in enumerate(joints)}
+    parents = node_parents(glb)
+    keep = {i for i, node in enumerate(joints) if i in used or node in animated}
+    for i in list(keep):
+        node = parents.get(joints[i])
+        while node is not None:
+            if node in position:
+                keep.add(position[node])
+            node = parents.get(node)
+    return sorted(keep)
+
+
+def skinning_cost(glb, prims):
+    """Vertices x influence slots over a skin's primitives."""
+    cost = 0
+    for _, prim in prims:
+        attributes = prim['attributes']
+        vertices = glb.json['accessors'][attributes['POSITION']]['count']
+        cost += vertices * 4 * len(influence_sets(attributes))
+    return cost
+
+
+def optimize_glb(glb_path, dry_run=False):
+    """Optimize the skins of one GLB. Returns a result dict."""
+    result = {'file': str(glb_path), 'skins': []}
+    validation = validate_glb(str(glb_path))
+    if validation['status'] == 'INVALID':
+        result['status'] = 'INVALID'
+        result['errors'] = validation['errors']
+        return result
+
+    glb = read_glb(glb_path)
+    by_skin, shared_meshes = skinned_primitives(glb)
+    if not by_skin:
+        result['status'] = 'NO_SKIN'
+        return result
+
+    animated = animated_nodes(glb)
+    skins = glb.json['skins']
+    changed = False
+    rewritten = set()
+    for skin_index, prims in sorted(by_skin.items()):
+        skin = skins[skin_index]
+        bones_before = len(skin['joints'])
+        cost_before = skinning_cost(glb, prims)
+        max_before = 0
+
+        limited = []
+        used = set()
+        for mesh_index, prim in prims:
+            joints, weights = read_influences(glb, prim)
+            max_before = max(max_before, int((weights > 0).sum(axis=1).max(initial=0)))
+            clean = (weights.shape[1] == MAX_INFLUENCES and weights.min(initial=0) >= 0
+                     and np.allclose(weights.sum(axis=1), 1.0, atol=1e-3))
+            joints, weights = limit_influences(joints, weights)
+            used.update(np.unique(joints[weights > 0]).tolist())
+            limited.append((prim, joints, weights, clean))
+
+        prunable = not any(m in shared_meshes for m, _ in prims)
+        keep = kept_joints(glb, skin, used, animated) if prunable else list(range(bones_before))
+        remap = np.zeros(bones_before, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+
+        joint_dtype = np.uint8 if len(keep) <= 256 else np.uint16
+        joint_component = UNSIGNED_BYTE if joint_dtype == np.uint8 else UNSIGNED_SHORT
+        for prim, joints, weights, clean in limited:
+            # Primitives of a mesh bound to several skins are rewritten once
+            if id(prim) in rewritten:
+                continue
+            rewritten.add(id(prim))
+            attributes = prim['attributes']
+            old_joints = glb.json['accessors'][attributes['JOINTS_0']]
+            old_weights = glb.json['accessors'][attributes['WEIGHTS_0']]
+            if clean and len(keep) == bones_before and old_joints['componentType'] == joint_component:
+                continue
+            new_joints = np.where(weights > 0, remap[joints], 0).astype(joint_dtype)
+            if old_weights.get('normalized') and old_weights['componentType'] in (UNSIGNED_BYTE, UNSIGNED_SHORT):
+                new_weights = quantize_weights(weights, old_weights['componentType'])
+                normalized = True
+            else:
+                new_weights, normalized = weights, False
+            for s in influence_sets(attributes):
+                del attributes[f'JOINTS_{s}'], attributes[f'WEIGHTS_{s}']
+            attributes['JOINTS_0'] = add_accessor(glb, new_joints, ARRAY_BUFFER)
+            attributes['WEIGHTS_0'] = add_accessor(glb, new_weights, ARRAY_BUFFER, normalized=normalized)
+            changed = True
+
+        if len(keep) < bones_before:
+            skin['joints'] = [skin['joints'][i] for i in keep]
+            if 'inverseBindMatrices' in skin:
+                matrices = read_accessor(glb, skin['inverseBindMatrices'])[keep]
+                skin['inverseBindMatrices'] = add_accessor(glb, matrices.astype(np.float32),
+                                                           accessor_type='MAT4')
+            changed = True
+
+        result['skins'].append({
+            'skin': skin_index,
+            'name': skin.get('name', ''),
+            'bonesBefore': bones_before,
+            'bonesAfter': len(keep),
+            'maxInfluencesBefore': max_before,
+            'skinningCostBefore': cost_before,
+            'skinningCostAfter': skinning_cost(glb, prims),
+            'pruned': prunable,
+        })
+
+    result['status'] = 'OPTIMIZED' if changed else 'UNCHANGED'
+    if changed and not dry_run:
+        compact(glb)
+        write_glb(glb_path, glb)
+    return result
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Limit skin influences to 4, prune unused joints and compact JOINTS')
+    parser.add_argument('paths', nargs='+', help='GLB files or directories')
+    parser.add_argument('--report', default=None, help='Write a JSON report to this path')
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=None,
+        help='Worker processes (default: CPU count)')
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Report what would change without writing files')
+    return parser.parse_args(raw_args)
+
+
+def run(glb_path, dry_run):
+    try:
+        return optimize_glb(glb_path, dry_run)
+    except Exception as e:
+        return {'file': str(glb_path), 'skins': [], 'status': 'FAILED', 'errors': [str(e)]}
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    glb_files = collect_glbs(args.paths)
+    print(f"\nOptimizing skins of {len(glb_files)} GLB files...")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(run, p, args.dry_run) for p in glb_files]
+        for i, future in enumerate(futures):
+            result = future.result()
+            results.append(result)
+            print(f"  [{i+1}/{len(glb_files)}] {Path(result['file']).name} [{result['status']}]")
+            for error in result.get('errors', [])[:3]:
+                print(f"    {error}")
+            for skin in result['skins']:
+                print(f"    skin {skin['skin']} {skin['name']}: bones {skin['bonesBefore']} -> "
+                      f"{skin['bonesAfter']}, max influences {skin['maxInfluencesBefore']} -> "
+                      f"{min(skin['maxInfluencesBefore'], MAX_INFLUENCES)}, skinning cost "
+                      f"{skin['skinningCostBefore']} -> {skin['skinningCostAfter']}")
+
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    skins = [s for r in results for s in r['skins']]
+    print(f"\n=== SKIN SUMMARY ===")
+    for status, count in sorted(counts.items()):
+        print(f"{status}: {count}")
+    if skins:
+        print(f"Bones: {sum(s['bonesBefore'] for s in skins)} -> {sum(s['bonesAfter'] for s in skins)}")
+        print(f"Skinning cost: {sum(s['skinningCostBefore'] for s in skins)} -> "
+              f"{sum(s['skinningCostAfter'] for s in skins)}")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nReport written to: {args.report}")
+    if counts.get('FAILED'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
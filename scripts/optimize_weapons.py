@@ -0,0 +1,409 @@
+"""
+Stellar Descent - First-Person Weapon Optimizer
+
+The fps_* weapons and attachment_* models from convert-weapons.py are raw
+Quaternius FBX exports: a dozen part nodes, a flat-colour material per part
+and an FBX unit-scale root. The view-model is drawn every frame, so this
+turns each one into the cheapest GLB that looks the same:
+
+  - Node transforms are baked into the vertices and every part is merged
+    into one node and mesh. The model keeps its world-space placement, so
+    the hand-tuned VIEW_TRANSFORMS / muzzle offsets in
+    FirstPersonWeapons.ts stay valid.
+  - Untextured materials are replaced by a small palette texture. Each
+    material gets a 4x4 cell holding its base colour, roughness/metallic and
+    emissive, and its parts' UVs point at the cell centre. All flat-colour
+    parts then share one material: one draw call. Textured materials keep
+    their own (merged) primitive.
+  - A low-poly third-person / world-pickup variant, <stem>_world.glb, is
+    built by vertex clustering. Clusters never span palette cells or UV
+    seams. The variant's pivot is the bottom centre, so it sits on the
+    floor.
+
+Models with skins or animations (fps_bare_hands) are skipped. The result is
+recorded in asset.extras.viewModel, and processed files are skipped on later
+runs; re-convert the source to rebuild.
+
+Usage:
+    blender --background --python scripts/optimize_weapons.py -- public/assets/models/props/weapons/
+    blender --background --python scripts/optimize_weapons.py -- fps_carbine.glb --world-ratio 0.2 --dry-run
+
+Requires: Blender 3.6+ (palette PNG encoding), numpy
+"""
+
+import argparse
+import copy
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import (
+    read_glb, write_glb, collect_glbs, compact, read_accessor, read_accessor_float, add_accessor,
+    add_buffer_view, index_dtype, world_matrices, ARRAY_BUFFER, ELEMENT_ARRAY_BUFFER,
+)
+from image_io import encode_image
+from flatten_glbs import transformed_attributes, primitive_indices, layout_key, merge_group
+from pack_orm import remove_unused_images
+
+WEAPON_PREFIXES = ('fps_', 'attachment_')
+WORLD_SUFFIX = '_world'
+TRIANGLES = 4
+CELL_PX = 4
+# Nearest, no mips: a CELL_PX cell survives only log2(CELL_PX) mip levels
+# before neighbouring colours merge, and distant *_world pickups sample
+# deeper than that. The palette is tiny, so mips would save nothing.
+PALETTE_SAMPLER = {'magFilter': 9728, 'minFilter': 9728, 'wrapS': 33071, 'wrapT': 33071}
+DEFAULT_MATERIAL = {'name': 'default'}
+
+
+def get_args():
+    argv = sys.argv
+    if '--' in argv:
+        return argv[argv.index('--') + 1:]
+    return []
+
+
+def uses_textures(value, key=''):
+    if isinstance(value, dict):
+        if 'index' in value and key.endswith('Texture'):
+            return True
+        return any(uses_textures(v, k) for k, v in value.items())
+    if isinstance(value, list):
+        return any(uses_textures(v, key) for v in value)
+    return False
+
+
+def is_flat(material):
+    """Materials the palette can stand in for: plain factors, no textures or extensions."""
+    return not uses_textures(material) and not material.get('extensions')
+
+
+def linear_to_srgb(values):
+    values = np.clip(values, 0.0, 1.0)
+    return np.where(values <= 0.0031308, values * 12.92, 1.055 * np.power(values, 1 / 2.4) - 0.055)
+
+
+def vertex_normals(positions, indices):
+    """Area-weighted vertex normals for parts exported without NORMAL."""
+    tris = indices.reshape(-1, 3)
+    corners = positions[tris]
+    face = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    normals = np.zeros_like(positions)
+    for k in range(3):
+        np.add.at(normals, tris[:, k], face)
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    return (normals / np.where(lengths > 0, lengths, 1)).astype(np.float32)
+
+
+def palette_layout(count):
+    """Texture size and per-cell UV centres for count palette entries."""
+    cols = math.ceil(math.sqrt(count))
+    rows = math.ceil(count / cols)
+    width = 1 << max(0, (cols * CELL_PX - 1).bit_length())
+    height = 1 << max(0, (rows * CELL_PX - 1).bit_length())
+    centres = [((i % cols * CELL_PX + CELL_PX / 2) / width, (i // cols * CELL_PX + CELL_PX / 2) / height)
+               for i in range(count)]
+    return width, height, cols, centres
+
+
+def palette_images(materials, width, height, cols):
+    """Base colour (sRGB), metallic-roughness and emissive (sRGB) palettes."""
+    base = np.zeros((height, width, 4), dtype=np.float32)
+    metal_rough = np.ones((height, width, 3), dtype=np.float32)
+    emissive = np.zeros((height, width, 3), dtype=np.float32)
+    for i, material in enumerate(materials):
+        pbr = material.get('pbrMetallicRoughness', {})
+        y, x = i // cols * CELL_PX, i % cols * CELL_PX
+        cell = (slice(y, y + CELL_PX), slice(x, x + CELL_PX))
+        color = np.array(pbr.get('baseColorFactor', [1, 1, 1, 1]), dtype=np.float32)
+        base[cell] = np.concatenate([linear_to_srgb(color[:3]), color[3:]])
+        metal_rough[cell] = [1.0, pbr.get('roughnessFactor', 1.0), pbr.get('metallicFactor', 1.0)]
+        emissive[cell] = linear_to_srgb(np.array(material.get('emissiveFactor', [0, 0, 0]), dtype=np.float32))
+    return base, metal_rough, emissive if emissive.any() else None
+
+
+def add_palette_texture(glb, pixels, name):
+    document = glb.json
+    images = document.setdefault('images', [])
+    images.append({'name': name, 'mimeType': 'image/png', 'bufferView': add_buffer_view(glb, encode_image(pixels))})
+    samplers = document.setdefault('samplers', [])
+    samplers.append(dict(PALETTE_SAMPLER))
+    textures = document.setdefault('textures', [])
+    textures.append({'source': len(images) - 1, 'sampler': len(samplers) - 1})
+    return len(textures) - 1
+
+
+def collect_parts(glb):
+    """
+    Split the static primitives into palette parts
+    [(material, positions, normals, indices)] and textured groups
+    {layout key: [(prim, world matrix)]}.
+    """
+    document = glb.json
+    nodes = document.get('nodes', [])
+    materials = document.get('materials', [])
+    palette_parts = []
+    textured = {}
+    for n, matrix in sorted(world_matrices(glb).items()):
+        if 'mesh' not in nodes[n]:
+            continue
+        for prim in document['meshes'][nodes[n]['mesh']].get('primitives', []):
+            if prim.get('mode', TRIANGLES) != TRIANGLES or 'POSITION' not in prim['attributes']:
+                raise ValueError('non-triangle primitive')
+            material = materials[prim['material']] if 'material' in prim else DEFAULT_MATERIAL
+            if is_flat(material) and 'COLOR_0' not in prim['attributes']:
+                spatial = {k: v for k, v in prim['attributes'].items() if k in ('POSITION', 'NORMAL')}
+                data = transformed_attributes(glb, {'attributes': spatial}, matrix)
+                indices = primitive_indices(glb, prim, len(data['POSITION']), np.linalg.det(matrix[:3, :3]) < 0)
+                normals = data.get('NORMAL')
+                if normals is None:
+                    normals = vertex_normals(data['POSITION'], indices)
+                palette_parts.append((prim.get('material', -1), data['POSITION'], normals, indices))
+            else:
+                textured.setdefault(layout_key(glb, prim), []).append((prim, matrix))
+    return palette_parts, textured
+
+
+def build_view_model(glb, stem):
+    """Rewrite glb as a single merged node. Returns the new primitive count."""
+    document = glb.json
+    materials = document.setdefault('materials', [])
+    palette_parts, textured = collect_parts(glb)
+    primitives = [merge_group(glb, members) for members in textured.values()]
+
+    if palette_parts:
+        used = sorted({m for m, *_ in palette_parts})
+        entries = [materials[m] if m >= 0 else DEFAULT_MATERIAL for m in used]
+        width, height, cols, centres = palette_layout(len(used))
+        base, metal_rough, emissive = palette_images(entries, width, height, cols)
+        base_tex = add_palette_texture(glb, base, f"{stem}_palette")
+        mr_tex = add_palette_texture(glb, metal_rough, f"{stem}_palette_orm")
+        emissive_tex = add_palette_texture(glb, emissive, f"{stem}_palette_emissive") if emissive is not None else None
+
+        # One palette material per blend state
+        groups = {}
+        for material_index, positions, normals, indices in palette_parts:
+            entry = materials[material_index] if material_index >= 0 else DEFAULT_MATERIAL
+            state = (entry.get('alphaMode', 'OPAQUE'), entry.get('alphaCutoff', 0.5), entry.get('doubleSided', False))
+            uv = np.tile(np.float32(centres[used.index(material_index)]), (len(positions), 1))
+            groups.setdefault(state, []).append((positions, normals, uv, indices))
+
+        for (alpha_mode, alpha_cutoff, double_sided), parts in groups.items():
+            material = {
+                'name': f"{stem}_palette",
+                'pbrMetallicRoughness': {
+                    'baseColorTexture': {'index': base_tex},
+                    'metallicRoughnessTexture': {'index': mr_tex},
+                },
+            }
+            if emissive_tex is not None:
+                material['emissiveTexture'] = {'index': emissive_tex}
+                material['emissiveFactor'] = [1.0, 1.0, 1.0]
+            if alpha_mode != 'OPAQUE':
+                material['alphaMode'] = alpha_mode
+            if alpha_mode == 'MASK':
+                material['alphaCutoff'] = alpha_cutoff
+            if double_sided:
+                material['doubleSided'] = True
+            materials.append(material)
+
+            offsets = np.cumsum([0] + [len(p[0]) for p in parts])
+            vertex_count = int(offsets[-1])
+            primitives.append({
+                'attributes': {
+                    'POSITION': add_accessor(glb, np.concatenate([p[0] for p in parts]), ARRAY_BUFFER),
+                    'NORMAL': add_accessor(glb, np.concatenate([p[1] for p in parts]), ARRAY_BUFFER),
+                    'TEXCOORD_0': add_accessor(glb, np.concatenate([p[2] for p in parts]), ARRAY_BUFFER),
+                },
+                'indices': add_accessor(glb, np.concatenate([p[3] + o for p, o in zip(parts, offsets)])
+                                        .astype(index_dtype(vertex_count)), ELEMENT_ARRAY_BUFFER),
+                'material': len(materials) - 1,
+            })
+
+    document['meshes'] = [{'name': stem, 'primitives': primitives}]
+    document['nodes'] = [{'name': stem, 'mesh': 0}]
+    document['scenes'] = [{'name': stem, 'nodes': [0]}]
+    document['scene'] = 0
+
+    # Keep only materials the merged mesh uses
+    used_materials = sorted({p['material'] for p in primitives if 'material' in p})
+    remap = {old: new for new, old in enumerate(used_materials)}
+    document['materials'] = [materials[i] for i in used_materials]
+    for prim in primitives:
+        if 'material' in prim:
+            prim['material'] = remap[prim['material']]
+    remove_unused_images(glb, set(range(len(document.get('images', [])))))
+    compact(glb)
+    return len(primitives)
+
+
+def cluster_primitive(glb, prim, cell):
+    """Vertex-cluster one primitive. Returns (attribute arrays, triangles)."""
+    attributes = prim['attributes']
+    positions = read_accessor_float(glb, attributes['POSITION'])
+    keys = [np.floor(positions / cell).astype(np.int64)]
+    # Never merge across UV seams or palette cells
+    for name in sorted(attributes):
+        if name.startswith('TEXCOORD'):
+            keys.append(np.round(read_accessor_float(glb, attributes[name]) * 1024).astype(np.int64))
+    _, first, inverse = np.unique(np.hstack(keys), axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    counts = np.bincount(inverse)
+
+    data = {}
+    for name, index in attributes.items():
+        if name == 'POSITION':
+            summed = np.zeros((len(first), 3))
+            np.add.at(summed, inverse, positions)
+            data[name] = (summed / counts[:, None]).astype(np.float32)
+        elif name == 'NORMAL':
+            summed = np.zeros((len(first), 3))
+            np.add.at(summed, inverse, read_accessor_float(glb, index))
+            lengths = np.linalg.norm(summed, axis=1, keepdims=True)
+            fallback = read_accessor_float(glb, index)[first]
+            data[name] = np.where(lengths > 1e-6, summed / np.where(lengths > 0, lengths, 1), fallback).astype(np.float32)
+        else:
+            data[name] = read_accessor(glb, index)[first]
+
+    tris = inverse[primitive_indices(glb, prim, len(positions), False)].reshape(-1, 3)
+    tris = tris[(tris[:, 0] != tris[:, 1]) & (tris[:, 1] != tris[:, 2]) & (tris[:, 0] != tris[:, 2])]
+    if len(tris):
+        _, unique = np.unique(np.sort(tris, axis=1), axis=0, return_index=True)
+        tris = tris[np.sort(unique)]
+    return data, tris
+
+
+def triangle_count(glb):
+    total = 0
+    for mesh in glb.json.get('meshes', []):
+        for prim in mesh.get('primitives', []):
+            if 'indices' in prim:
+                total += glb.json['accessors'][prim['indices']]['count'] // 3
+            else:
+                total += glb.json['accessors'][prim['attributes']['POSITION']]['count'] // 3
+    return total
+
+
+def build_world_variant(view_glb, ratio):
+    """Low-poly copy of a merged view-model, pivot at the bottom centre."""
+    glb = copy.deepcopy(view_glb)
+    document = glb.json
+    primitives = document['meshes'][0]['primitives']
+    target = max(12, int(triangle_count(view_glb) * ratio))
+
+    positions = np.concatenate([read_accessor_float(glb, p['attributes']['POSITION']) for p in primitives])
+    lo, hi = positions.min(axis=0), positions.max(axis=0)
+    diagonal = float(np.linalg.norm(hi - lo)) or 1.0
+    pivot = np.array([(lo[0] + hi[0]) / 2, lo[1], (lo[2] + hi[2]) / 2], dtype=np.float32)
+
+    cell = diagonal / 128
+    while True:
+        clustered = [cluster_primitive(glb, p, cell) for p in primitives]
+        if sum(len(t) for _, t in clustered) <= target or cell > diagonal / 4:
+            break
+        cell *= 1.3
+
+    for prim, (data, tris) in zip(primitives, clustered):
+        accessors = document['accessors']
+        attributes = {}
+        for name, values in data.items():
+            if name == 'POSITION':
+                values = values - pivot
+            attributes[name] = add_accessor(glb, values, ARRAY_BUFFER,
+                                            normalized=bool(accessors[prim['attributes'][name]].get('normalized')))
+        prim['attributes'] = attributes
+        prim['indices'] = add_accessor(glb, tris.ravel().astype(index_dtype(len(data['POSITION']))),
+                                       ELEMENT_ARRAY_BUFFER)
+    compact(glb)
+    return glb, sum(len(t) for _, t in clustered)
+
+
+def optimize_weapon(glb_path, ratio, dry_run=False):
+    """Optimize one weapon GLB. Returns (status, detail)."""
+    glb = read_glb(glb_path)
+    document = glb.json
+    extras = document.setdefault('asset', {}).setdefault('extras', {})
+    if 'viewModel' in extras:
+        return 'UNCHANGED', ''
+    if document.get('skins') or document.get('animations'):
+        return 'ANIMATED', ''
+
+    nodes = document.get('nodes', [])
+    draws_before = sum(len(document['meshes'][nodes[n]['mesh']]['primitives'])
+                       for n in world_matrices(glb) if 'mesh' in nodes[n])
+    tris_before = triangle_count(glb)
+    if dry_run:
+        palette_parts, textured = collect_parts(glb)
+        draws_after = len(textured) + (1 if palette_parts else 0)
+        return 'DRY_RUN', f"draws {draws_before} -> ~{draws_after}, {tris_before} tris"
+
+    draws_after = build_view_model(glb, glb_path.stem)
+    world_path = glb_path.with_name(f"{glb_path.stem}{WORLD_SUFFIX}.glb")
+    world_glb, world_tris = build_world_variant(glb, ratio)
+
+    bounds = [read_accessor_float(glb, p['attributes']['POSITION']) for p in glb.json['meshes'][0]['primitives']]
+    lo = np.min([b.min(axis=0) for b in bounds], axis=0)
+    hi = np.max([b.max(axis=0) for b in bounds], axis=0)
+    extras['viewModel'] = {
+        'version': 1,
+        'drawCalls': draws_after,
+        'triangles': tris_before,
+        'bounds': {'min': [round(float(v), 5) for v in lo], 'max': [round(float(v), 5) for v in hi]},
+        'worldVariant': world_path.name,
+    }
+    world_glb.json['asset']['extras'] = {
+        'worldVariant': {'version': 1, 'source': glb_path.name, 'triangles': world_tris},
+    }
+    write_glb(glb_path, glb)
+    write_glb(world_path, world_glb)
+    return 'OPTIMIZED', (f"draws {draws_before} -> {draws_after}, "
+                         f"tris {tris_before} (world {world_tris})")
+
+
+def collect_weapons(paths):
+    return [p for p in collect_glbs(paths)
+            if p.stem.startswith(WEAPON_PREFIXES) and not p.stem.endswith(WORLD_SUFFIX)]
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Merge FPS weapon parts into palette-textured single draws plus world variants')
+    parser.add_argument('paths', nargs='+', help='GLB files or directories (only fps_*/attachment_* are used)')
+    parser.add_argument(
+        '--world-ratio', type=float, default=0.3,
+        help='Target triangle ratio of the world/pickup variant (default: 0.3)')
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Report what would change without writing files')
+    return parser.parse_args(raw_args)
+
+
+def main():
+    args = parse_args(get_args())
+    glb_files = collect_weapons(args.paths)
+
+    print(f"\nOptimizing {len(glb_files)} weapon GLBs (world variant ratio {args.world_ratio})...")
+    counts = {}
+    for i, glb_path in enumerate(glb_files):
+        print(f"  [{i+1}/{len(glb_files)}] {glb_path.name}")
+        try:
+            status, detail = optimize_weapon(glb_path, args.world_ratio, args.dry_run)
+        except Exception as e:
+            print(f"    ERROR: {e}")
+            status, detail = 'FAILED', ''
+        print(f"    [{status}] {detail}".rstrip())
+        counts[status] = counts.get(status, 0) + 1
+
+    print(f"\n=== WEAPON SUMMARY ===")
+    for status, count in sorted(counts.items()):
+        print(f"{status}: {count}")
+    if counts.get('FAILED'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+"""
+Stellar Descent - ORM Texture Packer
+
+Packs each material's ambient occlusion, roughness and metallic maps into a
+single glTF ORM texture (R = occlusion, G = roughness, B = metallic) and
+points both occlusionTexture and metallicRoughnessTexture at it: one texture
+fetch and one GPU allocation instead of up to three per material.
+
+Inputs per material:
+  occlusionTexture           R channel
+  metallicRoughnessTexture   G/B channels, always (the slot defines the
+                             layout, whatever the image is called)
+  unreferenced images        single grey channel, classified with
+                             retexture_marines' classify_texture() ('ao',
+                             'roughness', 'metallic'); used when the GLB has
+                             one material or the image name contains the
+                             material name
+
+Channels without a source are written as 1.0, so the material factors
+(roughnessFactor, metallicFactor, occlusion strength) give the same result
+as before. Materials whose inputs use different UV sets, samplers or texture
+transforms are left alone (AO baked onto a lightmap UV cannot share a texture
+with UV0 maps). GLBs already split by split_textures.py are skipped.
+
+Usage:
+    blender --background --python scripts/pack_orm.py -- public/assets/models/npcs/marine/
+    blender --background --python scripts/pack_orm.py -- model.glb --dry-run
+
+Requires: Blender 3.6+, numpy
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import (
+    read_glb, write_glb, collect_glbs, compact, image_bytes, add_buffer_view, texture_usages,
+)
+from image_io import sniff_mime_type, decode_image, encode_image, resize_pixels
+from retexture_marines import classify_texture
+
+# texture class -> ORM channel
+CHANNELS = {'ao': 0, 'roughness': 1, 'metallic': 2}
+
+
+def get_args():
+    argv = sys.argv
+    if '--' in argv:
+        return argv[argv.index('--') + 1:]
+    return []
+
+
+def image_label(image):
+    return image.get('name') or Path(image.get('uri', '')).stem
+
+
+def texture_key(document, info):
+    """What must match for two texture infos to share one texture."""
+    texture = document['textures'][info['index']]
+    return info.get('texCoord', 0), texture.get('sampler'), info.get('extensions')
+
+
+def loose_images(glb):
+    """Embedded images no material samples, by ORM channel class."""
+    used = texture_usages(glb)
+    loose = []
+    for i, image in enumerate(glb.json.get('images', [])):
+        if i in used or 'bufferView' not in image:
+            continue
+        kind = classify_texture(image_label(image))
+        if kind in CHANNELS:
+            loose.append((i, kind))
+    return loose
+
+
+def material_sources(glb, material, loose, single_material):
+    """
+    ORM channel -> (image index, source channel) for one material, plus the
+    texture info to copy texCoord/sampler from. Returns (None, reason) when
+    the inputs cannot share a texture.
+    """
+    document = glb.json
+    textures = document.get('textures', [])
+    pbr = material.get('pbrMetallicRoughness', {})
+    occlusion = material.get('occlusionTexture')
+    metal_rough = pbr.get('metallicRoughnessTexture')
+    infos = [info for info in (occlusion, metal_rough) if info]
+
+    if occlusion and metal_rough:
+        if occlusion['index'] == metal_rough['index']:
+            return None, 'ALREADY_PACKED'
+        if texture_key(document, occlusion) != texture_key(document, metal_rough):
+            return None, 'UV_MISMATCH'
+
+    sources = {}
+    if occlusion and textures[occlusion['index']].get('source') is not None:
+        sources[0] = (textures[occlusion['index']]['source'], 0)
+    if metal_rough and textures[metal_rough['index']].get('source') is not None:
+        # The glTF slot defines the layout (G = roughness, B = metallic),
+        # whatever the image is called
+        image = textures[metal_rough['index']]['source']
+        sources[1] = (image, 1)
+        sources[2] = (image, 2)
+
+    name = (material.get('name') or '').lower()
+    for image, kind in loose:
+        channel = CHANNELS[kind]
+        label = image_label(document['images'][image]).lower()
+        if channel not in sources and (single_material or (name and name in label)):
+            sources[channel] = (image, 0)
+
+    if len({image for image, _ in sources.values()}) < 2:
+        return None, 'NOTHING_TO_PACK'
+    return (sources, infos[0] if infos else None), None
+
+
+def pack_material(glb, material, sources, template, decoded):
+    """Build the ORM image for one material and rewire its texture slots."""
+    document = glb.json
+
+    def pixels(image):
+        if image not in decoded:
+            data = image_bytes(glb, image)
+            decoded[image] = decode_image(data, document['images'][image].get('mimeType') or sniff_mime_type(data))
+        return decoded[image]
+
+    images = {image for image, _ in sources.values()}
+    height, width = max((pixels(i).shape[:2] for i in images), key=lambda s: s[0] * s[1])
+    orm = np.ones((height, width, 3), dtype=np.float32)
+    for channel, (image, source_channel) in sources.items():
+        orm[:, :, channel] = resize_pixels(pixels(image), width, height)[:, :, source_channel]
+
+    label = material.get('name') or f"material_{document['materials'].index(material)}"
+    document.setdefault('images', []).append({
+        'name': f"{label}_orm",
+        'mimeType': 'image/png',
+        'bufferView': add_buffer_view(glb, encode_image(orm, 'image/png')),
+    })
+    texture = {'source': len(document['images']) - 1}
+    if template is not None:
+        sampler = document['textures'][template['index']].get('sampler')
+        if sampler is not None:
+            texture['sampler'] = sampler
+    document.setdefault('textures', []).append(texture)
+
+    info = {'index': len(document['textures']) - 1}
+    if template is not None:
+        info.update({k: v for k, v in template.items() if k in ('texCoord', 'extensions')})
+    pbr = material.setdefault('pbrMetallicRoughness', {})
+    pbr['metallicRoughnessTexture'] = dict(info)
+    if 0 in sources:
+        occlusion = dict(info)
+        if 'strength' in material.get('occlusionTexture', {}):
+            occlusion['strength'] = material['occlusionTexture']['strength']
+        material['occlusionTexture'] = occlusion
+    return images
+
+
+def remove_unused_images(glb, candidates):
+    """Drop textures no material samples and candidate images left unused."""
+    document = glb.json
+    used_textures = set()
+
+    def visit(key, value):
+        if isinstance(value, dict):
+            if 'index' in value and key.endswith('Texture'):
+                used_textures.add(value['index'])
+            for k, child in value.items():
+                visit(k, child)
+        elif isinstance(value, list):
+            for child in value:
+                visit(key, child)
+
+    for material in document.get('materials', []):
+        visit('', material)
+    textures = document.get('textures', [])
+    texture_remap = {old: new for new, old in enumerate(sorted(used_textures))}
+    document['textures'] = [textures[i] for i in sorted(used_textures)]
+
+    def remap(value, key=''):
+        if isinstance(value, dict):
+            if 'index' in value and key.endswith('Texture'):
+                value['index'] = texture_remap[value['index']]
+            for k, child in value.items():
+                remap(child, k)
+        elif isinstance(value, list):
+            for child in value:
+                remap(child, key)
+
+    for material in document.get('materials', []):
+        remap(material)
+
+    used_images = {t['source'] for t in document['textures'] if 'source' in t}
+    images = document.get('images', [])
+    kept = [i for i in range(len(images)) if i in used_images or i not in candidates]
+    image_remap = {old: new for new, old in enumerate(kept)}
+    document['images'] = [images[i] for i in kept]
+    for texture in document['textures']:
+        if 'source' in texture:
+            texture['source'] = image_remap[texture['source']]
+
+
+def pack_glb(glb_path, dry_run=False):
+    """Pack one GLB. Returns (status, materials packed)."""
+    glb = read_glb(glb_path)
+    document = glb.json
+    if 'progressiveTextures' in document.get('asset', {}).get('extras', {}):
+        return 'PROGRESSIVE', 0
+    materials = document.get('materials', [])
+    loose = loose_images(glb)
+
+    plans = []
+    for material in materials:
+        plan, reason = material_sources(glb, material, loose, len(materials) == 1)
+        if plan:
+            plans.append((material, *plan))
+        elif reason == 'UV_MISMATCH':
+            print(f"    {material.get('name', '?')}: AO and metallic-roughness use different UVs, skipped")
+    if not plans:
+        return 'NOTHING_TO_PACK', 0
+    if dry_run:
+        return 'DRY_RUN', len(plans)
+
+    decoded = {}
+    candidates = set()
+    for material, sources, template in plans:
+        candidates |= pack_material(glb, material, sources, template, decoded)
+        print(f"    {material.get('name', '?')}: packed {len(sources)} channels")
+    remove_unused_images(glb, candidates)
+    compact(glb)
+    write_glb(glb_path, glb)
+    return 'PACKED', len(plans)
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Pack occlusion/roughness/metallic maps into one ORM texture per material')
+    parser.add_argument('paths', nargs='+', help='GLB files or directories')
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Report what would be packed without writing files')
+    return parser.parse_args(raw_args)
+
+
+def main():
+    args = parse_args(get_args())
+    glb_files = collect_glbs(args.paths)
+
+    print(f"\nPacking ORM textures for {len(glb_files)} GLB files...")
+    counts = {}
+    packed_materials = 0
+    for i, glb_path in enumerate(glb_files):
+        before = os.path.getsize(glb_path)
+        print(f"  [{i+1}/{len(glb_files)}] {glb_path.name}")
+        try:
+            status, packed = pack_glb(glb_path, args.dry_run)
+        except Exception as e:
+            print(f"    ERROR: {e}")
+            status, packed = 'FAILED', 0
+        packed_materials += packed
+        if status == 'PACKED':
+            after = os.path.getsize(glb_path)
+            print(f"    => {packed} materials, {before / 1024:.0f} KB -> {after / 1024:.0f} KB")
+        else:
+            print(f"    [{status}]")
+        counts[status] = counts.get(status, 0) + 1
+
+    print(f"\n=== ORM SUMMARY ===")
+    for status, count in sorted(counts.items()):
+        print(f"{status}: {count}")
+    print(f"Materials packed: {packed_materials}")
+    if counts.get('FAILED'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
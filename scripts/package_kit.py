@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Stellar Descent - Instanced Kit Packager
+
+Modular station pieces ship as ~180 standalone GLBs, and levels place the
+same corridor/wall/floor tile dozens of times: one import and a set of draw
+calls per placement. This packages a kit directory two ways:
+
+  <kit>.kit.glb          every piece of the kit in one file, one node per
+                         piece (named after its GLB). Identical meshes,
+                         materials, images and samplers are stored once.
+  <level>.instances.glb  the pieces a level layout uses, each stored once,
+                         on a node with EXT_mesh_gpu_instancing
+                         TRANSLATION/ROTATION/SCALE buffers holding every
+                         placement. Babylon draws each piece with one
+                         instanced draw per primitive (thin instances), so a
+                         corridor costs a handful of draws instead of
+                         hundreds.
+
+Pieces are baked to a single mesh (static node transforms applied, primitives
+merged per material). Pieces with animated or skinned nodes (doors) are left
+out of the kit and stay standalone. A piece's baked AO/lightmap
+(node.extras.bakedLighting from bake_lightmaps.py) goes on its kit and
+instance nodes, so baked pieces still share their materials.
+
+Layouts are JSON, in Babylon scene coordinates like the TypeScript layouts:
+    {"name": "anchor-station",
+     "instances": [{"model": "corridor_main", "position": [0, 0, 4],
+                    "rotationY": 1.5708, "scale": [1, 1, 1]}]}
+The Babylon glTF loader mirrors X when it converts to its left-handed
+scene, so positions are stored with X negated and Y rotations negated.
+--station-layout reads ANCHOR_STATION_LAYOUT straight from
+ModularStationBuilder.ts instead.
+
+Usage:
+    python3 scripts/package_kit.py public/assets/models/environment/station/ \\
+        --output public/assets/kits/station.kit.glb \\
+        --station-layout src/game/levels/anchor-station/ModularStationBuilder.ts
+    python3 scripts/package_kit.py kit_dir/ --output kit.glb --layout level.json
+
+Runs with plain Python 3 + numpy (no Blender needed).
+"""
+
+import argparse
+import ast
+import copy
+import hashlib
+import json
+import math
+import operator
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import (
+    Glb, read_glb, write_glb, collect_glbs, compact, read_accessor, add_accessor, add_buffer_view,
+    image_bytes, world_matrices, ARRAY_BUFFER, ELEMENT_ARRAY_BUFFER,
+)
+from flatten_glbs import protected_nodes, layout_key, merge_group
+
+INSTANCING = 'EXT_mesh_gpu_instancing'
+
+
+class KitBuilder:
+    """Accumulates kit pieces into one GLB, sharing identical data."""
+
+    def __init__(self):
+        self.glb = Glb({'asset': {'version': '2.0', 'generator': 'Stellar Descent package_kit.py'},
+                        'scene': 0, 'scenes': [{'nodes': []}]})
+        self.pieces = {}          # stem -> mesh index
+        self.baked = {}           # stem -> node extras.bakedLighting (bake_lightmaps.py)
+        self._meshes = {}         # content hash -> mesh index
+        self._materials = {}      # material json -> index
+        self._images = {}         # bytes hash -> index
+        self._samplers = {}       # sampler json -> index
+        self._textures = {}       # texture json -> index
+        self._source_dir = None   # directory of the piece being added
+
+    def _index(self, cache, key, section, value):
+        if key not in cache:
+            items = self.glb.json.setdefault(section, [])
+            items.append(value)
+            cache[key] = len(items) - 1
+        return cache[key]
+
+    def _image(self, src, index):
+        image = src.json['images'][index]
+        if 'uri' in image:
+            # Shared kit atlases (atlas_kits.py) are embedded into the package
+            data = (self._source_dir / image['uri']).read_bytes()
+        else:
+            data = image_bytes(src, index)
+        key = hashlib.sha1(data).hexdigest()
+        if key not in self._images:
+            entry = {k: v for k, v in image.items() if k not in ('bufferView', 'uri')}
+            entry['bufferView'] = add_buffer_view(self.glb, data)
+            self._index(self._images, key, 'images', entry)
+        return self._images[key]
+
+    def _texture(self, src, index):
+        texture = copy.deepcopy(src.json['textures'][index])
+        if 'source' in texture:
+            texture['source'] = self._image(src, texture['source'])
+        for extension in texture.get('extensions', {}).values():
+            if 'source' in extension:
+                extension['source'] = self._image(src, extension['source'])
+        if 'sampler' in texture:
+            sampler = src.json['samplers'][texture['sampler']]
+            texture['sampler'] = self._index(self._samplers, json.dumps(sampler, sort_keys=True), 'samplers', sampler)
+        return self._index(self._textures, json.dumps(texture, sort_keys=True), 'textures', texture)
+
+    def _material(self, src, index):
+        material = copy.deepcopy(src.json['materials'][index])
+
+        def remap(value, key=''):
+            if isinstance(value, dict):
+                if 'index' in value and key.endswith('Texture'):
+                    value['index'] = self._texture(src, value['index'])
+                for k, child in value.items():
+                    remap(child, k)
+            elif isinstance(value, list):
+                for child in value:
+                    remap(child, key)
+
+        remap(material)
+        # Names differ between files that share a material; keep the first
+        key = json.dumps({k: v for k, v in material.items() if k != 'name'}, sort_keys=True)
+        return self._index(self._materials, key, 'materials', material)
+
+    def add_piece(self, glb_path):
+        """Bake one piece into a single mesh. Returns its mesh index, or None if it moves."""
+        src = read_glb(glb_path)
+        self._source_dir = glb_path.parent
+        world = world_matrices(src)
+        if protected_nodes(src) & set(world):
+            return None
+        nodes = src.json.get('nodes', [])
+        groups = {}
+        for n in sorted(world):
+            if 'mesh' in nodes[n]:
+                for prim in src.json['meshes'][nodes[n]['mesh']].get('primitives', []):
+                    groups.setdefault(layout_key(src, prim), []).append((prim, world[n]))
+        if not groups:
+            return None
+
+        merged = [merge_group(src, members) for members in groups.values()]
+        digest = hashlib.sha1()
+        arrays = []
+        for prim in merged:
+            attributes = {name: read_accessor(src, index) for name, index in sorted(prim['attributes'].items())}
+            normalized = {name: src.json['accessors'][index].get('normalized', False)
+                          for name, index in prim['attributes'].items()}
+            indices = read_accessor(src, prim['indices'])
+            material = self._material(src, prim['material']) if 'material' in prim else None
+            for name, values in attributes.items():
+                digest.update(name.encode() + np.ascontiguousarray(values).tobytes())
+            digest.update(np.ascontiguousarray(indices).tobytes() + str(material).encode())
+            arrays.append((attributes, normalized, indices, material))
+
+        key = digest.hexdigest()
+        if key not in self._meshes:
+            primitives = []
+            for attributes, normalized, indices, material in arrays:
+                prim = {
+                    'attributes': {name: add_accessor(self.glb, values, ARRAY_BUFFER, normalized=normalized[name])
+                                   for name, values in attributes.items()},
+                    'indices': add_accessor(self.glb, indices, ELEMENT_ARRAY_BUFFER),
+                }
+                if material is not None:
+                    prim['material'] = material
+                primitives.append(prim)
+            self._index(self._meshes, key, 'meshes', {'name': glb_path.stem, 'primitives': primitives})
+        self.pieces[glb_path.stem] = self._meshes[key]
+
+        # Per-piece AO/lightmap bakes live on the nodes, not the shared materials
+        baked = next((nodes[n]['extras']['bakedLighting'] for n in sorted(world)
+                      if 'bakedLighting' in nodes[n].get('extras', {})), None)
+        if baked:
+            baked = copy.deepcopy(baked)
+            for info in baked.values():
+                info['index'] = self._texture(src, info['index'])
+            self.baked[glb_path.stem] = baked
+        return self._meshes[key]
+
+    def piece_node(self, stem, **fields):
+        node = {'name': stem, 'mesh': self.pieces[stem], **fields}
+        if stem in self.baked:
+            node['extras'] = {'bakedLighting': copy.deepcopy(self.baked[stem])}
+        return node
+
+    def kit_glb(self, source_name):
+        """The kit: one node per piece at the origin."""
+        glb = copy.deepcopy(self.glb)
+        nodes = glb.json.setdefault('nodes', [])
+        for stem in sorted(self.pieces):
+            nodes.append(self.piece_node(stem))
+        glb.json['scenes'][0]['nodes'] = list(range(len(nodes)))
+        glb.json['asset']['extras'] = {'kit': {
+            'version': 1,
+            'source': source_name,
+            'pieces': len(self.pieces),
+            'uniqueMeshes': len(glb.json.get('meshes', [])),
+        }}
+        return glb
+
+    def instances_glb(self, layout):
+        """A level layout as one EXT_mesh_gpu_instancing node per used piece."""
+        glb = copy.deepcopy(self.glb)
+        document = glb.json
+        by_model = {}
+        missing = set()
+        for instance in layout['instances']:
+            if instance['model'] in self.pieces:
+                by_model.setdefault(instance['model'], []).append(instance)
+            else:
+                missing.add(instance['model'])
+
+        nodes = document.setdefault('nodes', [])
+        for model, instances in sorted(by_model.items()):
+            # Babylon scene (left-handed) -> glTF: mirror X, negate Y rotations
+            translation = np.array([[-i['position'][0], i['position'][1], i['position'][2]] for i in instances],
+                                   dtype=np.float32)
+            angles = np.array([-i.get('rotationY', 0.0) for i in instances], dtype=np.float64)
+            rotation = np.zeros((len(instances), 4), dtype=np.float32)
+            rotation[:, 1] = np.sin(angles / 2)
+            rotation[:, 3] = np.cos(angles / 2)
+            scale = np.array([i.get('scale', [1, 1, 1]) for i in instances], dtype=np.float32)
+
+            attributes = {'TRANSLATION': add_accessor(glb, translation)}
+            if np.any(angles):
+                attributes['ROTATION'] = add_accessor(glb, rotation)
+            if not np.allclose(scale, 1):
+                attributes['SCALE'] = add_accessor(glb, scale)
+            nodes.append(self.piece_node(model, extensions={INSTANCING: {'attributes': attributes}}))
+
+        # Keep only the meshes (and what they use) this level needs
+        used = sorted({node['mesh'] for node in nodes})
+        remap = {old: new for new, old in enumerate(used)}
+        document['meshes'] = [document['meshes'][i] for i in used]
+        for node in nodes:
+            node['mesh'] = remap[node['mesh']]
+        document['scenes'][0]['nodes'] = list(range(len(nodes)))
+        document['extensionsUsed'] = [INSTANCING]
+        document['extensionsRequired'] = [INSTANCING]
+
+        draws_before = sum(len(instances) * len(document['meshes'][remap[self.pieces[m]]]['primitives'])
+                           for m, instances in by_model.items())
+        draws_after = sum(len(mesh['primitives']) for mesh in document['meshes'])
+        document['asset']['extras'] = {'instances': {
+            'version': 1,
+            'layout': layout.get('name', ''),
+            'instances': sum(len(i) for i in by_model.values()),
+            'pieces': len(by_model),
+            'drawCalls': draws_after,
+            'drawCallsStandalone': draws_before,
+        }}
+        prune_unused(glb)
+        return glb, sorted(missing)
+
+
+def _keep(document, section, used):
+    """Keep only the used entries of a top-level array. Returns old -> new index."""
+    used = sorted(used)
+    if section in document:
+        document[section] = [document[section][i] for i in used]
+        if not document[section]:
+            del document[section]
+    return {old: new for new, old in enumerate(used)}
+
+
+def prune_unused(glb):
+    """Drop the materials, textures, images and samplers no mesh or node uses any more."""
+    document = glb.json
+    primitives = [prim for mesh in document['meshes'] for prim in mesh['primitives']]
+    materials = _keep(document, 'materials', {p['material'] for p in primitives if 'material' in p})
+    for prim in primitives:
+        if 'material' in prim:
+            prim['material'] = materials[prim['material']]
+
+    infos = []
+
+    def visit(value, key=''):
+        if isinstance(value, dict):
+            if 'index' in value and key.endswith('Texture'):
+                infos.append(value)
+            for k, child in value.items():
+                visit(child, k)
+        elif isinstance(value, list):
+            for child in value:
+                visit(child, key)
+
+    visit(document.get('materials', []))
+    visit([node['extras'] for node in document.get('nodes', []) if 'extras' in node])
+    textures = _keep(document, 'textures', {info['index'] for info in infos})
+    for info in infos:
+        info['index'] = textures[info['index']]
+
+    sources = []
+    for texture in document.get('textures', []):
+        sources.append(texture)
+        sources.extend(e for e in texture.get('extensions', {}).values() if 'source' in e)
+    images = _keep(document, 'images', {s['source'] for s in sources if 'source' in s})
+    for source in sources:
+        if 'source' in source:
+            source['source'] = images[source['source']]
+    samplers = _keep(document, 'samplers',
+                     {t['sampler'] for t in document.get('textures', []) if 'sampler' in t})
+    for texture in document.get('textures', []):
+        if 'sampler' in texture:
+            texture['sampler'] = samplers[texture['sampler']]
+    compact(glb)
+
+
+# Arithmetic in layout rotations, e.g. "-Math.PI / 2"
+_OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+              ast.Div: operator.truediv, ast.USub: operator.neg, ast.UAdd: operator.pos}
+
+
+def eval_number(expression):
+    """Evaluate a numeric TypeScript literal expression (numbers, Math.PI, + - * /)."""
+    tree = ast.parse(expression.replace('Math.PI', str(math.pi)).strip(), mode='eval')
+
+    def visit(node):
+        if isinstance(node, ast.Expression):
+            return visit(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return float(node.value)
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            return _OPERATORS[type(node.op)](visit(node.left), visit(node.right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _OPERATORS:
+            return _OPERATORS[type(node.op)](visit(node.operand))
+        raise ValueError(f'Unsupported expression: {expression}')
+
+    return visit(tree)
+
+
+def station_layout(ts_path):
+    """ANCHOR_STATION_LAYOUT segments from ModularStationBuilder.ts as a layout dict."""
+    source = Path(ts_path).read_text()
+    models = dict(re.findall(r"(\w+):\s*'/assets/models/[^']*?([\w.-]+)\.glb'", source))
+    type_models = dict(re.findall(r"(\w+):\s*MODELS\.(\w+),", source))
+    segment = re.compile(
+        r"\{\s*type:\s*'(\w+)',\s*position:\s*new Vector3\(([^)]*)\),\s*"
+        r"rotation:\s*([^,]+?),\s*name:\s*'(\w+)',?\s*\}")
+    instances = []
+    for seg_type, position, rotation, name in segment.findall(source):
+        model = models.get(type_models.get(seg_type, ''))
+        if model is None:
+            continue
+        instances.append({
+            'model': model,
+            'name': name,
+            'position': [eval_number(v) for v in position.split(',')],
+            'rotationY': eval_number(rotation),
+        })
+    return {'name': Path(ts_path).parent.name, 'instances': instances}
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Package a modular kit into one GLB plus EXT_mesh_gpu_instancing level layouts')
+    parser.add_argument('paths', nargs='+', help='Kit GLB files or directories')
+    parser.add_argument('--output', required=True, help='Kit GLB to write (e.g. public/assets/kits/station.kit.glb)')
+    parser.add_argument(
+        '--layout', action='append', default=[],
+        help='Placement JSON to turn into <name>.instances.glb next to --output (repeatable)')
+    parser.add_argument(
+        '--station-layout', default=None,
+        help='ModularStationBuilder.ts to read ANCHOR_STATION_LAYOUT from')
+    return parser.parse_args(raw_args)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    glb_files = collect_glbs(args.paths)
+    output = Path(args.output)
+    print(f"\nPackaging {len(glb_files)} kit pieces into {output.name}...")
+
+    builder = KitBuilder()
+    counts = {}
+    for i, glb_path in enumerate(glb_files):
+        try:
+            status = 'PACKED' if builder.add_piece(glb_path) is not None else 'STANDALONE'
+        except Exception as e:
+            status = f'FAILED: {e}'
+        print(f"  [{i+1}/{len(glb_files)}] {glb_path.name} [{status}]")
+        key = status.split(':')[0]
+        counts[key] = counts.get(key, 0) + 1
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    kit = builder.kit_glb(Path(args.paths[0]).name)
+    write_glb(output, kit)
+    print(f"\n  {output.name}: {len(builder.pieces)} pieces, {len(kit.json.get('meshes', []))} unique meshes, "
+          f"{len(kit.json.get('materials', []))} materials, {len(kit.json.get('images', []))} images")
+
+    layouts = []
+    for layout_path in args.layout:
+        layout = json.loads(Path(layout_path).read_text())
+        layout.setdefault('name', Path(layout_path).stem)
+        layouts.append(layout)
+    if args.station_layout:
+        layouts.append(station_layout(args.station_layout))
+    for layout in layouts:
+        level, missing = builder.instances_glb(layout)
+        level_path = output.parent / f"{layout['name']}.instances.glb"
+        write_glb(level_path, level)
+        info = level.json['asset']['extras']['instances']
+        print(f"  {level_path.name}: {info['instances']} placements of {info['pieces']} pieces, "
+              f"draws {info['drawCallsStandalone']} -> {info['drawCalls']}")
+        for model in missing:
+            print(f"    WARNING: '{model}' is not a packed piece of this kit")
+
+    print(f"\n=== KIT SUMMARY ===")
+    for status, count in sorted(counts.items()):
+        print(f"{status}: {count}")
+    if counts.get('FAILED'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
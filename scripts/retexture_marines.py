@@ -124,7 +124,9 @@ def classify_texture(image_name: str) -> str:
         return 'diffuse'
     if any(k in name for k in ['emissive', 'emission', 'glow']):
         return 'emissive'
-    if any(k in name for k in ['bump', 'normal', 'nrm']):
+    if any(k in name for k in ['bump', 'height']):
+        return 'bump'
+    if any(k in name for k in ['normal', 'nrm']):
         return 'normal'
     if any(k in name for k in ['ao', 'ambient', 'occlusion']):
         return 'ao'
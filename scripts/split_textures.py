@@ -0,0 +1,234 @@
+"""
+Stellar Descent - Progressive Texture Streaming Splitter
+
+Splits heavy GLBs (the 10-18 MB marines are almost entirely embedded 2K
+textures) into a light GLB that can render immediately plus full-resolution
+textures that stream in afterwards. Everything is written to --output; the
+source GLB is never modified:
+
+  <output>/<name>.glb              geometry + low-res placeholder textures
+  <output>/<name>_textures/*.png   original full-resolution images, byte-for-byte
+  <output>/<name>.textures.json    sidecar describing which image to upgrade with what
+
+Placeholders are power-of-two, at most --preview-size on the long side.
+The sidecar lists textures in upgrade priority (base color first), and the
+placeholder GLB records it in asset.extras.progressiveTextures. Because the
+sources keep their full textures, the upstream in-place passes can re-run
+on them and a re-split always starts from full resolution; earlier output
+for a GLB is cleared first so no stale sidecar or texture survives.
+
+No loader in the game reads the sidecar yet, so the pipeline's
+split-marines stage is opt-in (asset_pipeline.py --with split-marines).
+
+Sidecar format:
+    {
+      "version": 1,
+      "glb": "marine_soldier.glb",
+      "previewSize": 256,
+      "textures": [
+        {"image": 0, "uri": "marine_soldier_textures/soldier_diffuse.png",
+         "mimeType": "image/png", "width": 2048, "height": 2048,
+         "previewWidth": 256, "previewHeight": 256, "byteLength": 4194304,
+         "usage": ["baseColorTexture"]}
+      ]
+    }
+
+Usage:
+    blender --background --python scripts/split_textures.py -- public/assets/models/npcs/marine/ \
+        --output public/assets/streaming/marine/
+    blender --background --python scripts/split_textures.py -- model.glb --output out/ \
+        --preview-size 128 --min-size-mb 1
+
+Requires: Blender 3.6+, numpy
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import (
+    read_glb, write_glb, collect_glbs, compact, image_bytes, set_image_bytes, image_size, texture_usages,
+)
+from image_io import MIME_EXTENSIONS, sniff_mime_type, resize_image, fit_size
+
+# Upgrade order: what the player notices first
+USAGE_PRIORITY = [
+    'baseColorTexture',
+    'normalTexture',
+    'emissiveTexture',
+    'metallicRoughnessTexture',
+    'occlusionTexture',
+]
+
+
+def get_args():
+    argv = sys.argv
+    if '--' in argv:
+        return argv[argv.index('--') + 1:]
+    return []
+
+
+def safe_name(name, fallback):
+    cleaned = re.sub(r'[^A-Za-z0-9_.-]+', '_', name or '').strip('._')
+    return cleaned or fallback
+
+
+def usage_rank(usages):
+    ranks = [USAGE_PRIORITY.index(u) for u in usages if u in USAGE_PRIORITY]
+    return min(ranks) if ranks else len(USAGE_PRIORITY)
+
+
+def clear_output(output_dir, stem):
+    """Remove an earlier split of stem from output_dir."""
+    for path in (output_dir / f"{stem}.glb", output_dir / f"{stem}.textures.json"):
+        if path.exists():
+            path.unlink()
+    texture_dir = output_dir / f"{stem}_textures"
+    if texture_dir.is_dir():
+        shutil.rmtree(texture_dir)
+
+
+def split_glb(glb_path, output_dir, preview_size, min_size_bytes, dry_run=False):
+    """Split one GLB into output_dir. Returns a short status string."""
+    if output_dir.resolve() == glb_path.parent.resolve():
+        raise ValueError('--output must not be the directory of the source GLB')
+    glb = read_glb(glb_path)
+    extras = glb.json.setdefault('asset', {}).setdefault('extras', {})
+    # Split in place by an older version: only placeholders are left
+    if 'progressiveTextures' in extras:
+        return 'ALREADY_SPLIT'
+
+    stem = glb_path.stem
+    if not dry_run:
+        clear_output(output_dir, stem)
+
+    images = glb.json.get('images', [])
+    embedded = [i for i, img in enumerate(images) if 'bufferView' in img]
+    total_image_bytes = sum(len(image_bytes(glb, i)) for i in embedded)
+    if total_image_bytes < min_size_bytes:
+        return 'LIGHT'
+
+    texture_dir = output_dir / f"{stem}_textures"
+    usages = texture_usages(glb)
+    entries = []
+    used_names = set()
+
+    for i in embedded:
+        data = image_bytes(glb, i)
+        mime_type = images[i].get('mimeType') or sniff_mime_type(data)
+        size = image_size(data)
+        if size is None or mime_type not in MIME_EXTENSIONS:
+            print(f"    Skipped image {i}: unsupported format")
+            continue
+        width, height = size
+        preview_w, preview_h = fit_size(width, height, preview_size)
+        if (preview_w, preview_h) == (width, height):
+            continue
+
+        name = safe_name(images[i].get('name'), f"image_{i}")
+        while name in used_names:
+            name += '_'
+        used_names.add(name)
+        filename = name + MIME_EXTENSIONS[mime_type]
+
+        if not dry_run:
+            texture_dir.mkdir(parents=True, exist_ok=True)
+            with open(texture_dir / filename, 'wb') as f:
+                f.write(data)
+            set_image_bytes(glb, i, resize_image(data, preview_w, preview_h, mime_type), mime_type)
+
+        entries.append({
+            'image': i,
+            'uri': f"{texture_dir.name}/{filename}",
+            'mimeType': mime_type,
+            'width': width,
+            'height': height,
+            'previewWidth': preview_w,
+            'previewHeight': preview_h,
+            'byteLength': len(data),
+            'usage': sorted(usages.get(i, [])),
+        })
+        print(f"    {name}: {width}x{height} -> {preview_w}x{preview_h} placeholder")
+
+    if not entries:
+        return 'LIGHT'
+    if dry_run:
+        return 'DRY_RUN'
+
+    entries.sort(key=lambda e: (usage_rank(e['usage']), -e['byteLength']))
+    sidecar_name = f"{stem}.textures.json"
+    extras['progressiveTextures'] = sidecar_name
+    compact(glb)
+    write_glb(output_dir / glb_path.name, glb)
+
+    sidecar = {
+        'version': 1,
+        'glb': glb_path.name,
+        'previewSize': preview_size,
+        'textures': entries,
+    }
+    with open(output_dir / sidecar_name, 'w') as f:
+        json.dump(sidecar, f, indent=2)
+    return 'SPLIT'
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Split heavy GLBs into placeholder-texture GLBs plus streamed full-res textures')
+    parser.add_argument('paths', nargs='+', help='GLB files or directories')
+    parser.add_argument(
+        '--output', required=True,
+        help='Directory for the placeholder GLBs, full-res textures and sidecars')
+    parser.add_argument(
+        '--preview-size', type=int, default=256,
+        help='Max placeholder texture size in pixels (default: 256)')
+    parser.add_argument(
+        '--min-size-mb', type=float, default=4.0,
+        help='Only split GLBs with at least this much embedded image data (default: 4)')
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Report what would be split without writing files')
+    return parser.parse_args(raw_args)
+
+
+def main():
+    args = parse_args(get_args())
+    glb_files = collect_glbs(args.paths)
+    min_size_bytes = int(args.min_size_mb * 1024 * 1024)
+    output_dir = Path(args.output)
+    if not args.dry_run:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"\nSplitting textures for {len(glb_files)} GLB files "
+          f"(placeholders <= {args.preview_size}px, threshold {args.min_size_mb} MB)...")
+    counts = {}
+    for i, glb_path in enumerate(glb_files):
+        before = os.path.getsize(glb_path)
+        print(f"  [{i+1}/{len(glb_files)}] {glb_path.name}")
+        try:
+            status = split_glb(glb_path, output_dir, args.preview_size, min_size_bytes, args.dry_run)
+        except Exception as e:
+            print(f"    ERROR: {e}")
+            status = 'FAILED'
+        if status == 'SPLIT':
+            after = os.path.getsize(output_dir / glb_path.name)
+            print(f"    => {before / 1024 / 1024:.1f} MB -> {after / 1024:.0f} KB")
+        else:
+            print(f"    [{status}]")
+        counts[status] = counts.get(status, 0) + 1
+
+    print(f"\n=== SPLIT SUMMARY ===")
+    for status, count in sorted(counts.items()):
+        print(f"{status}: {count}")
+    if counts.get('FAILED'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
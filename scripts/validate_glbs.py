@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Stellar Descent - GLB Accessor & Index Integrity Validator
+
+Checks the binary data of every GLB with numpy, before anything tries to
+import it. Malformed skin data is what crashes Blender's glTF importer (see
+the joint-weight patch in retexture_marines.apply_blender_patches). This
+catches it, and other bad data, for the whole library in seconds.
+
+Errors (file is INVALID):
+  - bufferViews outside the BIN chunk, accessors outside their bufferView,
+    misaligned offsets, bad strides
+  - dangling references (meshes, skins, materials, textures, accessors)
+  - animations without channels or samplers
+  - attribute counts that differ within a primitive
+  - index values >= vertex count
+  - JOINTS_n/WEIGHTS_n without a partner, or with mismatched set counts
+  - joint indices outside the skin's joint list
+  - NaN/Inf in any float accessor
+
+Warnings:
+  - vertex weights that do not sum to 1, or are negative
+  - degenerate triangles (repeated indices or zero area)
+  - POSITION min/max missing or not matching the data
+  - non-unit normals
+
+Usage:
+    python3 scripts/validate_glbs.py public/assets/models/
+    python3 scripts/validate_glbs.py model.glb other/dir/ --report validation.json
+
+Exit code is 1 if any file is INVALID. Runs with plain Python 3 + numpy.
+audit_glbs.py (and so watch_assets.py) runs validate_glb() first and never
+hands an INVALID file to Blender's importer.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import (
+    read_glb, collect_glbs, read_accessor, read_accessor_float, COMPONENT_DTYPES, TYPE_SIZES,
+    FLOAT, UNSIGNED_BYTE, UNSIGNED_SHORT, UNSIGNED_INT,
+)
+
+WEIGHT_SUM_TOLERANCE = 0.01
+NORMAL_LENGTH_TOLERANCE = 0.01
+DEGENERATE_AREA = 1e-12
+
+
+class Findings:
+    def __init__(self):
+        self.errors = []
+        self.warnings = []
+
+    def error(self, message):
+        self.errors.append(message)
+
+    def warn(self, message):
+        self.warnings.append(message)
+
+
+# ---------------------------------------------------------------------------
+# Structure
+# ---------------------------------------------------------------------------
+
+def check_buffer_views(glb, found):
+    """Every bufferView must lie inside the BIN chunk."""
+    bin_length = len(glb.bin)
+    for i, view in enumerate(glb.json.get('bufferViews', [])):
+        if view.get('buffer', 0) != 0:
+            found.error(f'bufferView {i}: external buffers are not supported')
+            continue
+        start = view.get('byteOffset', 0)
+        end = start + view.get('byteLength', 0)
+        if end > bin_length:
+            found.error(f'bufferView {i}: bytes {start}-{end} exceed BIN chunk ({bin_length})')
+        stride = view.get('byteStride')
+        if stride is not None and (stride < 4 or stride > 252 or stride % 4):
+            found.error(f'bufferView {i}: invalid byteStride {stride}')
+
+
+def check_accessor_bounds(glb, found):
+    """
+    Every accessor must fit inside its bufferView. Returns the set of
+    accessor indices that are safe to read.
+    """
+    views = glb.json.get('bufferViews', [])
+    readable = set()
+    for i, accessor in enumerate(glb.json.get('accessors', [])):
+        component_type = accessor.get('componentType')
+        if component_type not in COMPONENT_DTYPES or accessor.get('type') not in TYPE_SIZES:
+            found.error(f'accessor {i}: invalid componentType/type')
+            continue
+        component_size = COMPONENT_DTYPES[component_type].itemsize
+        element_size = component_size * TYPE_SIZES[accessor['type']]
+        count = accessor.get('count', 0)
+        ok = True
+
+        if 'bufferView' in accessor:
+            view_index = accessor['bufferView']
+            if not 0 <= view_index < len(views):
+                found.error(f'accessor {i}: bufferView {view_index} does not exist')
+                continue
+            view = views[view_index]
+            offset = accessor.get('byteOffset', 0)
+            stride = view.get('byteStride') or element_size
+            if offset % component_size or (view.get('byteOffset', 0) + offset) % component_size:
+                found.error(f'accessor {i}: byteOffset {offset} not aligned to {component_size}')
+                ok = False
+            if stride < element_size:
+                found.error(f'accessor {i}: byteStride {stride} < element size {element_size}')
+                ok = False
+            needed = offset + (stride * (count - 1) + element_size if count else 0)
+            if needed > view.get('byteLength', 0):
+                found.error(f'accessor {i}: needs {needed} bytes, bufferView {view_index} has '
+                            f'{view.get("byteLength", 0)}')
+                ok = False
+            if view.get('byteOffset', 0) + view.get('byteLength', 0) > len(glb.bin):
+                ok = False
+
+        sparse = accessor.get('sparse')
+        if sparse:
+            for part in ('indices', 'values'):
+                view_index = sparse.get(part, {}).get('bufferView')
+                if view_index is None or not 0 <= view_index < len(views):
+                    found.error(f'accessor {i}: sparse {part} bufferView missing')
+                    ok = False
+            if ok:
+                idx = sparse['indices']
+                idx_size = COMPONENT_DTYPES[idx['componentType']].itemsize
+                if idx.get('byteOffset', 0) + sparse['count'] * idx_size > views[idx['bufferView']]['byteLength']:
+                    found.error(f'accessor {i}: sparse indices exceed their bufferView')
+                    ok = False
+
+        if ok:
+            readable.add(i)
+    return readable
+
+
+def check_references(glb, found):
+    """Indices between top-level arrays must point at existing entries."""
+    doc = glb.json
+    n = {key: len(doc.get(key, [])) for key in
+         ('nodes', 'meshes', 'skins', 'materials', 'textures', 'images', 'accessors', 'samplers')}
+
+    def ref(where, kind, index):
+        if not isinstance(index, int) or not 0 <= index < n[kind]:
+            found.error(f'{where}: {kind} index {index} does not exist')
+            return False
+        return True
+
+    for i, node in enumerate(doc.get('nodes', [])):
+        if 'mesh' in node:
+            ref(f'node {i}', 'meshes', node['mesh'])
+        if 'skin' in node:
+            ref(f'node {i}', 'skins', node['skin'])
+        for child in node.get('children', []):
+            ref(f'node {i}', 'nodes', child)
+    for i, skin in enumerate(doc.get('skins', [])):
+        for joint in skin.get('joints', []):
+            ref(f'skin {i}', 'nodes', joint)
+        if 'inverseBindMatrices' in skin:
+            ref(f'skin {i}', 'accessors', skin['inverseBindMatrices'])
+    for i, texture in enumerate(doc.get('textures', [])):
+        if 'source' in texture:
+            ref(f'texture {i}', 'images', texture['source'])
+        if 'sampler' in texture:
+            ref(f'texture {i}', 'samplers', texture['sampler'])
+    for m, mesh in enumerate(doc.get('meshes', [])):
+        for p, prim in enumerate(mesh.get('primitives', [])):
+            where = f'mesh {m} primitive {p}'
+            for name, accessor in prim.get('attributes', {}).items():
+                ref(f'{where} {name}', 'accessors', accessor)
+            if 'indices' in prim:
+                ref(f'{where} indices', 'accessors', prim['indices'])
+            if 'material' in prim:
+                ref(where, 'materials', prim['material'])
+    for a, animation in enumerate(doc.get('animations', [])):
+        if not animation.get('channels') or not animation.get('samplers'):
+            found.error(f'animation {a}: needs at least one channel and one sampler')
+        for sampler in animation.get('samplers', []):
+            ref(f'animation {a}', 'accessors', sampler.get('input'))
+            ref(f'animation {a}', 'accessors', sampler.get('output'))
+        for channel in animation.get('channels', []):
+            target = channel.get('target', {})
+            if 'node' in target:
+                ref(f'animation {a}', 'nodes', target['node'])
+
+
+# ---------------------------------------------------------------------------
+# Data
+# ---------------------------------------------------------------------------
+
+def check_float_data(glb, readable, found):
+    """NaN/Inf anywhere in float accessors."""
+    for i in sorted(readable):
+        accessor = glb.json['accessors'][i]
+        if accessor['componentType'] != FLOAT:
+            continue
+        data = read_accessor(glb, i)
+        bad = int(np.count_nonzero(~np.isfinite(data)))
+        if bad:
+            found.error(f'accessor {i}: {bad} NaN/Inf values')
+
+
+def primitive_skins(glb):
+    """Map mesh index -> set of skin indices used by nodes instancing it."""
+    skins = {}
+    for node in glb.json.get('nodes', []):
+        if 'mesh' in node and 'skin' in node:
+            skins.setdefault(node['mesh'], set()).add(node['skin'])
+    return skins
+
+
+def check_primitive(glb, m, p, prim, readable, mesh_skins, found, stats):
+    where = f'mesh {m} primitive {p}'
+    accessors = glb.json.get('accessors', [])
+    attributes = prim.get('attributes', {})
+    refs = list(attributes.values()) + ([prim['indices']] if 'indices' in prim else [])
+    if any(not isinstance(a, int) or a >= len(accessors) for a in refs):
+        return
+    if 'POSITION' not in attributes:
+        found.error(f'{where}: no POSITION attribute')
+        return
+
+    # Attribute arity
+    counts = {name: accessors[a]['count'] for name, a in attributes.items()}
+    vertex_count = counts['POSITION']
+    mismatched = {name: c for name, c in counts.items() if c != vertex_count}
+    if mismatched:
+        found.error(f'{where}: attribute counts differ from POSITION ({vertex_count}): {mismatched}')
+    stats['vertices'] += vertex_count
+
+    # Positions
+    pos_index = attributes['POSITION']
+    positions = None
+    if pos_index in readable:
+        positions = read_accessor_float(glb, pos_index)
+        accessor = accessors[pos_index]
+        if 'min' not in accessor or 'max' not in accessor:
+            found.warn(f'{where}: POSITION accessor has no min/max')
+        elif len(positions) and np.isfinite(positions).all():
+            actual_min, actual_max = positions.min(axis=0), positions.max(axis=0)
+            tol = 1e-4 * max(1.0, float(np.abs(positions).max()))
+            if (np.abs(actual_min - accessor['min']) > tol).any() or \
+                    (np.abs(actual_max - accessor['max']) > tol).any():
+                found.warn(f'{where}: POSITION min/max do not match data')
+
+    # Normals
+    if 'NORMAL' in attributes and attributes['NORMAL'] in readable:
+        normals = read_accessor_float(glb, attributes['NORMAL'])
+        lengths = np.linalg.norm(normals, axis=1)
+        off = int(np.count_nonzero(np.abs(lengths - 1.0) > NORMAL_LENGTH_TOLERANCE))
+        if off:
+            found.warn(f'{where}: {off} non-unit normals')
+
+    # Indices
+    mode = prim.get('mode', 4)
+    indices = None
+    if 'indices' in prim:
+        idx_accessor = accessors[prim['indices']]
+        if idx_accessor['componentType'] not in (UNSIGNED_BYTE, UNSIGNED_SHORT, UNSIGNED_INT):
+            found.error(f'{where}: index componentType {idx_accessor["componentType"]} is not unsigned')
+        elif prim['indices'] in readable:
+            indices = read_accessor(glb, prim['indices']).astype(np.int64)
+            if len(indices) and indices.max() >= vertex_count:
+                bad = int(np.count_nonzero(indices >= vertex_count))
+                found.error(f'{where}: {bad} indices >= vertex count {vertex_count} '
+                            f'(max {int(indices.max())})')
+                indices = None
+    elif mode == 4:
+        indices = np.arange(vertex_count)
+
+    if mode == 4 and indices is not None:
+        if len(indices) % 3:
+            found.error(f'{where}: {len(indices)} triangle indices is not a multiple of 3')
+        tris = indices[:len(indices) - len(indices) % 3].reshape(-1, 3)
+        stats['triangles'] += len(tris)
+        repeated = (tris[:, 0] == tris[:, 1]) | (tris[:, 1] == tris[:, 2]) | (tris[:, 0] == tris[:, 2])
+        degenerate = repeated
+        if positions is not None and len(tris):
+            a, b, c = positions[tris[:, 0]], positions[tris[:, 1]], positions[tris[:, 2]]
+            area2 = np.linalg.norm(np.cross(b - a, c - a), axis=1)
+            degenerate = repeated | (area2 <= DEGENERATE_AREA)
+        n_degenerate = int(np.count_nonzero(degenerate))
+        if n_degenerate:
+            stats['degenerate_triangles'] += n_degenerate
+            found.warn(f'{where}: {n_degenerate} degenerate triangles '
+                       f'({100.0 * n_degenerate / len(tris):.1f}%)')
+
+    # Skinning
+    joint_sets = sorted(int(k.split('_')[1]) for k in attributes if k.startswith('JOINTS_'))
+    weight_sets = sorted(int(k.split('_')[1]) for k in attributes if k.startswith('WEIGHTS_'))
+    if joint_sets != weight_sets:
+        found.error(f'{where}: JOINTS sets {joint_sets} do not match WEIGHTS sets {weight_sets}')
+        return
+    if not joint_sets:
+        return
+
+    skins = glb.json.get('skins', [])
+    skin_sizes = [len(skins[s].get('joints', [])) for s in mesh_skins.get(m, ()) if s < len(skins)]
+    if not skin_sizes:
+        found.warn(f'{where}: has JOINTS/WEIGHTS but no skinned node uses it')
+
+    weight_sum = np.zeros(vertex_count, dtype=np.float64)
+    for s in joint_sets:
+        j_index, w_index = attributes[f'JOINTS_{s}'], attributes[f'WEIGHTS_{s}']
+        j_accessor, w_accessor = accessors[j_index], accessors[w_index]
+        if j_accessor['type'] != 'VEC4' or w_accessor['type'] != 'VEC4':
+            found.error(f'{where}: JOINTS_{s}/WEIGHTS_{s} must be VEC4')
+            continue
+        if j_accessor['componentType'] not in (UNSIGNED_BYTE, UNSIGNED_SHORT):
+            found.error(f'{where}: JOINTS_{s} must be unsigned byte/short')
+        if j_accessor['count'] != w_accessor['count']:
+            found.error(f'{where}: JOINTS_{s} has {j_accessor["count"]} entries, '
+                        f'WEIGHTS_{s} has {w_accessor["count"]}')
+            continue
+        if j_index not in readable or w_index not in readable:
+            continue
+        joints = read_accessor(glb, j_index).astype(np.int64)
+        weights = read_accessor_float(glb, w_index)
+        if skin_sizes:
+            limit = min(skin_sizes)
+            # Only joints that actually carry weight are looked up
+            bad = int(np.count_nonzero((joints >= limit) & (weights > 0)))
+            if bad:
+                found.error(f'{where}: {bad} weighted JOINTS_{s} entries >= skin joint count {limit}')
+        if (weights < 0).any():
+            found.warn(f'{where}: WEIGHTS_{s} has negative weights')
+        if len(weights) == vertex_count:
+            weight_sum += weights.sum(axis=1)
+
+    off = int(np.count_nonzero(np.abs(weight_sum - 1.0) > WEIGHT_SUM_TOLERANCE))
+    if off:
+        found.warn(f'{where}: {off} vertices with weights not summing to 1')
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def validate_glb(filepath):
+    """Validate one GLB. Returns a result dict with status OK/WARNING/INVALID."""
+    filepath = str(filepath)
+    result = {'file': filepath, 'filename': os.path.basename(filepath)}
+    found = Findings()
+    stats = {'vertices': 0, 'triangles': 0, 'degenerate_triangles': 0}
+    try:
+        glb = read_glb(filepath)
+    except (ValueError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        found.error(str(e))
+        glb = None
+
+    if glb is not None:
+        try:
+            check_buffer_views(glb, found)
+            readable = check_accessor_bounds(glb, found)
+            check_references(glb, found)
+            check_float_data(glb, readable, found)
+            mesh_skins = primitive_skins(glb)
+            for m, mesh in enumerate(glb.json.get('meshes', [])):
+                for p, prim in enumerate(mesh.get('primitives', [])):
+                    check_primitive(glb, m, p, prim, readable, mesh_skins, found, stats)
+        except (KeyError, TypeError, IndexError, ValueError) as e:
+            found.error(f'malformed glTF JSON: {type(e).__name__}: {e}')
+
+    if found.errors:
+        status = 'INVALID'
+    elif found.warnings:
+        status = 'WARNING'
+    else:
+        status = 'OK'
+    result.update({'status': status, 'errors': found.errors, 'warnings': found.warnings, **stats})
+    return result
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Validate GLB accessor, index and skin data')
+    parser.add_argument('paths', nargs='+', help='GLB files or directories')
+    parser.add_argument('--report', default=None, help='Write results to this JSON file')
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=None,
+        help='Worker processes (default: CPU count)')
+    parser.add_argument(
+        '--quiet', '-q', action='store_true',
+        help='Only print files with errors or warnings')
+    return parser.parse_args(raw_args)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    glb_files = collect_glbs(args.paths)
+    print(f"\nValidating {len(glb_files)} GLB files...")
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        results = list(pool.map(validate_glb, glb_files, chunksize=8))
+
+    for i, result in enumerate(results):
+        if args.quiet and result['status'] == 'OK':
+            continue
+        print(f"  [{i+1}/{len(results)}] {result['filename']} [{result['status']}]")
+        for message in result['errors']:
+            print(f"      ERROR: {message}")
+        for message in result['warnings']:
+            print(f"      - {message}")
+
+    summary = {
+        'total_files': len(results),
+        'ok': sum(1 for r in results if r['status'] == 'OK'),
+        'warnings': sum(1 for r in results if r['status'] == 'WARNING'),
+        'invalid': sum(1 for r in results if r['status'] == 'INVALID'),
+    }
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'summary': summary, 'results': results}, f, indent=2)
+
+    print(f"\n=== VALIDATION SUMMARY ===")
+    print(f"Total: {summary['total_files']}")
+    print(f"OK: {summary['ok']}")
+    print(f"Warnings: {summary['warnings']}")
+    print(f"Invalid: {summary['invalid']}")
+    if args.report:
+        print(f"\nReport written to: {args.report}")
+    if summary['invalid']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
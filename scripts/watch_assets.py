@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Watch a source folder and incrementally convert FBX/.blend files to GLB.
+
+Polls the source tree, waits until a file has stopped changing (debounce),
+then converts only that file and audits only the new GLB. A single Blender
+process running scripts/asset_worker.py is kept warm between jobs, so the
+turnaround from save to in-game GLB is a few seconds instead of a full
+batch_fbx_to_glb.py / batch_blend_to_glb.py run over the whole directory.
+
+On startup every source whose GLB is missing or older than the source is
+converted once, then the watcher waits for changes.
+
+Audits go through the asset database (asset_db.py) like audit_glbs.py: each
+watcher session is one run, unchanged bytes reuse their stored result, and
+--report is built with the same report view as the pipeline audits.
+
+Usage:
+    python3 scripts/watch_assets.py /input/dir/ /output/dir/
+    python3 scripts/watch_assets.py /input/dir/ /output/dir/ \\
+        --blender /Applications/Blender.app/Contents/MacOS/Blender \\
+        --interval 1.0 --debounce 1.5 --report watch-audit.json --db assets.sqlite
+
+Runs with plain Python 3; only the worker runs inside Blender.
+"""
+
+import argparse
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+import asset_db
+
+WORKER_SCRIPT = SCRIPT_DIR / 'asset_worker.py'
+RESULT_PREFIX = '@@RESULT '
+
+# Source extension -> worker op
+SOURCE_OPS = {
+    '.fbx': 'fbx',
+    '.blend': 'blend',
+}
+
+
+class BlenderWorker:
+    """A long-lived Blender process that runs conversion/audit jobs."""
+
+    def __init__(self, blender, verbose=False, timeout=600.0):
+        self.blender = blender
+        self.verbose = verbose
+        self.timeout = timeout
+        self.proc = None
+        self.lines = None
+        self.next_id = 0
+
+    def start(self):
+        print(f"Starting Blender worker ({self.blender})...", flush=True)
+        self.proc = subprocess.Popen(
+            [self.blender, '--background', '--factory-startup',
+             '--python', str(WORKER_SCRIPT)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            errors='replace',
+            bufsize=1,
+        )
+        # Read stdout on a thread so a silent or stuck Blender can time out
+        self.lines = queue.Queue()
+        threading.Thread(target=self._pump, args=(self.proc.stdout, self.lines), daemon=True).start()
+        try:
+            ready = self._read_result()
+        except TimeoutError:
+            self.proc.kill()
+            ready = None
+        if not ready or not ready.get('ready'):
+            if self.proc.poll() is None:
+                self.proc.kill()
+            self.proc = None
+            raise RuntimeError('Blender worker failed to start')
+        print("Blender worker ready", flush=True)
+
+    def stop(self):
+        if self.proc and self.proc.poll() is None:
+            try:
+                self.proc.stdin.write(json.dumps({'op': 'quit'}) + '\n')
+                self.proc.stdin.flush()
+                self.proc.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self.proc.kill()
+        self.proc = None
+
+    def run(self, job):
+        """Send one job and block until its result arrives.
+
+        If the worker has died (e.g. Blender crashed on a bad import) it is
+        restarted and the job is reported as failed rather than retried. A
+        restart that fails fails the job too; the next job tries again.
+        """
+        if self.proc is None or self.proc.poll() is not None:
+            try:
+                self.start()
+            except (OSError, RuntimeError) as e:
+                return {'ok': False, 'error': str(e)}
+        self.next_id += 1
+        job = dict(job, id=self.next_id)
+        try:
+            self.proc.stdin.write(json.dumps(job) + '\n')
+            self.proc.stdin.flush()
+        except OSError:
+            self.proc = None
+            return {'ok': False, 'error': 'Blender worker exited'}
+        try:
+            result = self._read_result()
+        except TimeoutError:
+            self.proc.kill()
+            self.proc = None
+            return {'ok': False, 'error': f'Blender worker timed out after {self.timeout:g}s'}
+        if result is None:
+            self.proc = None
+            return {'ok': False, 'error': 'Blender worker exited'}
+        return result
+
+    @staticmethod
+    def _pump(stream, lines):
+        # None marks the end of output, so a reader never waits out the timeout
+        try:
+            for line in stream:
+                lines.put(line)
+        finally:
+            lines.put(None)
+
+    def _read_result(self):
+        """
+        Next result line, or None if the worker exited. Raises TimeoutError
+        after self.timeout seconds without one.
+
+        Blender shares stdout and may leave a line unterminated, so the
+        prefix is searched anywhere in the line, not just at its start.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                line = self.lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise TimeoutError from None
+            if line is None:
+                return None
+            at = line.find(RESULT_PREFIX)
+            if at >= 0:
+                if self.verbose and at:
+                    sys.stdout.write(f"    | {line[:at]}\n")
+                return json.loads(line[at + len(RESULT_PREFIX):])
+            if self.verbose:
+                sys.stdout.write(f"    | {line}")
+
+
+def scan_sources(input_dir):
+    """Return {path: (mtime_ns, size)} for every convertible source file."""
+    snapshot = {}
+    for root, dirs, files in os.walk(input_dir):
+        for f in files:
+            if os.path.splitext(f)[1].lower() in SOURCE_OPS:
+                path = os.path.join(root, f)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                snapshot[path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def output_path_for(source, output_dir):
+    name = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(output_dir, f"{name}.glb")
+
+
+def is_stale(source, output_dir):
+    output = output_path_for(source, output_dir)
+    if not os.path.exists(output):
+        return True
+    return os.path.getmtime(output) < os.path.getmtime(source)
+
+
+def process(worker, source, output_dir, db_path, run_id):
+    """Convert one source and audit its new GLB into run run_id."""
+    op = SOURCE_OPS[os.path.splitext(source)[1].lower()]
+    output = output_path_for(source, output_dir)
+    start = time.time()
+    print(f"  {os.path.basename(source)} -> {os.path.basename(output)}", end=' ', flush=True)
+    result = worker.run({'op': op, 'input': source, 'output': output})
+    if not result.get('ok'):
+        print(f"[FAILED] {result.get('error', '')}".rstrip())
+        return False
+
+    audit = worker.run({'op': 'audit', 'input': output, 'db': str(db_path),
+                        'run': run_id, 'base': output_dir})
+    elapsed = time.time() - start
+    if not audit.get('ok'):
+        print(f"[AUDIT FAILED] {audit.get('error', '')} ({elapsed:.1f}s)")
+        return False
+    report = audit['audit']
+    print(f"[{report['status']}] ({elapsed:.1f}s)")
+    for warning in report.get('warnings', []):
+        print(f"      - {warning}")
+    return True
+
+
+def write_report(report_path, db, run_id):
+    report = asset_db.build_report(asset_db.run_results(db, run_id))
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Watch a source folder and convert changed FBX/.blend files to GLB')
+    parser.add_argument('input_dir', help='Source folder with .fbx/.blend files')
+    parser.add_argument('output_dir', help='Output folder for .glb files')
+    parser.add_argument(
+        '--blender', default=os.environ.get('BLENDER', 'blender'),
+        help='Blender executable (default: $BLENDER or "blender")')
+    parser.add_argument(
+        '--interval', type=float, default=1.0,
+        help='Seconds between polls of the source folder')
+    parser.add_argument(
+        '--debounce', type=float, default=1.5,
+        help='Seconds a file must stay unchanged before it is converted')
+    parser.add_argument(
+        '--report', default=None,
+        help='Write audit results of converted files to this JSON file')
+    parser.add_argument(
+        '--db', default=str(asset_db.DEFAULT_DB),
+        help='Asset database for audit results (default: .asset-pipeline/assets.sqlite)')
+    parser.add_argument(
+        '--timeout', type=float, default=600.0,
+        help='Seconds to wait for a job before restarting the Blender worker')
+    parser.add_argument(
+        '--verbose', action='store_true',
+        help='Echo Blender worker output')
+    return parser.parse_args(raw_args)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    input_dir = args.input_dir
+    output_dir = args.output_dir
+
+    if not os.path.isdir(input_dir):
+        print(f"ERROR: Source directory not found: {input_dir}")
+        sys.exit(1)
+    os.makedirs(output_dir, exist_ok=True)
+
+    worker = BlenderWorker(args.blender, verbose=args.verbose, timeout=args.timeout)
+    try:
+        worker.start()
+    except (OSError, RuntimeError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    db = asset_db.open_db(args.db)
+    run_id = asset_db.start_run(db, 'watch_assets', [output_dir])
+    known = scan_sources(input_dir)
+    # path -> (signature, time the signature was first seen)
+    pending = {
+        path: (sig, 0.0) for path, sig in known.items()
+        if is_stale(path, output_dir)
+    }
+
+    print(f"\nWatching {input_dir} -> {output_dir}")
+    print(f"  {len(known)} sources, {len(pending)} need conversion")
+    print("  Ctrl+C to stop\n")
+
+    try:
+        while True:
+            now = time.time()
+            snapshot = scan_sources(input_dir)
+            for path, sig in snapshot.items():
+                if known.get(path) != sig:
+                    pending[path] = (sig, now)
+            for path in list(pending):
+                if path not in snapshot:
+                    del pending[path]
+            known = snapshot
+
+            ready = sorted(
+                path for path, (sig, seen) in pending.items()
+                if now - seen >= args.debounce
+            )
+            for path in ready:
+                del pending[path]
+                process(worker, path, output_dir, args.db, run_id)
+            if ready and args.report:
+                write_report(args.report, db, run_id)
+
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\nStopping watcher")
+    finally:
+        worker.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Stellar Descent - Vertex Welder
+
+FBX exports (convert_fbx_to_glb, convert-weapons.py) often split vertices at
+every face corner, even where position, normal and UV are identical. The GPU
+then transforms each corner separately and the post-transform vertex cache
+never hits. This merges identical vertices per vertex buffer and rebuilds
+the index buffers:
+
+  - Vertices match when every attribute matches. Float attributes are
+    compared within a per-semantic tolerance (TOLERANCES), by hashing the
+    values snapped to that grid. Integer attributes (JOINTS_n, normalized
+    colours) must match exactly. Morph target deltas are part of the key.
+  - The first vertex of each group is kept as-is, so values never drift,
+    and vertices are reordered by first use in the index buffer.
+  - Triangles that become degenerate are dropped. Non-indexed primitives
+    get an index buffer.
+  - Accessor formats (normalized ints, float) are kept. The index type is
+    the smallest that fits.
+
+Files are rewritten only when vertices were merged, so re-runs report
+UNCHANGED. The report lists vertices per file before and after, with the
+after/before ratio.
+
+Usage:
+    python3 scripts/weld_vertices.py public/assets/models/environment/station/
+    python3 scripts/weld_vertices.py model.glb --dry-run --report weld.json
+
+Runs with plain Python 3 + numpy (no Blender needed).
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+from glb_io import (
+    read_glb, write_glb, collect_glbs, compact, read_accessor, add_accessor, index_dtype,
+    ARRAY_BUFFER, ELEMENT_ARRAY_BUFFER,
+)
+
+TRIANGLES = 4
+# Snap size per attribute semantic (prefix), in the attribute's own units
+TOLERANCES = {
+    'POSITION': 1e-5,       # 0.01 mm
+    'NORMAL': 1e-3,
+    'TANGENT': 1e-3,
+    'TEXCOORD': 1e-5,       # well under a texel of a 4K texture
+    'COLOR': 1.0 / 512,
+    'WEIGHTS': 1.0 / 512,
+}
+DEFAULT_TOLERANCE = 1e-5
+
+
+def tolerance(semantic):
+    return TOLERANCES.get(semantic.split('_')[0], DEFAULT_TOLERANCE)
+
+
+def vertex_keys(columns):
+    """(count, n) int64 key per vertex from [(semantic, values)]."""
+    keys = []
+    for semantic, values in columns:
+        values = values.reshape(len(values), -1)
+        if np.issubdtype(values.dtype, np.floating):
+            keys.append(np.round(values.astype(np.float64) / tolerance(semantic)).astype(np.int64))
+        else:
+            keys.append(values.astype(np.int64))
+    return np.concatenate(keys, axis=1)
+
+
+def weld_primitives(glb, prims):
+    """
+    Weld primitives that share one set of vertex accessors (sub-meshes of
+    one vertex buffer) in place. Returns (vertices before, vertices after).
+    """
+    document = glb.json
+    attributes = prims[0]['attributes']
+    data = {name: read_accessor(glb, index) for name, index in attributes.items()}
+    targets = [{name: read_accessor(glb, index) for name, index in target.items()}
+               for target in prims[0].get('targets', [])]
+    count = len(data['POSITION'])
+    if not count:
+        return 0, 0
+    index_lists = [read_accessor(glb, prim['indices']).astype(np.int64) if 'indices' in prim
+                   else np.arange(count, dtype=np.int64) for prim in prims]
+
+    columns = sorted(data.items())
+    for target in targets:
+        columns += sorted(target.items())
+    _, first, group = np.unique(vertex_keys(columns), axis=0, return_index=True, return_inverse=True)
+    group = group.reshape(-1)
+    if len(first) == count:
+        return count, count
+
+    # Keep the first vertex of each group; number groups by first use
+    welded = [group[indices] for indices in index_lists]
+    stream = np.concatenate(welded)
+    used = stream[np.sort(np.unique(stream, return_index=True)[1])]
+    order = np.full(len(first), -1, dtype=np.int64)
+    order[used] = np.arange(len(used))
+    new_lists = []
+    for prim, indices in zip(prims, welded):
+        indices = order[indices]
+        if prim.get('mode', TRIANGLES) == TRIANGLES:
+            tris = indices.reshape(-1, 3)
+            keep = (tris[:, 0] != tris[:, 1]) & (tris[:, 1] != tris[:, 2]) & (tris[:, 0] != tris[:, 2])
+            indices = tris[keep].ravel()
+        new_lists.append(indices)
+
+    # Drop vertices only degenerate triangles used
+    live = np.zeros(len(used), dtype=bool)
+    for indices in new_lists:
+        live[indices] = True
+    if not live.any():
+        return count, count
+    compacted = np.cumsum(live) - 1
+    representatives = first[used][live]
+    vertex_count = len(representatives)
+
+    new_attributes = {}
+    for name, values in data.items():
+        accessor = document['accessors'][attributes[name]]
+        new_attributes[name] = add_accessor(glb, values[representatives], ARRAY_BUFFER,
+                                            normalized=accessor.get('normalized', False))
+    new_targets = [{name: add_accessor(glb, values[representatives], ARRAY_BUFFER)
+                    for name, values in target.items()} for target in targets]
+    for prim, indices in zip(prims, new_lists):
+        prim['attributes'] = dict(new_attributes)
+        if new_targets:
+            prim['targets'] = [dict(target) for target in new_targets]
+        prim['indices'] = add_accessor(glb, compacted[indices].astype(index_dtype(vertex_count)),
+                                       ELEMENT_ARRAY_BUFFER)
+    return count, vertex_count
+
+
+def weld_glb(glb_path, dry_run=False):
+    """Weld every primitive of one GLB. Returns (status, vertices before, vertices after)."""
+    glb = read_glb(glb_path)
+    document = glb.json
+    # Primitives sharing vertex accessors are welded together
+    buffers = {}
+    for mesh in document.get('meshes', []):
+        for prim in mesh.get('primitives', []):
+            if 'POSITION' not in prim.get('attributes', {}) or prim.get('extensions'):
+                continue
+            key = json.dumps([prim['attributes'], prim.get('targets', [])], sort_keys=True)
+            buffers.setdefault(key, []).append(prim)
+
+    before = after = 0
+    for prims in buffers.values():
+        b, a = weld_primitives(glb, prims)
+        before += b
+        after += a
+
+    if after == before:
+        return 'UNCHANGED', before, after
+    if dry_run:
+        return 'DRY_RUN', before, after
+    compact(glb)
+    write_glb(glb_path, glb)
+    return 'WELDED', before, after
+
+
+def describe(before, after):
+    if not before:
+        return ''
+    return f"vertices {before} -> {after} ({after / before:.2f})"
+
+
+def parse_args(raw_args):
+    parser = argparse.ArgumentParser(
+        description='Merge duplicate vertices and rebuild index buffers')
+    parser.add_argument('paths', nargs='+', help='GLB files or directories')
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=None,
+        help='Worker processes (default: CPU count)')
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Report what would change without writing files')
+    parser.add_argument(
+        '--report', default=None,
+        help='Write per-file vertex counts as JSON')
+    return parser.parse_args(raw_args)
+
+
+def run(glb_path, dry_run):
+    try:
+        return weld_glb(glb_path, dry_run)
+    except Exception as e:
+        return f'FAILED: {e}', 0, 0
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    glb_files = collect_glbs(args.paths)
+    print(f"\nWelding {len(glb_files)} GLB files...")
+
+    counts = {}
+    totals = [0, 0]
+    report = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(run, p, args.dry_run) for p in glb_files]
+        for i, future in enumerate(futures):
+            status, before, after = future.result()
+            totals = [totals[0] + before, totals[1] + after]
+            print(f"  [{i+1}/{len(glb_files)}] {glb_files[i].name} [{status}] {describe(before, after)}".rstrip())
+            key = status.split(':')[0]
+            counts[key] = counts.get(key, 0) + 1
+            report.append({
+                'file': str(glb_files[i]),
+                'status': key,
+                'verticesBefore': before,
+                'verticesAfter': after,
+                'ratio': round(after / before, 4) if before else None,
+            })
+
+    if args.report:
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.report, 'w') as f:
+            json.dump({'files': report, 'verticesBefore': totals[0], 'verticesAfter': totals[1]}, f, indent=2)
+
+    print(f"\n=== WELD SUMMARY ===")
+    for status, count in sorted(counts.items()):
+        print(f"{status}: {count}")
+    ratio = f" ({totals[1] / totals[0]:.2f})" if totals[0] else ''
+    print(f"Vertices: {totals[0]} -> {totals[1]}{ratio}")
+    if counts.get('FAILED'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()